@@ -0,0 +1,354 @@
+"""Load test of the HTTP API against local stand-ins.
+
+Starts the FastAPI app in-process (lifespan included: job queues, Substrate
+pool, escrow indexer) on a temporary SQLite database or `--database-url`,
+with every external service replaced:
+
+- Arkiv: `benchmarks.stand_ins.FakeArkiv` (in-memory, per-RPC delay);
+- LLM: `ReplayBackend` over the recorded evaluations;
+- chain: the simulated contracts node (`ROCOCO_BACKEND=simulated`).
+
+It then drives a weighted mix of list, CRUD, evaluate, sponsor and deploy
+requests at a fixed concurrency and reports throughput, status codes and
+latency percentiles per endpoint. `--output` saves the JSON report;
+`--baseline` compares against a saved one and exits with status 1 if the
+throughput or an endpoint's p95 latency regressed by more than `--tolerance`.
+
+Usage:
+    python -m benchmarks.app_load --concurrency 16 --requests 1000 --output base.json
+    python -m benchmarks.app_load --concurrency 16 --requests 1000 --baseline base.json
+
+Requires `aiosqlite` (or `asyncpg` with a Postgres `--database-url`) and
+`httpx` in addition to the app dependencies.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+RECORDINGS = Path(__file__).parent / "recordings" / "evaluations.jsonl"
+MIX = "list=40,crud=25,evaluate=15,sponsor=10,deploy=10"
+API = "/api/v1/arkiv"
+WORDS = (
+    "decentralized escrow milestone wallet parachain indexer dashboard audit oracle bridge grant"
+    " community governance storage analytics mobile sdk relayer staking identity privacy"
+).split()
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise SystemExit(f"Unknown operation in --mix: {name!r} (expected {', '.join(OPERATIONS)})")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Point the settings at the stand-ins; must run before `src` is imported"""
+    database_url = args.database_url
+    if database_url is None:
+        database_url = f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp()) / 'app_load.db'}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["ROCOCO_BACKEND"] = "simulated"
+    os.environ["SIMCHAIN_BLOCK_TIME_SECONDS"] = str(args.block_time)
+    # Only read to build the real client, which the stand-in replaces
+    os.environ.setdefault("ARKIV_HTTP_PROVIDER", "http://arkiv.invalid")
+    os.environ.setdefault("ARKIV_PRIVATE_KEY", "0x" + "11" * 32)
+    os.environ.setdefault("ARKIV_PRIVATE_NAME", "bench")
+
+
+class Workload:
+    """Ids created while seeding and by the CRUD traffic itself."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.projects: list[dict] = []
+        self.sponsored: list[int] = []
+        self.created: list[int] = []
+        self.counter = 0
+
+    def new_project(self) -> dict:
+        self.counter += 1
+        return {
+            "project_id": f"bench-{self.counter}",
+            "name": " ".join(self.rng.choice(WORDS) for _ in range(3)).title(),
+            "repo": f"https://example.org/bench-{self.counter}",
+            "description": " ".join(self.rng.choice(WORDS) for _ in range(120)),
+            "budget": float(self.rng.randrange(1_000, 50_000)),
+        }
+
+
+async def op_list(client, work: Workload):
+    path = work.rng.choice(("projects", "milestones", "sponsored"))
+    return f"GET {API}/{path}", await client.get(f"{API}/{path}", params={"limit": 50})
+
+
+async def op_crud(client, work: Workload):
+    roll = work.rng.random()
+    if roll < 0.3 or not work.created:
+        response = await client.post(f"{API}/projects", json=work.new_project())
+        if response.is_success:
+            work.created.append(response.json()["id"])
+        return f"POST {API}/projects", response
+    if roll < 0.7:
+        project_id = work.rng.choice(work.created)
+        return f"GET {API}/projects/{{project_id}}", await client.get(f"{API}/projects/{project_id}")
+    if roll < 0.9:
+        project_id = work.rng.choice(work.created)
+        response = await client.put(f"{API}/projects/{project_id}", json={"budget": float(work.rng.randrange(1_000, 50_000))})
+        return f"PUT {API}/projects/{{project_id}}", response
+    project_id = work.created.pop(work.rng.randrange(len(work.created)))
+    return f"DELETE {API}/projects/{{project_id}}", await client.delete(f"{API}/projects/{project_id}")
+
+
+async def op_evaluate(client, work: Workload):
+    project = work.rng.choice(work.projects)
+    return f"POST {API}/evaluate", await client.post(f"{API}/evaluate", params={"project_id": project["id"]})
+
+
+async def op_sponsor(client, work: Workload):
+    project = work.rng.choice(work.projects)
+    payload = {"project": project, "ai_score": 75.0, "contract_address": "5BenchSponsorAddress"}
+    return f"POST {API}/sponsor", await client.post(f"{API}/sponsor", json=payload)
+
+
+async def op_deploy(client, work: Workload, background: bool = False):
+    project_id = work.rng.choice(work.sponsored)
+    response = await client.post(
+        f"{API}/escrow/deploy-escrow",
+        params={"project_id": project_id, "background": str(background).lower()},
+    )
+    return f"POST {API}/escrow/deploy-escrow", response
+
+
+OPERATIONS = {
+    "list": op_list,
+    "crud": op_crud,
+    "evaluate": op_evaluate,
+    "sponsor": op_sponsor,
+    "deploy": op_deploy,
+}
+
+
+async def seed(client, work: Workload, arkiv, args: argparse.Namespace) -> None:
+    """Create the projects and approved sponsored projects the traffic refers to."""
+    from src.services.arkiv import ArkivService
+
+    for _ in range(args.projects):
+        response = await client.post(f"{API}/projects", json=work.new_project())
+        response.raise_for_status()
+        work.projects.append({k: v for k, v in response.json().items() if k not in ("created_at", "updated_at")})
+    for project in work.projects[:args.sponsored]:
+        sponsored = {
+            "project_id": project["project_id"],
+            "name": project["name"],
+            "repo": project["repo"],
+            "ai_score": 80.0,
+            "status": "approved",
+            "contract_address": "5BenchSponsorAddress",
+            "chain": "asset_hub",
+            "budget": project["budget"],
+            "description": project["description"],
+        }
+        # Deployments update the project's Arkiv entity, so give it one
+        entity = await asyncio.to_thread(ArkivService.save_sponsored_project, arkiv, sponsored)
+        response = await client.post(f"{API}/sponsored", json={**sponsored, **entity})
+        response.raise_for_status()
+        work.sponsored.append(response.json()["id"])
+
+
+async def run(args: argparse.Namespace) -> dict:
+    configure_environment(args)
+    # Imported here so the settings above are in place first
+    import httpx
+    from sqlmodel import SQLModel
+
+    from benchmarks.stand_ins import FakeArkiv
+    from src.core.depends.db import get_engine
+    from src.core.depends.substrate import substrate_pool
+    from src.core.resources import resources
+    from src.main import app
+    from src.services.ai import AIService
+    from src.services.model_backends import ReplayBackend
+
+    async with get_engine().begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    arkiv = FakeArkiv(latency_median_ms=args.arkiv_latency_ms, error_rate=args.arkiv_error_rate, seed=args.seed)
+    resources.set("arkiv", arkiv)
+    AIService.set_backend(
+        ReplayBackend.from_file(
+            args.recordings,
+            latency_median_ms=args.llm_latency_ms,
+            error_rate=args.llm_error_rate,
+            seed=args.seed,
+        )
+    )
+
+    rng = random.Random(args.seed)
+    work = Workload(rng)
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    plan = [rng.choices(names, weights)[0] for _ in range(args.warmup + args.requests)]
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    statuses: dict[str, Counter] = defaultdict(Counter)
+    failures: Counter = Counter()
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            await seed(client, work, arkiv, args)
+
+            async def drive(names: list[str], concurrency: int, record: bool) -> None:
+                queue: asyncio.Queue = asyncio.Queue()
+                for name in names:
+                    queue.put_nowait(name)
+
+                async def worker() -> None:
+                    while not queue.empty():
+                        name = queue.get_nowait()
+                        kwargs = {"background": args.deploy_background} if name == "deploy" else {}
+                        started = time.perf_counter()
+                        try:
+                            label, response = await OPERATIONS[name](client, work, **kwargs)
+                        except Exception as e:
+                            if record:
+                                failures[f"{name}: {type(e).__name__}"] += 1
+                            continue
+                        if record:
+                            latencies[label].append(time.perf_counter() - started)
+                            statuses[label][response.status_code] += 1
+
+                await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+            await drive(plan[:args.warmup], args.concurrency, record=False)
+            started = time.perf_counter()
+            await drive(plan[args.warmup:], args.concurrency, record=True)
+            elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for label in sorted(latencies):
+        samples = latencies[label]
+        codes = statuses[label]
+        endpoints[label] = {
+            "requests": len(samples),
+            "throughput_rps": round(len(samples) / elapsed, 2),
+            "errors": sum(n for code, n in codes.items() if code >= 500),
+            "status": {str(code): n for code, n in sorted(codes.items())},
+            "latency_ms": latency_summary(samples),
+        }
+    everything = [s for samples in latencies.values() for s in samples]
+    return {
+        "config": {
+            k: v for k, v in vars(args).items() if k not in ("output", "baseline", "tolerance", "recordings")
+        },
+        "requests": len(everything),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(everything) / elapsed, 2),
+        "errors": sum(e["errors"] for e in endpoints.values()) + sum(failures.values()),
+        "failures": dict(failures),
+        "latency_ms": latency_summary(everything),
+        "endpoints": endpoints,
+        "stand_ins": {
+            "arkiv_calls": arkiv.arkiv.calls,
+            "model_calls": AIService.get_backend().calls,
+            "blocks": len(substrate_pool.node.blocks),
+        },
+    }
+
+
+def latency_summary(samples: list[float]) -> dict:
+    return {
+        "p50": round(percentile(samples, 0.50) * 1000, 1),
+        "p95": round(percentile(samples, 0.95) * 1000, 1),
+        "p99": round(percentile(samples, 0.99) * 1000, 1),
+        "mean": round(statistics.fmean(samples) * 1000, 1) if samples else 0.0,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> dict:
+    """Overall throughput and per-endpoint p95 against `baseline`; flags regressions.
+
+    Per-endpoint throughput follows the mix, so only the total is compared.
+    """
+    rps_before, rps_now = baseline["throughput_rps"], report["throughput_rps"]
+    changes = {
+        "throughput_rps": {
+            "before": rps_before,
+            "now": rps_now,
+            "regressed": rps_before > 0 and rps_now < rps_before * (1 - tolerance),
+        },
+        "same_config": baseline.get("config") == report["config"],
+        "p95_ms": {},
+    }
+    for label, current in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(label)
+        if before is None:
+            continue
+        p95_before, p95_now = before["latency_ms"]["p95"], current["latency_ms"]["p95"]
+        changes["p95_ms"][label] = {
+            "before": p95_before,
+            "now": p95_now,
+            "regressed": p95_before > 0 and p95_now > p95_before * (1 + tolerance),
+        }
+    return changes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50, help="Requests sent before measuring")
+    parser.add_argument("--mix", default=MIX, help="Weights per operation, e.g. 'list=40,crud=25,...'")
+    parser.add_argument("--projects", type=int, default=50, help="Projects created before the run")
+    parser.add_argument("--sponsored", type=int, default=20, help="Approved sponsored projects to deploy escrows for")
+    parser.add_argument("--database-url", help="SQLAlchemy async URL (default: a temporary SQLite file)")
+    parser.add_argument("--recordings", default=str(RECORDINGS))
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--arkiv-latency-ms", type=float, default=150.0)
+    parser.add_argument("--arkiv-error-rate", type=float, default=0.0)
+    parser.add_argument("--block-time", type=float, default=0.5, help="Block time of the simulated chain")
+    parser.add_argument("--deploy-background", action="store_true", help="Queue deployments (202) instead of waiting")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    # The app logs deployments with print(); keep stdout for the report
+    with contextlib.redirect_stdout(sys.stderr):
+        report = asyncio.run(run(args))
+    regressed = False
+    if args.baseline:
+        report["comparison"] = compare(report, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        comparison = report["comparison"]
+        regressed = comparison["throughput_rps"]["regressed"] or any(
+            change["regressed"] for change in comparison["p95_ms"].values()
+        )
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Offline load test of the evaluation path.
+
+Drives `EvaluationService.evaluate` at a target concurrency against a
+temporary SQLite database, with `AIService` backed by the replay stand-in
+(recorded replies + injected latency/errors), so no Gemini key or network
+is needed. Reports throughput, latency percentiles, event-loop lag and how
+often results came from stored or near-duplicate evaluations.
+
+Usage:
+    python -m benchmarks.evaluate_load --concurrency 32 --requests 500
+
+Requires `aiosqlite` in addition to the app dependencies.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+
+import src.models  # noqa: F401  (register tables)
+from src.core.depends.db import AsyncSessionLocal
+from src.services.ai import EVALUATIONS, PARSE_RESULTS, AIService
+from src.services.evaluation import REUSE, EvaluationService
+from src.services.model_backends import ReplayBackend
+from src.services.project import ProjectService
+
+RECORDINGS = Path(__file__).parent / "recordings" / "evaluations.jsonl"
+WORDS = (
+    "decentralized escrow milestone wallet parachain indexer dashboard audit oracle bridge grant"
+    " community governance storage analytics mobile sdk relayer staking identity privacy"
+).split()
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def project_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+async def seed_projects(count: int, duplicate_ratio: float, rng: random.Random) -> list:
+    """Create `count` projects; a share of them are reworded copies of earlier ones."""
+    projects = []
+    async with AsyncSessionLocal() as session:
+        for i in range(count):
+            if projects and rng.random() < duplicate_ratio:
+                base = rng.choice(projects)
+                words = base.description.split()
+                words[rng.randrange(len(words))] = rng.choice(WORDS)
+                description, name = " ".join(words), base.name
+            else:
+                description, name = project_text(rng, 120), project_text(rng, 3).title()
+            projects.append(
+                await ProjectService.create(
+                    {"project_id": f"bench-{i}", "name": name, "repo": "", "description": description, "budget": 5000},
+                    session,
+                )
+            )
+    return projects
+
+
+async def loop_lag_probe(interval: float, samples: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - started - interval))
+
+
+async def run(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    db_path = Path(tempfile.mkdtemp()) / "evaluate_load.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    AsyncSessionLocal.configure(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    AIService.set_backend(
+        ReplayBackend.from_file(
+            args.recordings,
+            latency_median_ms=args.latency_ms,
+            latency_sigma=args.latency_sigma,
+            error_rate=args.error_rate,
+            hang_rate=args.hang_rate,
+            seed=args.seed,
+        )
+    )
+    projects = await seed_projects(args.projects, args.duplicate_ratio, rng)
+
+    latencies: list[float] = []
+    lag: list[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(args.requests):
+        queue.put_nowait(rng.choice(projects))
+
+    async def worker() -> None:
+        nonlocal errors
+        while not queue.empty():
+            project = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as session:
+                    await EvaluationService.evaluate(project, session)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(loop_lag_probe(0.01, lag, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    await engine.dispose()
+
+    reuse = {k: REUSE.value(result=k) for k in ("hit", "similar", "miss")}
+    looked_up = sum(reuse.values()) or 1
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 1),
+            "p95": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99": round(percentile(latencies, 0.99) * 1000, 1),
+            "mean": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+        },
+        "loop_lag_ms": {
+            "p99": round(percentile(lag, 0.99) * 1000, 2),
+            "max": round(max(lag, default=0.0) * 1000, 2),
+        },
+        "reuse": {**reuse, "hit_rate": round((reuse["hit"] + reuse["similar"]) / looked_up, 3)},
+        "sources": {k: EVALUATIONS.value(source=k) for k in ("model", "fallback")},
+        "parse": {k: PARSE_RESULTS.value(outcome=k) for k in ("ok", "repaired", "failed")},
+        "model_calls": AIService.get_backend().calls,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.2)
+    parser.add_argument("--recordings", default=str(RECORDINGS))
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
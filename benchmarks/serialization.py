@@ -0,0 +1,183 @@
+"""Serialization and compression benchmark for the list endpoints.
+
+Builds `--rows` in-memory rows of each list model (projects, milestones,
+sponsored projects, evaluations) and reports, per 1,000 rows, the median CPU
+time and the body size of each way of turning them into a response:
+
+- validate_dump_python: what the locked FastAPI does for `response_model`
+  (re-validate the rows, dump to Python in JSON mode, `json.dumps`);
+- validate_dump_json: re-validate, then serialize in pydantic-core;
+- to_json: `ModelJSONResponse` (`src.core.responses`), serializing the rows
+  as they are;
+- orjson: `orjson.dumps` of `model_dump()`s, when orjson is installed.
+
+and, for the `to_json` body, the compressed size and CPU time of gzip at
+each `--gzip-levels` and of brotli at each `--brotli-qualities` (what
+`CompressionMiddleware` sends depends on the client's `Accept-Encoding`).
+
+Usage:
+    python -m benchmarks.serialization --rows 1000 --repeat 20
+"""
+import argparse
+import gzip
+import importlib
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List
+
+import pydantic_core
+from pydantic import TypeAdapter
+
+from src.core.responses import ModelJSONResponse
+from src.models.evaluation import Evaluation
+from src.models.milestone import Milestone
+from src.models.project import Project
+from src.models.sponsor import SponsoredProject
+
+DESCRIPTION = (
+    "Open-source tooling for parachain teams: indexer, dashboards and a grant "
+    "tracker. Funds go to two maintainers and an external audit. "
+)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def make_rows(count: int) -> dict:
+    """`count` rows per list model, shaped like what the services load"""
+    now = datetime(2025, 11, 17, 12, 0, 0)
+    rows = {"projects": [], "milestones": [], "sponsored": [], "evaluations": []}
+    for i in range(count):
+        stamp = now + timedelta(seconds=i)
+        common = {"id": i + 1, "created_at": stamp, "updated_at": stamp}
+        project_id = f"project-{i:05d}"
+        rows["projects"].append(Project(
+            **common, project_id=project_id, name=f"Project {i}",
+            repo=f"https://github.com/example/project-{i}", description=DESCRIPTION, budget=25_000 + i,
+        ))
+        rows["milestones"].append(Milestone(
+            **common, project_id=project_id, name=f"Milestone {i % 4 + 1}", description=DESCRIPTION,
+            amount=5_000.0, milestone_index=i % 4, released=i % 3 == 0,
+            released_at=stamp if i % 3 == 0 else None,
+        ))
+        rows["sponsored"].append(SponsoredProject(
+            **common, project_id=project_id, name=f"Project {i}",
+            repo=f"https://github.com/example/project-{i}", ai_score=60 + i % 40, status="approved",
+            contract_address="0x" + f"{i:040x}", chain="polkadot", budget=25_000 + i,
+            description=DESCRIPTION, entity_key="0x" + f"{i:064x}", tx_hash="0x" + f"{i + 1:064x}",
+        ))
+        rows["evaluations"].append(Evaluation(
+            **common, project_id=project_id, status="completed", source="model", model="replay",
+            prompt_hash=f"{i:064x}", ai_score=60 + i % 40, decision="approve", rationale=DESCRIPTION * 2,
+            input_tokens=900, output_tokens=180, latency_ms=850.0,
+        ))
+    return rows
+
+
+def serializers(model: type) -> dict:
+    adapter = TypeAdapter(List[model])
+
+    def validate_dump_python(rows):
+        value = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+        return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+    def validate_dump_json(rows):
+        return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+    def to_json(rows):
+        return ModelJSONResponse(rows).body
+
+    paths = {
+        "validate_dump_python": validate_dump_python,
+        "validate_dump_json": validate_dump_json,
+        "to_json": to_json,
+    }
+    try:
+        orjson = importlib.import_module("orjson")
+    except ImportError:
+        pass
+    else:
+        paths["orjson"] = lambda rows: orjson.dumps([row.model_dump() for row in rows])
+    return paths
+
+
+def compressors(levels: List[int], qualities: List[int]) -> dict:
+    paths = {f"gzip-{level}": (lambda body, level=level: gzip.compress(body, compresslevel=level, mtime=0))
+             for level in levels}
+    try:
+        brotli = importlib.import_module("brotli")
+    except ImportError:
+        pass
+    else:
+        for quality in qualities:
+            paths[f"brotli-{quality}"] = lambda body, quality=quality: brotli.compress(body, quality=quality)
+    return paths
+
+
+def measure(fn: Callable, arg, repeat: int) -> tuple[bytes, List[float]]:
+    """Run `fn(arg)` `repeat` times; returns its output and CPU seconds per run"""
+    output = fn(arg)
+    samples = []
+    for _ in range(repeat):
+        started = time.process_time()
+        fn(arg)
+        samples.append(time.process_time() - started)
+    return output, samples
+
+
+def run(args: argparse.Namespace) -> dict:
+    rows = make_rows(args.rows)
+    models = {"projects": Project, "milestones": Milestone, "sponsored": SponsoredProject, "evaluations": Evaluation}
+    per_thousand = 1000 / args.rows
+    report = {"rows": args.rows, "repeat": args.repeat, "pydantic_core": pydantic_core.__version__, "endpoints": {}}
+    for name, model in models.items():
+        entry = {"serialize": {}, "compress": {}}
+        reference = None
+        for path, fn in serializers(model).items():
+            body, samples = measure(fn, rows[name], args.repeat)
+            if reference is None:
+                reference = json.loads(body)
+            entry["serialize"][path] = {
+                "bytes_per_1000": round(len(body) * per_thousand),
+                "cpu_ms_per_1000": round(statistics.median(samples) * 1000 * per_thousand, 3),
+                "cpu_ms_p95_per_1000": round(percentile(samples, 95) * 1000 * per_thousand, 3),
+                "same_json": json.loads(body) == reference,
+            }
+        body = ModelJSONResponse(rows[name]).body
+        for path, fn in compressors(args.gzip_levels, args.brotli_qualities).items():
+            compressed, samples = measure(fn, body, args.repeat)
+            entry["compress"][path] = {
+                "bytes_per_1000": round(len(compressed) * per_thousand),
+                "ratio": round(len(body) / len(compressed), 2),
+                "cpu_ms_per_1000": round(statistics.median(samples) * 1000 * per_thousand, 3),
+            }
+        report["endpoints"][name] = entry
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per list")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per path")
+    parser.add_argument("--gzip-levels", type=int, nargs="*", default=[1, 5, 9])
+    parser.add_argument("--brotli-qualities", type=int, nargs="*", default=[4, 6, 9])
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args()
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Local stand-ins for the external services the app talks to.
+
+- FakeArkiv: in-memory replacement for the Arkiv client, covering the subset
+  `ArkivService` uses, with a log-normal delay per RPC (the SDK is
+  synchronous, so the delay blocks the calling thread like a real call).
+
+The LLM and the chain have stand-ins in the app itself: `ReplayBackend`
+(`src.services.model_backends`) and the simulated contracts node
+(`ROCOCO_BACKEND=simulated`, `src.core.simulated_chain`).
+"""
+import hashlib
+import itertools
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class FakeEntity:
+    entity_key: str
+    payload: bytes
+    content_type: str
+    attributes: dict
+
+
+@dataclass
+class FakeReceipt:
+    tx_hash: str
+
+
+@dataclass
+class FakeQueryPage:
+    entities: List[FakeEntity]
+
+
+@dataclass
+class FakeBatch:
+    module: "FakeArkivModule"
+    operations: List[dict] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.operations
+
+    @property
+    def operation_count(self) -> int:
+        return len(self.operations)
+
+    def update_entity(self, entity_key: str, payload: bytes, content_type: str, attributes: dict) -> None:
+        self.operations.append(
+            {"entity_key": entity_key, "payload": payload, "content_type": content_type, "attributes": attributes}
+        )
+
+    def execute(self) -> FakeReceipt:
+        self.module._rpc()
+        for operation in self.operations:
+            self.module._store(FakeEntity(**operation))
+        return self.module._receipt()
+
+
+class FakeArkivModule:
+    """`client.arkiv`: entity CRUD against an in-memory store."""
+
+    def __init__(self, latency_median_ms: float, latency_sigma: float, error_rate: float, seed: Optional[int]):
+        self.latency_median_ms = latency_median_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._entities: Dict[str, FakeEntity] = {}
+        self._ids = itertools.count(1)
+
+    def _rpc(self) -> None:
+        """Wait like a round trip to the node; fail with `error_rate`"""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency_median_ms / 1000 * self._rng.lognormvariate(0, self.latency_sigma)
+            failed = self._rng.random() < self.error_rate
+        time.sleep(delay)
+        if failed:
+            raise ConnectionError("injected Arkiv RPC failure")
+
+    def _receipt(self) -> FakeReceipt:
+        return FakeReceipt(tx_hash="0x" + hashlib.sha256(str(next(self._ids)).encode()).hexdigest())
+
+    def _store(self, entity: FakeEntity) -> None:
+        with self._lock:
+            self._entities[entity.entity_key] = entity
+
+    def create_entity(self, payload: bytes, content_type: str, attributes: dict):
+        self._rpc()
+        key = "0x" + hashlib.sha256(b"entity-%d" % next(self._ids)).hexdigest()
+        self._store(FakeEntity(key, payload, content_type, dict(attributes)))
+        return key, self._receipt()
+
+    def get_entity(self, entity_key: str) -> Optional[FakeEntity]:
+        self._rpc()
+        return self._entities.get(entity_key)
+
+    def update_entity(self, entity_key: str, payload: bytes, content_type: str, attributes: dict) -> FakeReceipt:
+        self._rpc()
+        if entity_key not in self._entities:
+            raise KeyError(f"entity {entity_key} not found")
+        self._store(FakeEntity(entity_key, payload, content_type, dict(attributes)))
+        return self._receipt()
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch(self)
+
+    def query_entities_page(self, query: str, options=None) -> FakeQueryPage:
+        self._rpc()
+        with self._lock:
+            entities = [e for e in self._entities.values() if e.attributes.get("type") == "sponsored_project"]
+        return FakeQueryPage(entities)
+
+
+class _FakeEth:
+    default_account = "0x000000000000000000000000000000000000bEEF"
+
+
+class FakeArkiv:
+    """Stand-in for `arkiv.Arkiv`; install with `resources.set("arkiv", FakeArkiv(...))`."""
+
+    def __init__(
+        self,
+        latency_median_ms: float = 150.0,
+        latency_sigma: float = 0.4,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.arkiv = FakeArkivModule(latency_median_ms, latency_sigma, error_rate, seed)
+        self.eth = _FakeEth()
+
+    def is_connected(self) -> bool:
+        return True
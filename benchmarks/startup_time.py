@@ -0,0 +1,129 @@
+"""Import-time benchmark of the app.
+
+Imports `src.main` (or `--module`) in fresh interpreters with
+`python -X importtime` and reports, as medians over the runs:
+
+- the wall time of the process and the cumulative import time of the module;
+- the modules with the largest self and cumulative import times;
+- self time summed per top-level package (every microsecond counted once);
+- whether SDKs that should only load on first use (`--deferred`) were
+  imported anyway, and by which module.
+
+Usage:
+    python -m benchmarks.startup_time --runs 5 --top 25
+
+Exits with status 1 when `--budget-ms` is exceeded or a deferred SDK was
+imported, so it can guard startup time in CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFERRED = ("google.genai", "arkiv", "web3", "substrateinterface")
+
+
+def import_times(module: str) -> tuple[float, list[tuple[str, int, int, str | None]]]:
+    """Run one import; returns wall seconds and `(name, self_us, cumulative_us, importer)` rows"""
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    # -X importtime prints children before their parent, deeper by two spaces per level
+    pending: dict[int, list[int]] = defaultdict(list)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append([name.strip(), int(self_us), int(cumulative_us), None])
+        for child in pending.pop(depth + 1, []):
+            rows[child][3] = name.strip()
+        pending[depth].append(len(rows) - 1)
+    return wall, [tuple(row) for row in rows]
+
+
+def run(args: argparse.Namespace) -> dict:
+    walls: list[float] = []
+    self_us: dict[str, list[int]] = defaultdict(list)
+    cumulative_us: dict[str, list[int]] = defaultdict(list)
+    importers: dict[str, str | None] = {}
+    for _ in range(args.runs):
+        wall, rows = import_times(args.module)
+        walls.append(wall)
+        for name, own, cumulative, importer in rows:
+            self_us[name].append(own)
+            cumulative_us[name].append(cumulative)
+            importers.setdefault(name, importer)
+
+    def median_ms(samples: list[int]) -> float:
+        # A module imported in some runs only counts as 0 in the others
+        padded = samples + [0] * (args.runs - len(samples))
+        return round(statistics.median(padded) / 1000, 2)
+
+    per_package: dict[str, float] = defaultdict(float)
+    for name, samples in self_us.items():
+        per_package[name.split(".")[0]] += median_ms(samples)
+
+    deferred = {
+        name: importers.get(name) for name in args.deferred if name in self_us
+    }
+    report = {
+        "module": args.module,
+        "runs": args.runs,
+        "wall_ms": round(statistics.median(walls) * 1000, 1),
+        "import_ms": median_ms(cumulative_us.get(args.module, [])),
+        "modules": len(self_us),
+        "top_self_ms": dict(sorted(
+            ((name, median_ms(samples)) for name, samples in self_us.items()), key=lambda kv: -kv[1]
+        )[:args.top]),
+        "top_cumulative_ms": dict(sorted(
+            ((name, median_ms(samples)) for name, samples in cumulative_us.items() if name != args.module),
+            key=lambda kv: -kv[1],
+        )[:args.top]),
+        "packages_ms": dict(sorted(
+            ((name, round(ms, 2)) for name, ms in per_package.items()), key=lambda kv: -kv[1]
+        )[:args.top]),
+        "deferred_imported": deferred,
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--deferred", nargs="*", default=list(DEFERRED),
+                        help="Packages that must not be imported at startup")
+    parser.add_argument("--budget-ms", type=float, help="Fail if the median import time exceeds this")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args()
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+    failed = bool(report["deferred_imported"])
+    if args.budget_ms is not None and report["import_ms"] > args.budget_ms:
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ from src.models.base_model import SQLModel
 from src.models.project import Project
 from src.models.milestone import Milestone
 from src.models.sponsor import SponsoredProject
+from src.models.evaluation import Evaluation
+from src.models.escrow import EscrowDeployment, EscrowEvent, IndexerCursor
 
 # Use SQLite in-memory database for initial reflection, but we'll compile to PostgreSQL
 engine = create_engine("sqlite:///:memory:", poolclass=NullPool, echo=False)
@@ -6,7 +6,7 @@ import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlmodel import SQLModel
 from src.settings.db import DatabaseSettings
-from src.models import BaseTable, Project, Milestone, SponsoredProject
+from src.models import BaseTable, Project, Milestone, SponsoredProject, Evaluation, EscrowDeployment, EscrowEvent, IndexerCursor
 
 
 async def reset_db():
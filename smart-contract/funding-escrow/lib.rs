@@ -28,23 +28,57 @@ pub mod funding_escrow {
         remaining_amount: Balance,
     }
 
+    /// Estado de un escrow, guardado en una sola celda
+    #[derive(Encode, Decode, Clone, Copy)]
+    #[cfg_attr(feature = "std", derive(scale_info::TypeInfo, ink::storage::traits::StorageLayout, Debug))]
+    pub struct Escrow {
+        admin: AccountId,
+        total_amount: Balance,
+        released_amount: Balance,
+        milestone_count: u32,
+        cancelled: bool,
+        completed: bool,
+    }
+
+    impl Escrow {
+        fn remaining_amount(&self) -> Balance {
+            self.total_amount.saturating_sub(self.released_amount)
+        }
+    }
+
+    /// Estado de un milestone, guardado en una sola celda
+    #[derive(Encode, Decode, Clone, Copy)]
+    #[cfg_attr(feature = "std", derive(scale_info::TypeInfo, ink::storage::traits::StorageLayout, Debug))]
+    pub struct Milestone {
+        percentage: u32,
+        amount: Balance,
+        released: bool,
+        released_at: u64,
+    }
+
     #[ink(storage)]
     pub struct FundingEscrowContract {
-        // Información de escrow por proyecto
+        // Estado por escrow y por milestone: una lectura por consulta
+        escrows: ink::storage::Mapping<AccountId, Escrow>,                 // project_owner -> escrow
+        milestones: ink::storage::Mapping<(AccountId, u32), Milestone>,    // (owner, index) -> milestone
+
+        // Layout anterior (un campo por Mapping). Se conserva con los mismos
+        // nombres para que, tras actualizar el código de un contrato existente
+        // (`set_code`), sus datos sigan siendo legibles; cada escrow/milestone
+        // se migra a `escrows`/`milestones` al modificarlo o con `migrate`.
         escrow_owners: ink::storage::Mapping<AccountId, AccountId>, // project_owner -> admin
         escrow_amounts: ink::storage::Mapping<AccountId, Balance>,  // project_owner -> total_amount
         escrow_released: ink::storage::Mapping<AccountId, Balance>, // project_owner -> released_amount
         escrow_remaining: ink::storage::Mapping<AccountId, Balance>, // project_owner -> remaining_amount
         escrow_cancelled: ink::storage::Mapping<AccountId, bool>,   // project_owner -> is_cancelled
         escrow_completed: ink::storage::Mapping<AccountId, bool>,   // project_owner -> is_completed
-        
-        // Información de milestones
         milestone_counts: ink::storage::Mapping<AccountId, u32>,    // project_owner -> count
         milestone_percentages: ink::storage::Mapping<(AccountId, u32), u32>, // (owner, index) -> percentage
         milestone_amounts: ink::storage::Mapping<(AccountId, u32), Balance>, // (owner, index) -> amount
         milestone_released: ink::storage::Mapping<(AccountId, u32), bool>,   // (owner, index) -> released
         milestone_released_at: ink::storage::Mapping<(AccountId, u32), u64>, // (owner, index) -> timestamp
-        
+
+        // Se mantiene por compatibilidad del layout raíz; ya no crece
         active_projects: Vec<AccountId>,
         project_count: u32,
     }
@@ -53,6 +87,8 @@ pub mod funding_escrow {
         #[ink(constructor)]
         pub fn new() -> Self {
             Self {
+                escrows: ink::storage::Mapping::new(),
+                milestones: ink::storage::Mapping::new(),
                 escrow_owners: ink::storage::Mapping::new(),
                 escrow_amounts: ink::storage::Mapping::new(),
                 escrow_released: ink::storage::Mapping::new(),
@@ -69,6 +105,65 @@ pub mod funding_escrow {
             }
         }
 
+        /// Escrow de `project_owner`, del layout empaquetado o del anterior
+        fn escrow(&self, project_owner: AccountId) -> Option<Escrow> {
+            if let Some(escrow) = self.escrows.get(project_owner) {
+                return Some(escrow);
+            }
+            let admin = self.escrow_owners.get(project_owner)?;
+            Some(Escrow {
+                admin,
+                total_amount: self.escrow_amounts.get(project_owner).unwrap_or(0),
+                released_amount: self.escrow_released.get(project_owner).unwrap_or(0),
+                milestone_count: self.milestone_counts.get(project_owner).unwrap_or(0),
+                cancelled: self.escrow_cancelled.get(project_owner).unwrap_or(false),
+                completed: self.escrow_completed.get(project_owner).unwrap_or(false),
+            })
+        }
+
+        /// Igual que `escrow`, migrando el escrow al layout empaquetado si hace falta
+        fn escrow_mut(&mut self, project_owner: AccountId) -> Option<Escrow> {
+            if let Some(escrow) = self.escrows.get(project_owner) {
+                return Some(escrow);
+            }
+            let escrow = self.escrow(project_owner)?;
+            self.escrows.insert(project_owner, &escrow);
+            self.escrow_owners.remove(project_owner);
+            self.escrow_amounts.remove(project_owner);
+            self.escrow_released.remove(project_owner);
+            self.escrow_remaining.remove(project_owner);
+            self.escrow_cancelled.remove(project_owner);
+            self.escrow_completed.remove(project_owner);
+            self.milestone_counts.remove(project_owner);
+            Some(escrow)
+        }
+
+        fn milestone(&self, key: (AccountId, u32)) -> Option<Milestone> {
+            if let Some(milestone) = self.milestones.get(key) {
+                return Some(milestone);
+            }
+            let amount = self.milestone_amounts.get(key)?;
+            Some(Milestone {
+                percentage: self.milestone_percentages.get(key).unwrap_or(0),
+                amount,
+                released: self.milestone_released.get(key).unwrap_or(false),
+                released_at: self.milestone_released_at.get(key).unwrap_or(0),
+            })
+        }
+
+        fn milestone_mut(&mut self, key: (AccountId, u32)) -> Option<Milestone> {
+            if let Some(milestone) = self.milestones.get(key) {
+                return Some(milestone);
+            }
+            let milestone = self.milestone(key)?;
+            self.milestones.insert(key, &milestone);
+            self.milestone_percentages.remove(key);
+            self.milestone_amounts.remove(key);
+            self.milestone_released.remove(key);
+            self.milestone_released_at.remove(key);
+            Some(milestone)
+        }
+
         #[ink(message, payable)]
         pub fn create_escrow(
             &mut self,
@@ -80,7 +175,7 @@ pub mod funding_escrow {
                 return Err(EscrowError::InsufficientFunds);
             }
 
-            if self.escrow_owners.contains(project_owner) {
+            if self.escrows.contains(project_owner) || self.escrow_owners.contains(project_owner) {
                 return Err(EscrowError::EscrowAlreadyExists);
             }
 
@@ -88,15 +183,17 @@ pub mod funding_escrow {
                 return Err(EscrowError::InvalidMilestoneCount);
             }
 
-            self.escrow_owners.insert(project_owner, &self.env().caller());
-            self.escrow_amounts.insert(project_owner, &deposited);
-            self.escrow_released.insert(project_owner, &0);
-            self.escrow_remaining.insert(project_owner, &deposited);
-            self.escrow_cancelled.insert(project_owner, &false);
-            self.escrow_completed.insert(project_owner, &false);
-            self.milestone_counts.insert(project_owner, &milestone_count);
-
-            self.active_projects.push(project_owner);
+            self.escrows.insert(
+                project_owner,
+                &Escrow {
+                    admin: self.env().caller(),
+                    total_amount: deposited,
+                    released_amount: 0,
+                    milestone_count,
+                    cancelled: false,
+                    completed: false,
+                },
+            );
             self.project_count = self.project_count.saturating_add(1);
 
             self.env().emit_event(EscrowCreated {
@@ -115,29 +212,28 @@ pub mod funding_escrow {
             milestone_index: u32,
             release_percentage: u32,
         ) -> Result<(), EscrowError> {
-            let total_amount = self
-                .escrow_amounts
-                .get(project_owner)
-                .ok_or(EscrowError::EscrowNotFound)?;
+            let escrow = self.escrow(project_owner).ok_or(EscrowError::EscrowNotFound)?;
 
-            if let Some(count) = self.milestone_counts.get(project_owner) {
-                if milestone_index >= count {
-                    return Err(EscrowError::InvalidMilestoneIndex);
-                }
-            } else {
-                return Err(EscrowError::EscrowNotFound);
+            if milestone_index >= escrow.milestone_count {
+                return Err(EscrowError::InvalidMilestoneIndex);
             }
 
-            if self.milestone_percentages.contains((project_owner, milestone_index)) {
+            let key = (project_owner, milestone_index);
+            if self.milestones.contains(key) || self.milestone_percentages.contains(key) {
                 return Err(EscrowError::MilestoneAlreadyExists);
             }
 
-            let amount = total_amount.saturating_div(100).saturating_mul(release_percentage as u128);
+            let amount = escrow.total_amount.saturating_div(100).saturating_mul(release_percentage as u128);
 
-            self.milestone_percentages.insert((project_owner, milestone_index), &release_percentage);
-            self.milestone_amounts.insert((project_owner, milestone_index), &amount);
-            self.milestone_released.insert((project_owner, milestone_index), &false);
-            self.milestone_released_at.insert((project_owner, milestone_index), &0);
+            self.milestones.insert(
+                key,
+                &Milestone {
+                    percentage: release_percentage,
+                    amount,
+                    released: false,
+                    released_at: 0,
+                },
+            );
 
             Ok(())
         }
@@ -148,52 +244,43 @@ pub mod funding_escrow {
             project_owner: AccountId,
             milestone_index: u32,
         ) -> Result<(), EscrowError> {
-            if let Some(is_cancelled) = self.escrow_cancelled.get(project_owner) {
-                if is_cancelled {
+            let escrow = self.escrow_mut(project_owner);
+            if let Some(escrow) = escrow {
+                if escrow.cancelled {
                     return Err(EscrowError::EscrowCancelled);
                 }
-            }
-
-            if let Some(is_completed) = self.escrow_completed.get(project_owner) {
-                if is_completed {
+                if escrow.completed {
                     return Err(EscrowError::EscrowCompleted);
                 }
-            }
-
-            if let Some(count) = self.milestone_counts.get(project_owner) {
-                if milestone_index >= count {
+                if milestone_index >= escrow.milestone_count {
                     return Err(EscrowError::InvalidMilestoneIndex);
                 }
             }
 
-            let amount = self
-                .milestone_amounts
-                .get((project_owner, milestone_index))
-                .ok_or(EscrowError::MilestoneNotFound)?;
+            let key = (project_owner, milestone_index);
+            let mut milestone = self.milestone_mut(key).ok_or(EscrowError::MilestoneNotFound)?;
 
-            if let Some(is_released) = self.milestone_released.get((project_owner, milestone_index)) {
-                if is_released {
-                    return Err(EscrowError::MilestoneAlreadyReleased);
-                }
+            if milestone.released {
+                return Err(EscrowError::MilestoneAlreadyReleased);
             }
 
-            if self.env().transfer(project_owner, amount).is_err() {
+            if self.env().transfer(project_owner, milestone.amount).is_err() {
                 return Err(EscrowError::TransferFailed);
             }
 
-            self.milestone_released.insert((project_owner, milestone_index), &true);
-            self.milestone_released_at.insert((project_owner, milestone_index), &self.env().block_timestamp());
-
-            let released_amount = self.escrow_released.get(project_owner).unwrap_or(0);
-            let remaining_amount = self.escrow_remaining.get(project_owner).unwrap_or(0);
+            milestone.released = true;
+            milestone.released_at = self.env().block_timestamp();
+            self.milestones.insert(key, &milestone);
 
-            self.escrow_released.insert(project_owner, &released_amount.saturating_add(amount));
-            self.escrow_remaining.insert(project_owner, &remaining_amount.saturating_sub(amount));
+            if let Some(mut escrow) = escrow {
+                escrow.released_amount = escrow.released_amount.saturating_add(milestone.amount);
+                self.escrows.insert(project_owner, &escrow);
+            }
 
             self.env().emit_event(FundsReleased {
                 project_owner,
                 milestone_index,
-                amount,
+                amount: milestone.amount,
             });
 
             Ok(())
@@ -201,36 +288,26 @@ pub mod funding_escrow {
 
         #[ink(message)]
         pub fn cancel_escrow(&mut self, project_owner: AccountId) -> Result<(), EscrowError> {
-            let admin = self
-                .escrow_owners
-                .get(project_owner)
-                .ok_or(EscrowError::EscrowNotFound)?;
+            let mut escrow = self.escrow_mut(project_owner).ok_or(EscrowError::EscrowNotFound)?;
 
-            if self.env().caller() != admin {
+            if self.env().caller() != escrow.admin {
                 return Err(EscrowError::Unauthorized);
             }
 
-            if let Some(is_cancelled) = self.escrow_cancelled.get(project_owner) {
-                if is_cancelled {
-                    return Err(EscrowError::CannotCancelEscrow);
-                }
+            if escrow.cancelled || escrow.completed {
+                return Err(EscrowError::CannotCancelEscrow);
             }
 
-            if let Some(is_completed) = self.escrow_completed.get(project_owner) {
-                if is_completed {
-                    return Err(EscrowError::CannotCancelEscrow);
-                }
-            }
-
-            let remaining = self.escrow_remaining.get(project_owner).unwrap_or(0);
+            let remaining = escrow.remaining_amount();
 
             if remaining > 0 {
-                if self.env().transfer(admin, remaining).is_err() {
+                if self.env().transfer(escrow.admin, remaining).is_err() {
                     return Err(EscrowError::TransferFailed);
                 }
             }
 
-            self.escrow_cancelled.insert(project_owner, &true);
+            escrow.cancelled = true;
+            self.escrows.insert(project_owner, &escrow);
 
             self.env().emit_event(EscrowCancelled {
                 project_owner,
@@ -240,14 +317,31 @@ pub mod funding_escrow {
             Ok(())
         }
 
+        /// Migra escrows (y sus milestones) del layout anterior; devuelve cuántos se migraron.
+        /// Solo el admin de cada escrow puede migrarlo: los demás se ignoran.
+        #[ink(message)]
+        pub fn migrate(&mut self, project_owners: Vec<AccountId>) -> u32 {
+            let caller = self.env().caller();
+            let mut migrated: u32 = 0;
+            for project_owner in project_owners {
+                if self.escrows.contains(project_owner) || self.escrow_owners.get(project_owner) != Some(caller) {
+                    continue;
+                }
+                if let Some(escrow) = self.escrow_mut(project_owner) {
+                    for index in 0..escrow.milestone_count {
+                        self.milestone_mut((project_owner, index));
+                    }
+                    migrated = migrated.saturating_add(1);
+                }
+            }
+            migrated
+        }
+
         #[ink(message)]
         pub fn get_escrow_status(&self, project_owner: AccountId) -> Option<(Balance, Balance, bool, bool)> {
-            let total = self.escrow_amounts.get(project_owner)?;
-            let released = self.escrow_released.get(project_owner).unwrap_or(0);
-            let cancelled = self.escrow_cancelled.get(project_owner).unwrap_or(false);
-            let completed = self.escrow_completed.get(project_owner).unwrap_or(false);
+            let escrow = self.escrow(project_owner)?;
 
-            Some((total, released, cancelled, completed))
+            Some((escrow.total_amount, escrow.released_amount, escrow.cancelled, escrow.completed))
         }
 
         #[ink(message)]
@@ -256,10 +350,31 @@ pub mod funding_escrow {
             project_owner: AccountId,
             milestone_index: u32,
         ) -> Option<(Balance, bool)> {
-            let amount = self.milestone_amounts.get((project_owner, milestone_index))?;
-            let released = self.milestone_released.get((project_owner, milestone_index)).unwrap_or(false);
+            let milestone = self.milestone((project_owner, milestone_index))?;
 
-            Some((amount, released))
+            Some((milestone.amount, milestone.released))
+        }
+
+        /// Estado de todos los milestones de un escrow, por índice (None si no se añadió)
+        #[ink(message)]
+        pub fn get_milestones(&self, project_owner: AccountId) -> Vec<Option<(Balance, bool)>> {
+            let count = self.escrow(project_owner).map(|escrow| escrow.milestone_count).unwrap_or(0);
+
+            (0..count)
+                .map(|index| self.get_milestone_status(project_owner, index))
+                .collect()
+        }
+
+        /// `get_escrow_status` de varios escrows en una sola llamada
+        #[ink(message)]
+        pub fn get_escrow_statuses(
+            &self,
+            project_owners: Vec<AccountId>,
+        ) -> Vec<Option<(Balance, Balance, bool, bool)>> {
+            project_owners
+                .into_iter()
+                .map(|project_owner| self.get_escrow_status(project_owner))
+                .collect()
         }
 
         #[ink(message)]
@@ -285,4 +400,128 @@ pub mod funding_escrow {
         Unauthorized,
         CannotCancelEscrow,
     }
+
+    #[cfg(test)]
+    mod tests {
+        use super::*;
+
+        type Env = ink::env::DefaultEnvironment;
+
+        fn accounts() -> ink::env::test::DefaultAccounts<Env> {
+            ink::env::test::default_accounts::<Env>()
+        }
+
+        fn balance(account: AccountId) -> Balance {
+            ink::env::test::get_account_balance::<Env>(account).unwrap_or(0)
+        }
+
+        /// Escrow de `project_owner` con 4 milestones del 25%, creado por alice
+        fn escrow_with_milestones(contract: &mut FundingEscrowContract, project_owner: AccountId, total: Balance) {
+            ink::env::test::set_caller::<Env>(accounts().alice);
+            assert!(ink::env::pay_with_call!(contract.create_escrow(project_owner, 4), total).is_ok());
+            for index in 0..4 {
+                assert!(contract.add_milestone(project_owner, index, 25).is_ok());
+            }
+        }
+
+        /// Escrow escrito con el layout anterior (un campo por Mapping)
+        fn legacy_escrow(contract: &mut FundingEscrowContract, project_owner: AccountId, admin: AccountId, total: Balance) {
+            contract.escrow_owners.insert(project_owner, &admin);
+            contract.escrow_amounts.insert(project_owner, &total);
+            contract.escrow_released.insert(project_owner, &0);
+            contract.escrow_remaining.insert(project_owner, &total);
+            contract.escrow_cancelled.insert(project_owner, &false);
+            contract.escrow_completed.insert(project_owner, &false);
+            contract.milestone_counts.insert(project_owner, &4);
+            for index in 0..4 {
+                let key = (project_owner, index);
+                contract.milestone_percentages.insert(key, &25);
+                contract.milestone_amounts.insert(key, &(total / 4));
+                contract.milestone_released.insert(key, &false);
+                contract.milestone_released_at.insert(key, &0);
+            }
+            let callee = ink::env::test::callee::<Env>();
+            ink::env::test::set_account_balance::<Env>(callee, balance(callee) + total);
+        }
+
+        #[ink::test]
+        fn release_milestone_pays_the_project_owner() {
+            let mut contract = FundingEscrowContract::new();
+            let owner = accounts().django;
+            escrow_with_milestones(&mut contract, owner, 1000);
+
+            let before = balance(owner);
+            assert!(contract.release_milestone(owner, 0).is_ok());
+            assert_eq!(balance(owner), before + 250);
+            assert_eq!(contract.get_milestone_status(owner, 0), Some((250, true)));
+            assert_eq!(contract.get_escrow_status(owner), Some((1000, 250, false, false)));
+
+            assert!(matches!(contract.release_milestone(owner, 0), Err(EscrowError::MilestoneAlreadyReleased)));
+            assert!(matches!(contract.release_milestone(owner, 4), Err(EscrowError::InvalidMilestoneIndex)));
+        }
+
+        #[ink::test]
+        fn cancel_escrow_refunds_the_admin() {
+            let mut contract = FundingEscrowContract::new();
+            let owner = accounts().django;
+            escrow_with_milestones(&mut contract, owner, 1000);
+            assert!(contract.release_milestone(owner, 0).is_ok());
+
+            ink::env::test::set_caller::<Env>(accounts().bob);
+            assert!(matches!(contract.cancel_escrow(owner), Err(EscrowError::Unauthorized)));
+
+            ink::env::test::set_caller::<Env>(accounts().alice);
+            let before = balance(accounts().alice);
+            assert!(contract.cancel_escrow(owner).is_ok());
+            assert_eq!(balance(accounts().alice), before + 750);
+            assert_eq!(contract.get_escrow_status(owner), Some((1000, 250, true, false)));
+
+            assert!(matches!(contract.cancel_escrow(owner), Err(EscrowError::CannotCancelEscrow)));
+            assert!(matches!(contract.release_milestone(owner, 1), Err(EscrowError::EscrowCancelled)));
+        }
+
+        #[ink::test]
+        fn migrate_moves_legacy_escrows_of_the_caller_only() {
+            let mut contract = FundingEscrowContract::new();
+            let (owner, admin) = (accounts().django, accounts().alice);
+            legacy_escrow(&mut contract, owner, admin, 1000);
+
+            ink::env::test::set_caller::<Env>(accounts().bob);
+            assert_eq!(contract.migrate(vec![owner]), 0);
+            assert!(contract.escrow_owners.contains(owner));
+
+            ink::env::test::set_caller::<Env>(admin);
+            assert_eq!(contract.migrate(vec![owner]), 1);
+            assert!(contract.escrows.contains(owner));
+            assert!(!contract.escrow_owners.contains(owner));
+            for index in 0..4 {
+                assert!(contract.milestones.contains((owner, index)));
+                assert!(!contract.milestone_amounts.contains((owner, index)));
+            }
+            assert_eq!(contract.get_escrow_status(owner), Some((1000, 0, false, false)));
+            assert_eq!(contract.get_milestones(owner), vec![Some((250, false)); 4]);
+
+            assert_eq!(contract.migrate(vec![owner]), 0);
+        }
+
+        #[ink::test]
+        fn release_and_cancel_work_on_legacy_escrows() {
+            let mut contract = FundingEscrowContract::new();
+            let (owner, admin) = (accounts().django, accounts().alice);
+            legacy_escrow(&mut contract, owner, admin, 1000);
+
+            let before = balance(owner);
+            assert!(contract.release_milestone(owner, 1).is_ok());
+            assert_eq!(balance(owner), before + 250);
+            assert!(contract.escrows.contains(owner));
+            assert_eq!(contract.get_milestone_status(owner, 1), Some((250, true)));
+            assert_eq!(contract.get_escrow_status(owner), Some((1000, 250, false, false)));
+
+            ink::env::test::set_caller::<Env>(admin);
+            let refunded = balance(admin);
+            assert!(contract.cancel_escrow(owner).is_ok());
+            assert_eq!(balance(admin), refunded + 750);
+            assert_eq!(contract.get_escrow_status(owner), Some((1000, 250, true, false)));
+        }
+    }
 }
@@ -0,0 +1,219 @@
+"""Admission control for routes and outbound dependencies.
+
+An `AdmissionLimiter` lets `concurrency` holders through at once and keeps at
+most `queue_size` more waiting (FIFO, for up to `queue_timeout` seconds);
+anything beyond that is rejected immediately with `OverloadedError`, which
+`overloaded_handler` turns into a response with `Retry-After`:
+
+- route limiters (`evaluate`, `sponsor`, `escrow_writes`) answer 429 and are
+  applied with `dependencies=[admit(limiter)]`, before the endpoint touches
+  the database;
+- dependency limiters (`llm`, `arkiv`, and `substrate` inside
+  `SubstratePool.run`) answer 503 and wrap the outbound call itself.
+
+Work that must not be shed (job workers and background loops, which run at
+a fixed concurrency anyway, and Arkiv syncs following a chain write that
+already happened) runs inside `wait_for_slots()`, where limiters queue it
+without bound instead of rejecting it. Limiters belong to one event loop
+(the app's).
+
+Exported metrics: admission_in_flight{limiter}, admission_queue_depth{limiter},
+admission_wait_seconds{limiter} and admission_rejections_total{limiter, reason}.
+"""
+import asyncio
+import contextvars
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator
+
+from fastapi import Depends, Request, status
+from fastapi.responses import JSONResponse
+
+from src.core.metrics import Counter, Gauge, Histogram
+from src.core.resilience import LatencyWindow
+from src.settings.admission import AdmissionSettings
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight",
+    "Holders of an admission slot, by limiter",
+    ("limiter",),
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth",
+    "Callers waiting for an admission slot, by limiter",
+    ("limiter",),
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "admission_wait_seconds",
+    "Time spent waiting for an admission slot, by limiter",
+    ("limiter",),
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total",
+    "Callers turned away by a limiter, by reason (queue_full, timeout)",
+    ("limiter", "reason"),
+)
+
+_wait = contextvars.ContextVar("admission_wait", default=False)
+
+
+class OverloadedError(Exception):
+    """A limiter rejected the caller; retry after `retry_after` seconds."""
+
+    def __init__(self, limiter: str, reason: str, retry_after: int, status_code: int):
+        super().__init__(f"{limiter} is overloaded ({reason})")
+        self.limiter = limiter
+        self.reason = reason
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+@contextmanager
+def wait_for_slots() -> Iterator[None]:
+    """Within this block (and tasks started from it) limiters wait instead of rejecting"""
+    token = _wait.set(True)
+    try:
+        yield
+    finally:
+        _wait.reset(token)
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded FIFO queue in front of it."""
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: int,
+        queue_size: int,
+        queue_timeout: float = 5.0,
+        status_code: int = status.HTTP_503_SERVICE_UNAVAILABLE,
+    ):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.status_code = status_code
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._holds = LatencyWindow(size=100)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block; raises `OverloadedError` if none is available"""
+        await self._acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._holds.add(time.perf_counter() - started)
+            self._release()
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue has likely drained, from recent slot hold times"""
+        hold = self._holds.quantile(0.5) or 1.0
+        estimate = math.ceil(hold * (len(self._waiters) + 1) / self.concurrency)
+        return max(1, min(AdmissionSettings.MAX_RETRY_AFTER_SECONDS, estimate))
+
+    def _reject(self, reason: str) -> OverloadedError:
+        ADMISSION_REJECTIONS.inc(limiter=self.name, reason=reason)
+        return OverloadedError(self.name, reason, self.retry_after(), self.status_code)
+
+    async def _acquire(self) -> None:
+        if self._in_flight < self.concurrency and not self._waiters:
+            self._in_flight += 1
+            ADMISSION_IN_FLIGHT.set(self._in_flight, limiter=self.name)
+            return
+        wait = _wait.get()
+        if not wait and len(self._waiters) >= self.queue_size:
+            raise self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters), limiter=self.name)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, None if wait else self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over in the same loop iteration as the timeout
+                return
+            raise self._reject("timeout")
+        except BaseException:
+            # Cancelled right after `_release` handed this waiter the slot
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            ADMISSION_QUEUE_DEPTH.set(len(self._waiters), limiter=self.name)
+            ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - started, limiter=self.name)
+
+    def _release(self) -> None:
+        # Hand the slot straight to the oldest waiter, so newcomers cannot overtake the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                ADMISSION_QUEUE_DEPTH.set(len(self._waiters), limiter=self.name)
+                return
+        self._in_flight -= 1
+        ADMISSION_IN_FLIGHT.set(self._in_flight, limiter=self.name)
+
+
+def admit(limiter: AdmissionLimiter):
+    """Route dependency holding a slot of `limiter` while the request is served"""
+
+    async def dependency() -> AsyncIterator[None]:
+        async with limiter.slot():
+            yield
+
+    return Depends(dependency)
+
+
+async def overloaded_handler(request: Request, exc: OverloadedError) -> JSONResponse:
+    """Exception handler answering `OverloadedError` with its status and `Retry-After`"""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _limiter(name: str, concurrency: int, queue_size: int, status_code: int) -> AdmissionLimiter:
+    return AdmissionLimiter(
+        name, concurrency, queue_size, queue_timeout=AdmissionSettings.QUEUE_TIMEOUT_SECONDS, status_code=status_code
+    )
+
+
+_TOO_MANY = status.HTTP_429_TOO_MANY_REQUESTS
+_UNAVAILABLE = status.HTTP_503_SERVICE_UNAVAILABLE
+
+llm_limiter = _limiter("llm", AdmissionSettings.LLM_CONCURRENCY, AdmissionSettings.LLM_QUEUE_SIZE, _UNAVAILABLE)
+arkiv_limiter = _limiter("arkiv", AdmissionSettings.ARKIV_CONCURRENCY, AdmissionSettings.ARKIV_QUEUE_SIZE, _UNAVAILABLE)
+
+evaluate_limiter = _limiter(
+    "evaluate", AdmissionSettings.EVALUATE_CONCURRENCY, AdmissionSettings.EVALUATE_QUEUE_SIZE, _TOO_MANY
+)
+sponsor_limiter = _limiter(
+    "sponsor", AdmissionSettings.SPONSOR_CONCURRENCY, AdmissionSettings.SPONSOR_QUEUE_SIZE, _TOO_MANY
+)
+escrow_writes_limiter = _limiter(
+    "escrow_writes", AdmissionSettings.ESCROW_WRITES_CONCURRENCY, AdmissionSettings.ESCROW_WRITES_QUEUE_SIZE, _TOO_MANY
+)
+
+
+def substrate_limiter(pool_size: int) -> AdmissionLimiter:
+    """Limiter for `SubstratePool.run`: one slot per pooled connection"""
+    return _limiter("substrate", pool_size, AdmissionSettings.SUBSTRATE_QUEUE_SIZE, _UNAVAILABLE)
@@ -1,14 +1,37 @@
+from typing import TYPE_CHECKING
+
 from loguru import logger
-from web3 import HTTPProvider
 
-from arkiv import Arkiv
-from arkiv.account import NamedAccount
+from src.core.instrumentation import track_dependency
+from src.core.resources import resources
 from src.settings.arkiv import ArkivSettings
 
+if TYPE_CHECKING:
+    from arkiv import Arkiv
+
+
+def _instrumented_provider(url: str):
+    """HTTPProvider timing each JSON-RPC request into the `arkiv` dependency metrics."""
+    from web3 import HTTPProvider
+
+    class _InstrumentedHTTPProvider(HTTPProvider):
+        def make_request(self, method, params):
+            with track_dependency("arkiv", method):
+                return super().make_request(method, params)
+
+        def make_batch_request(self, batch_requests):
+            with track_dependency("arkiv", "batch"):
+                return super().make_batch_request(batch_requests)
+
+    return _InstrumentedHTTPProvider(url)
 
-def get_arkiv_client() -> Arkiv:
-    """Create and return an Arkiv client instance."""
-    provider = HTTPProvider(ArkivSettings.HTTP_PROVIDER)
+
+def create_arkiv_client() -> "Arkiv":
+    """Create an Arkiv client instance (imports the Arkiv SDK and web3)."""
+    from arkiv import Arkiv
+    from arkiv.account import NamedAccount
+
+    provider = _instrumented_provider(ArkivSettings.HTTP_PROVIDER)
     account = NamedAccount.from_private_key(
         ArkivSettings.PRIVATE_NAME, ArkivSettings.PRIVATE_KEY.get_secret_value()
     )
@@ -16,3 +39,11 @@ def get_arkiv_client() -> Arkiv:
     logger.info("Connecting to: {}", client.is_connected())
     logger.info("Account: {}", client.eth.default_account)
     return client
+
+
+resources.register("arkiv", create_arkiv_client)
+
+
+def get_arkiv_client() -> "Arkiv":
+    """Return the shared Arkiv client (built on first use or at warm-up)."""
+    return resources.get("arkiv")
@@ -1,29 +1,87 @@
 """Async database helpers compatible with SQLModel.
 
 Provides:
-- engine: AsyncEngine built from `DBSettings.sqlalchemy_url` (converted
-  to use asyncpg when appropriate)
-- AsyncSessionLocal: sessionmaker factory producing AsyncSession
+- get_engine(): the AsyncEngine built from `DatabaseSettings.get_url`
+  (`DATABASE_URL`, or the `DATABASE_*` parts) on first use
+- AsyncSessionLocal: sessionmaker factory producing AsyncSession; it binds
+  to the engine the first time a session is made, unless configured with
+  another bind (`AsyncSessionLocal.configure(bind=...)`)
 - get_async_session: FastAPI dependency that yields an AsyncSession
 
+Every statement is timed into the `db` dependency metrics (see
+`src.core.instrumentation`), labelled by its SQL verb.
+
 This module uses SQLAlchemy's async APIs and is compatible with sqlmodel.
 """
+import re
 from typing import AsyncGenerator
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
                                     create_async_engine)
 from sqlalchemy.orm import sessionmaker
 
+from src.core.instrumentation import dependency_finished, dependency_started
+from src.core.resources import resources
 from src.settings.db import DatabaseSettings
 
-# Create async engine
-# Use future=True for SQLAlchemy 2.0 style
-engine: AsyncEngine = create_async_engine(DatabaseSettings.get_url, future=True)
+
+# SQL verbs used as the metrics `operation` label; anything else is "other"
+_OPERATIONS = {"select", "insert", "update", "delete", "with"}
+_VERB = re.compile(r"\s*(\w+)")
+
+
+def _operation(statement: str) -> str:
+    match = _VERB.match(statement)
+    verb = match.group(1).lower() if match else ""
+    return verb if verb in _OPERATIONS else "other"
+
+
+def _instrument(engine: AsyncEngine) -> None:
+    """Time every statement executed through `engine`."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(dependency_started("db"))
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        dependency_finished("db", _operation(statement), conn.info["query_started"].pop())
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            dependency_finished("db", _operation(context.statement or ""), started.pop(), context.original_exception)
+
+
+def _create_engine() -> AsyncEngine:
+    # Use future=True for SQLAlchemy 2.0 style
+    engine = create_async_engine(DatabaseSettings.get_url, future=True)
+    _instrument(engine)
+    return engine
+
+
+resources.register("db_engine", _create_engine, close=lambda engine: engine.dispose())
+
+
+def get_engine() -> AsyncEngine:
+    """The app's database engine (built on first use)."""
+    return resources.get("db_engine")
+
+
+class _LazySessionMaker(sessionmaker):
+    """`sessionmaker` that binds to the app engine when the first session is made."""
+
+    def __call__(self, **local_kw) -> AsyncSession:
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
 
 
 # Async session factory
-AsyncSessionLocal = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+AsyncSessionLocal = _LazySessionMaker(
+    class_=AsyncSession, expire_on_commit=False, autoflush=False
 )
 
 
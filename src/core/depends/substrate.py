@@ -0,0 +1,299 @@
+"""Persistent, pooled connections to the contracts chain.
+
+`SubstrateInterface` is synchronous and opening one costs a websocket
+handshake plus metadata/type-registry decoding, so the app keeps a small pool
+of long-lived connections instead of connecting per request:
+
+- substrate_pool: `SubstratePool` started/stopped from the FastAPI lifespan
+- get_substrate_pool: FastAPI dependency returning the pool
+
+Blocking calls run on the pool's own thread executor (one thread per
+connection) via `await substrate_pool.run(fn, *args)`, where `fn` receives
+the connection as first argument. Dropped connections are reopened and the
+call retried once; idle connections are pinged every
+`ROCOCO_KEEPALIVE_SECONDS`, which also picks up runtime upgrades. Decoded
+metadata is shared between connections per runtime (spec) version.
+
+With `ROCOCO_BACKEND=simulated` the pool talks to an in-process simulated
+contracts node instead (see `src.core.simulated_chain`).
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, TypeVar
+
+from loguru import logger
+from websocket import WebSocketException
+
+from src.core.admission import OverloadedError, substrate_limiter
+from src.core.instrumentation import track_dependency
+from src.core.metrics import Counter, Histogram
+from src.settings.rococo import RococoSettings
+
+if TYPE_CHECKING:
+    from substrateinterface import SubstrateInterface
+
+T = TypeVar("T")
+
+RECONNECTS = Counter(
+    "substrate_reconnects_total",
+    "Substrate websocket connections (re)opened by the pool",
+)
+CALL_SECONDS = Histogram(
+    "substrate_call_duration_seconds",
+    "Duration of blocking Substrate calls run through the pool, by outcome (ok, error)",
+    ("outcome",),
+)
+
+# Errors that mean the websocket is gone (as opposed to an RPC/runtime error)
+CONNECTION_ERRORS = (ConnectionError, TimeoutError, OSError, WebSocketException)
+
+
+class RuntimeMetadataCache:
+    """Metadata cache shared by all pooled connections, keyed by spec version.
+
+    Implements the `get`/`set` subset of a dogpile cache region that
+    `SubstrateInterface(cache_region=...)` uses, so metadata for a runtime
+    version is fetched and decoded once per process rather than once per
+    connection.
+    """
+
+    def __init__(self, max_versions: int = 4):
+        self.max_versions = max_versions
+        self._entries: Dict[str, Any] = {}
+
+    def get(self, key: str) -> Any:
+        return self._entries.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        while len(self._entries) > self.max_versions:
+            self._entries.pop(next(iter(self._entries)))
+
+
+class _Slot:
+    """One pooled connection; `substrate` is None until (re)connected."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.substrate: Optional[SubstrateInterface] = None
+        self.last_used = 0.0
+
+
+class SubstratePool:
+    """Fixed-size pool of `SubstrateInterface` connections."""
+
+    def __init__(self, url: str, size: int = 2, keepalive_seconds: float = 30.0, socket_timeout: float = 60.0):
+        self.url = url
+        self.size = max(1, size)
+        self.keepalive_seconds = keepalive_seconds
+        self.socket_timeout = socket_timeout
+        self.metadata_cache = RuntimeMetadataCache()
+        self.chain: Optional[str] = None
+        self.runtime: Optional[Dict[str, Any]] = None
+        self._runtime_listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._slots = [_Slot(i) for i in range(self.size)]
+        self.admission = substrate_limiter(self.size)
+        self._idle: asyncio.Queue[_Slot] = asyncio.Queue()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._keepalive_task: Optional[asyncio.Task] = None
+
+    @property
+    def spec_version(self) -> Optional[int]:
+        return self.runtime.get("specVersion") if self.runtime else None
+
+    def on_runtime_upgrade(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Register `listener(runtime_version)`, called when the spec version changes."""
+        self._runtime_listeners.append(listener)
+
+    async def start(self) -> None:
+        """Create the executor and open connections in the background.
+
+        Startup does not wait for the node: connections that cannot be opened
+        now are opened lazily by the first call that needs them.
+        """
+        if self._executor is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="substrate")
+        for slot in self._slots:
+            self._idle.put_nowait(slot)
+        self._keepalive_task = asyncio.create_task(self._keepalive(), name="substrate-keepalive")
+
+    async def stop(self) -> None:
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            await asyncio.gather(self._keepalive_task, return_exceptions=True)
+            self._keepalive_task = None
+        for slot in self._slots:
+            self._close(slot)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._idle = asyncio.Queue()
+
+    def _connect(self, slot: _Slot) -> SubstrateInterface:
+        """Open the slot's connection (runs on the executor)."""
+        from substrateinterface import SubstrateInterface
+
+        self._close(slot)
+        substrate = SubstrateInterface(
+            url=self.url,
+            cache_region=self.metadata_cache,
+            ws_options={"timeout": self.socket_timeout},
+        )
+        if self.chain is None:
+            self.chain = substrate.chain
+        slot.substrate = substrate
+        RECONNECTS.inc()
+        logger.info("Substrate connection {} opened to {} ({})", slot.index, self.url, self.chain)
+        return substrate
+
+    @staticmethod
+    def _close(slot: _Slot) -> None:
+        if slot.substrate is not None:
+            try:
+                slot.substrate.close()
+            except Exception:
+                pass
+            slot.substrate = None
+
+    def _call(self, slot: _Slot, fn: Callable[..., T], args: tuple, kwargs: dict, idempotent: bool = True) -> T:
+        """Run `fn` on the slot's connection, reconnecting (and retrying once if `idempotent`) if it dropped."""
+        substrate = slot.substrate or self._connect(slot)
+        try:
+            return fn(substrate, *args, **kwargs)
+        except CONNECTION_ERRORS as e:
+            if not idempotent:
+                # `fn` may have submitted an extrinsic before the drop: leave reconciling it to the caller
+                logger.warning("Substrate connection {} dropped ({}), not retrying", slot.index, e)
+                self._close(slot)
+                raise
+            logger.warning("Substrate connection {} dropped ({}), reconnecting", slot.index, e)
+            return fn(self._connect(slot), *args, **kwargs)
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        operation: Optional[str] = None,
+        idempotent: bool = True,
+        **kwargs: Any,
+    ) -> T:
+        """Run blocking `fn(substrate, *args, **kwargs)` on a pooled connection.
+
+        At most `size` calls run at once; further callers wait for a free
+        connection without blocking the event loop, up to
+        `ADMISSION_SUBSTRATE_QUEUE_SIZE` of them (then `OverloadedError`).
+        `operation` labels the call in the dependency metrics (default: the
+        name of `fn`). Calls that submit extrinsics must pass
+        `idempotent=False`: they are not re-run when the connection drops,
+        since the extrinsic may already have been included.
+        """
+        if self._executor is None:
+            raise RuntimeError("Substrate pool is not started")
+        async with self.admission.slot():
+            return await self._run(fn, args, kwargs, operation, idempotent)
+
+    async def _run(
+        self, fn: Callable[..., T], args: tuple, kwargs: dict, operation: Optional[str], idempotent: bool
+    ) -> T:
+        idle = self._idle
+        slot = await idle.get()
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+
+        def done(future: concurrent.futures.Future) -> None:
+            # Runs when the executor call has finished (or was cancelled before starting), not when
+            # the awaiting task is cancelled, so a connection is never shared by two threads
+            outcome = "ok" if not future.cancelled() and future.exception() is None else "error"
+            slot.last_used = time.monotonic()
+            CALL_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+            try:
+                loop.call_soon_threadsafe(idle.put_nowait, slot)
+            except RuntimeError:
+                pass  # Loop closed: the pool is gone with it
+
+        try:
+            future = self._executor.submit(self._call, slot, fn, args, kwargs, idempotent)
+        except BaseException:
+            idle.put_nowait(slot)
+            raise
+        future.add_done_callback(done)
+        with track_dependency("substrate", operation or getattr(fn, "__name__", "call")):
+            return await asyncio.wrap_future(future, loop=loop)
+
+    async def ping(self) -> bool:
+        """Return True if a pooled connection can reach the node."""
+        try:
+            await self.run(self._refresh_runtime)
+            return True
+        except OverloadedError:
+            raise
+        except Exception as e:
+            logger.warning("Substrate node unreachable at {}: {}", self.url, e)
+            return False
+
+    def _refresh_runtime(self, substrate: SubstrateInterface) -> Dict[str, Any]:
+        """Fetch the current runtime version and notify listeners on upgrades."""
+        runtime = substrate.rpc_request("state_getRuntimeVersion", [])["result"]
+        previous = self.spec_version
+        self.runtime = runtime
+        if previous is not None and runtime.get("specVersion") != previous:
+            logger.info("Runtime upgraded: spec version {} -> {}", previous, runtime.get("specVersion"))
+            for listener in self._runtime_listeners:
+                try:
+                    listener(runtime)
+                except Exception:
+                    logger.exception("Runtime upgrade listener failed")
+        return runtime
+
+    async def _keepalive(self) -> None:
+        """Open missing connections, then ping idle ones every `keepalive_seconds`."""
+        while True:
+            due = time.monotonic() - self.keepalive_seconds
+            for _ in range(self.size):
+                slot = await self._idle.get()
+                try:
+                    if slot.substrate is None or slot.last_used <= due:
+                        loop = asyncio.get_running_loop()
+                        await loop.run_in_executor(
+                            self._executor, partial(self._call, slot, self._refresh_runtime, (), {})
+                        )
+                        slot.last_used = time.monotonic()
+                except Exception as e:
+                    self._close(slot)
+                    logger.warning("Substrate keep-alive failed on connection {}: {}", slot.index, e)
+                finally:
+                    self._idle.put_nowait(slot)
+            await asyncio.sleep(self.keepalive_seconds)
+
+
+def is_simulated(substrate: Any) -> bool:
+    """Whether a connection is the in-process simulated node rather than a `SubstrateInterface`"""
+    return getattr(substrate, "simulated", False) is True
+
+
+def _create_pool() -> SubstratePool:
+    """Pool for the configured backend (`ROCOCO_BACKEND`)"""
+    if RococoSettings.BACKEND == "simulated":
+        from src.core.simulated_chain import SimulatedChainPool
+
+        return SimulatedChainPool(size=RococoSettings.POOL_SIZE, keepalive_seconds=RococoSettings.KEEPALIVE_SECONDS)
+    return SubstratePool(
+        RococoSettings.RPC_URL,
+        size=RococoSettings.POOL_SIZE,
+        keepalive_seconds=RococoSettings.KEEPALIVE_SECONDS,
+        socket_timeout=RococoSettings.SOCKET_TIMEOUT_SECONDS,
+    )
+
+
+substrate_pool = _create_pool()
+
+
+def get_substrate_pool() -> SubstratePool:
+    """FastAPI dependency returning the shared Substrate connection pool."""
+    return substrate_pool
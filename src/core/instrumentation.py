@@ -0,0 +1,135 @@
+"""Latency, in-flight and error metrics for routes and outbound dependencies.
+
+- RequestMetricsMiddleware: ASGI middleware timing every HTTP request by
+  method, route template (e.g. `/api/v1/arkiv/escrow/{owner}`) and status.
+- track_dependency(dependency, operation): context manager timing a call to
+  an outbound dependency (`db`, `arkiv`, `llm`, `substrate`); usable around
+  blocking code and around `await`s.
+- dependency_started / dependency_finished: the same, split in two for
+  callback-style hooks (SQLAlchemy cursor events).
+
+Everything is rendered by `GET /metrics` with the rest of `src.core.metrics`.
+"""
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.metrics import Counter, Gauge, Histogram
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Duration of HTTP requests, by method, route template and status code",
+    ("method", "route", "status"),
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being served",
+)
+HTTP_ERRORS = Counter(
+    "http_request_errors_total",
+    "HTTP requests that raised or answered 5xx, by method, route template and error",
+    ("method", "route", "error"),
+)
+
+DEPENDENCY_SECONDS = Histogram(
+    "dependency_call_duration_seconds",
+    "Duration of calls to outbound dependencies (db, arkiv, llm, substrate), by operation and outcome",
+    ("dependency", "operation", "outcome"),
+)
+DEPENDENCY_IN_FLIGHT = Gauge(
+    "dependency_calls_in_flight",
+    "Calls to an outbound dependency that have not returned yet",
+    ("dependency",),
+)
+DEPENDENCY_ERRORS = Counter(
+    "dependency_errors_total",
+    "Failed calls to outbound dependencies, by operation and exception type",
+    ("dependency", "operation", "error"),
+)
+
+# Requests that matched no route share one label instead of one per raw path
+UNMATCHED_ROUTE = "unmatched"
+
+
+def dependency_started(dependency: str) -> float:
+    """Count a call to `dependency` as in flight; returns its start time"""
+    DEPENDENCY_IN_FLIGHT.inc(dependency=dependency)
+    return time.perf_counter()
+
+
+def dependency_finished(
+    dependency: str, operation: str, started: float, error: Optional[BaseException] = None
+) -> None:
+    """Record a call started with `dependency_started`.
+
+    Cancellation (e.g. the losing side of a hedged call) is recorded with
+    outcome `cancelled` and is not counted as an error.
+    """
+    DEPENDENCY_IN_FLIGHT.dec(dependency=dependency)
+    if error is None:
+        outcome = "ok"
+    elif isinstance(error, Exception):
+        outcome = "error"
+        DEPENDENCY_ERRORS.inc(dependency=dependency, operation=operation, error=type(error).__name__)
+    else:
+        outcome = "cancelled"
+    DEPENDENCY_SECONDS.observe(
+        time.perf_counter() - started, dependency=dependency, operation=operation, outcome=outcome
+    )
+
+
+@contextmanager
+def track_dependency(dependency: str, operation: str) -> Iterator[None]:
+    """Time the enclosed call to `dependency`"""
+    started = dependency_started(dependency)
+    try:
+        yield
+    except BaseException as e:
+        dependency_finished(dependency, operation, started, e)
+        raise
+    dependency_finished(dependency, operation, started)
+
+
+class RequestMetricsMiddleware:
+    """Record latency, in-flight count and errors of HTTP requests.
+
+    The route label is the matched route's path template, read from the
+    scope after routing, so path parameters do not create new series.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            if error is None and status >= 500:
+                error = f"http_{status}"
+            if error is not None:
+                HTTP_ERRORS.inc(method=method, route=route, error=error)
+            HTTP_REQUEST_SECONDS.observe(elapsed, method=method, route=route, status=str(status))
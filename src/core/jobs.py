@@ -0,0 +1,62 @@
+"""Minimal in-process job queue.
+
+Jobs are identified by the primary key of a DB row that holds their state,
+so the queue itself only carries IDs and can be rebuilt from the table after
+a restart. Each queue runs a fixed number of worker tasks for the lifetime of
+the app (started and stopped from the FastAPI lifespan).
+"""
+import asyncio
+from typing import Awaitable, Callable, List
+
+from loguru import logger
+
+from src.core.admission import wait_for_slots
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted to a queue that is at capacity."""
+
+
+class JobQueue:
+    """Bounded asyncio queue drained by `workers` tasks calling `handler(job_id)`."""
+
+    def __init__(self, name: str, handler: Callable[[int], Awaitable[None]], workers: int = 1, maxsize: int = 0):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self._queue: asyncio.Queue[int] = asyncio.Queue(maxsize=maxsize)
+        self._tasks: List[asyncio.Task] = []
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, job_id: int) -> None:
+        try:
+            self._queue.put_nowait(job_id)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"{self.name} queue is full")
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-worker-{i}") for i in range(self.workers)
+        ]
+        logger.info("Started {} {} workers", self.workers, self.name)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                with wait_for_slots():
+                    await self.handler(job_id)
+            except Exception:
+                logger.exception("{} job {} failed", self.name, job_id)
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,212 @@
+"""Event loop lag monitor.
+
+A heartbeat task sleeps `LOOP_MONITOR_INTERVAL_SECONDS` in a loop and
+records how late it wakes up (the scheduling delay every other coroutine
+sees). A watchdog thread notices when the heartbeat is overdue by more than
+`LOOP_MONITOR_BLOCK_THRESHOLD_SECONDS`, captures the stack of the blocked
+loop thread, and attributes it to the route of the task that holds the loop
+(`background` for tasks that are not serving a request).
+
+Exported metrics:
+
+- event_loop_lag_seconds: histogram of heartbeat lag;
+- event_loop_lag_quantile_seconds{quantile}: p50/p90/p99 over the last minute;
+- event_loop_blocks_total{route} and event_loop_block_duration_seconds{route}.
+
+With `LOOP_MONITOR_STRICT=true` (meant for tests) a request that blocked the
+loop fails with `LoopBlockedError`, so a synchronous call in an async route
+is caught instead of just slowing other requests down.
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from loguru import logger
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.instrumentation import UNMATCHED_ROUTE
+from src.core.metrics import Counter, Gauge, Histogram
+from src.core.resilience import LatencyWindow
+from src.settings.loop_monitor import LoopMonitorSettings
+
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUANTILES = (0.5, 0.9, 0.99)
+
+LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when the loop heartbeat was due and when it ran",
+    buckets=LAG_BUCKETS,
+)
+LOOP_LAG_QUANTILES = Gauge(
+    "event_loop_lag_quantile_seconds",
+    "Event loop lag quantiles over the last minute of heartbeats",
+    ("quantile",),
+)
+LOOP_BLOCKS = Counter(
+    "event_loop_blocks_total",
+    "Times the event loop was blocked past the threshold, by route holding the loop",
+    ("route",),
+)
+LOOP_BLOCK_SECONDS = Histogram(
+    "event_loop_block_duration_seconds",
+    "How long the event loop stayed blocked, by route holding the loop",
+    ("route",),
+    buckets=LAG_BUCKETS,
+)
+
+BACKGROUND = "background"
+# Innermost frames of the blocked stack kept in logs and errors
+STACK_DEPTH = 12
+
+
+class LoopBlockedError(RuntimeError):
+    """A request blocked the event loop (raised in strict mode)."""
+
+
+@dataclass
+class _Stall:
+    started: float
+    route: str
+    task: Optional[asyncio.Task]
+    stack: str
+
+
+class LoopMonitor:
+    """Heartbeat task plus watchdog thread for one event loop."""
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, strict: bool = False):
+        self.interval = interval
+        self.threshold = threshold
+        self.strict = strict
+        self._window = LatencyWindow(size=max(1, int(60 / interval)))
+        self._requests: Dict[asyncio.Task, Scope] = {}
+        self._blocked: Dict[asyncio.Task, str] = {}
+        self._beat = time.perf_counter()
+        self._stall: Optional[_Stall] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._watchdog.join()
+        self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        beats_per_update = max(1, int(1 / self.interval))
+        beats = 0
+        while True:
+            due = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self._beat = now
+            lag = max(0.0, now - due)
+            LOOP_LAG_SECONDS.observe(lag)
+            self._window.add(lag)
+            stall, self._stall = self._stall, None
+            if stall is not None:
+                self._record(stall, now)
+            beats += 1
+            if beats % beats_per_update == 0:
+                for q in QUANTILES:
+                    LOOP_LAG_QUANTILES.set(self._window.quantile(q), quantile=str(q))
+
+    def _watch(self) -> None:
+        """Watchdog thread: capture the loop's stack once per stall"""
+        while not self._stop.wait(self.interval):
+            if self._stall is not None:
+                continue
+            blocked_for = time.perf_counter() - self._beat - self.interval
+            if blocked_for < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            task = asyncio.current_task(self._loop)
+            if frame is None or task is self._task:
+                continue
+            stack = "".join(traceback.format_list(traceback.extract_stack(frame)[-STACK_DEPTH:]))
+            scope = self._requests.get(task)
+            route = self._route(scope) if scope is not None else BACKGROUND
+            self._stall = _Stall(self._beat + self.interval, route, task, stack)
+            logger.warning(
+                "Event loop blocked for over {:.0f} ms by {} (task {}) at:\n{}",
+                blocked_for * 1000, route, task.get_name() if task else None, stack,
+            )
+
+    def _record(self, stall: _Stall, now: float) -> None:
+        duration = now - stall.started
+        LOOP_BLOCKS.inc(route=stall.route)
+        LOOP_BLOCK_SECONDS.observe(duration, route=stall.route)
+        logger.warning("Event loop was blocked for {:.0f} ms by {}", duration * 1000, stall.route)
+        if self.strict and stall.task in self._requests:
+            self._blocked[stall.task] = (
+                f"{stall.route} blocked the event loop for {duration * 1000:.0f} ms at:\n{stall.stack}"
+            )
+
+    @staticmethod
+    def _route(scope: Scope) -> str:
+        route = scope.get("route")
+        return f"{scope['method']} {route.path if route is not None else UNMATCHED_ROUTE}"
+
+    def enter(self, scope: Scope) -> None:
+        """Attribute stalls of the current task to the request `scope`"""
+        self._requests[asyncio.current_task()] = scope
+
+    def leave(self) -> Optional[str]:
+        """Stop attributing stalls to the current task; returns its stall report, if any"""
+        task = asyncio.current_task()
+        stall = self._stall
+        if stall is not None and stall.task is task:
+            # The request may finish before the heartbeat gets to run again
+            self._stall = None
+            self._record(stall, time.perf_counter())
+        self._requests.pop(task, None)
+        return self._blocked.pop(task, None)
+
+
+class LoopMonitorMiddleware:
+    """Register each request with the loop monitor; in strict mode fail requests that blocked it."""
+
+    def __init__(self, app: ASGIApp, monitor: LoopMonitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self.monitor.enter(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            report = self.monitor.leave()
+        if report is not None:
+            raise LoopBlockedError(report)
+
+
+loop_monitor = LoopMonitor(
+    interval=LoopMonitorSettings.INTERVAL_SECONDS,
+    threshold=LoopMonitorSettings.BLOCK_THRESHOLD_SECONDS,
+    strict=LoopMonitorSettings.STRICT,
+)
@@ -0,0 +1,107 @@
+"""Local nonce allocation for a signing account.
+
+Extrinsics from one account must carry consecutive nonces. Asking the node
+for the next nonce before every submission only works if submissions are
+serialized; with several deployments/releases in flight they would all get
+the same nonce. `NonceManager` hands nonces out locally instead:
+
+- reserve: atomically take the next nonce (re-synced from the chain whenever
+  nothing is in flight, so other tools using the same key are picked up)
+- confirm: the extrinsic was accepted by the node
+- release: the extrinsic was rejected or its fate is unknown; the nonce is
+  kept aside and `reconcile` decides from `system_accountNextIndex` whether
+  it was used or must be reused to fill the gap
+
+Methods are thread-safe: they are called from the Substrate pool's executor.
+"""
+import threading
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from loguru import logger
+
+from src.core.metrics import Counter
+
+NONCE_EVENTS = Counter(
+    "nonce_events_total",
+    "Nonce allocator events (reserved, confirmed, released, reconciled, reused)",
+    ("event",),
+)
+
+
+class NonceManager:
+    """Allocate nonces for one account."""
+
+    def __init__(self, account: str):
+        self.account = account
+        self._next: Optional[int] = None
+        self._in_flight: Set[int] = set()
+        self._released: Set[int] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def reserve(self, fetch: Callable[[], int]) -> int:
+        """Reserve a nonce; `fetch()` is only called when nothing is in flight."""
+        with self._lock:
+            if not self._in_flight:
+                self._sync(fetch())
+            if self._released:
+                nonce = min(self._released)
+                self._released.discard(nonce)
+                NONCE_EVENTS.inc(event="reused")
+            else:
+                nonce = self._next
+                self._next += 1
+            self._in_flight.add(nonce)
+            NONCE_EVENTS.inc(event="reserved")
+            return nonce
+
+    def confirm(self, nonce: int) -> None:
+        """The extrinsic with `nonce` was accepted (in the pool or in a block)."""
+        with self._lock:
+            self._in_flight.discard(nonce)
+            NONCE_EVENTS.inc(event="confirmed")
+
+    def release(self, nonce: int) -> None:
+        """The extrinsic with `nonce` was rejected, never sent, or its fate is unknown."""
+        with self._lock:
+            self._in_flight.discard(nonce)
+            self._released.add(nonce)
+            NONCE_EVENTS.inc(event="released")
+
+    def reconcile(self, chain_next: int) -> None:
+        """Resolve released nonces against the chain's next index.
+
+        `system_accountNextIndex` counts on-chain and ready pool extrinsics, so
+        released nonces below it were used after all; those at or above it
+        are gaps that the next reservations fill first.
+        """
+        with self._lock:
+            self._sync(chain_next)
+            NONCE_EVENTS.inc(event="reconciled")
+
+    def _sync(self, chain_next: int) -> None:
+        if not self._in_flight:
+            # Nothing outstanding: the chain is authoritative
+            if self._next is not None and self._next != chain_next:
+                logger.info("Nonce for {} re-synced: {} -> {}", self.account, self._next, chain_next)
+            self._next = chain_next
+            self._released.clear()
+            return
+        self._released = {n for n in self._released if n >= chain_next}
+        self._next = max(self._next or 0, chain_next)
+
+
+_managers: Dict[Tuple[str, str], NonceManager] = {}
+_managers_lock = threading.Lock()
+
+
+def nonce_manager(rpc_url: str, account: str) -> NonceManager:
+    """Return the process-wide NonceManager for `account` on the chain at `rpc_url`."""
+    with _managers_lock:
+        key = (rpc_url, account)
+        if key not in _managers:
+            _managers[key] = NonceManager(account)
+        return _managers[key]
@@ -0,0 +1,236 @@
+"""On-demand sampling profiler for single requests.
+
+With `PROFILING_TOKEN` set, a request carrying `X-Profile: <token>` (or
+`?profile=<token>`) is sampled every `PROFILING_INTERVAL_SECONDS` by a
+background thread, and the samples are written in the folded-stack format
+read by flamegraph.pl, speedscope and inferno. Without the token the
+middleware is not installed at all, so normal requests pay nothing.
+
+Each sample is wall-clock:
+
+- `request;...`: the request's task; its Python stack while it runs on the
+  event loop, or its await chain (ending in `[await <Future>]`) while it is
+  suspended on I/O.
+- `thread <name>;...`: other threads doing work at that moment (sync
+  endpoints and dependencies in the thread pool, Substrate pool calls).
+  Threads waiting for work are skipped; work done for concurrent requests
+  can show up here too.
+
+The profile replaces the response body (the original status is in the
+`X-Profiled-Status` header), or, with `PROFILING_DIR` set, is stored there
+and the response carries its path in `X-Profile-File`.
+"""
+import asyncio
+import hmac
+import os
+import re
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+ROOT = str(Path(__file__).resolve().parents[2]) + os.sep
+STDLIB = sysconfig.get_paths()["stdlib"] + os.sep
+# Frames of these files are loop/pool plumbing rather than request work
+_LOOP_PLUMBING = os.sep + os.path.join("asyncio", "events.py")
+_THREADING = os.sep + "threading.py"
+_IDLE_FILES = tuple(os.sep + name for name in ("threading.py", "queue.py", "selectors.py"))
+
+
+class _Labels:
+    """`qualname (path:line)` per code object, with paths shortened."""
+
+    def __init__(self):
+        self._cache: Dict[object, str] = {}
+
+    def __call__(self, code) -> str:
+        label = self._cache.get(code)
+        if label is None:
+            path = code.co_filename
+            if path.startswith(ROOT):
+                path = path[len(ROOT):]
+            elif "site-packages" + os.sep in path:
+                path = path.split("site-packages" + os.sep, 1)[1]
+            elif path.startswith(STDLIB):
+                path = path[len(STDLIB):]
+            label = self._cache[code] = f"{code.co_qualname} ({path}:{code.co_firstlineno})"
+        return label
+
+
+class RequestSampler:
+    """Background thread sampling one request's task and the busy threads."""
+
+    def __init__(self, task: asyncio.Task, loop: asyncio.AbstractEventLoop, interval: float):
+        self.task = task
+        self.loop = loop
+        self.loop_thread = threading.get_ident()
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._label = _Labels()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        """Samples in folded-stack format (`frame;frame;... count` per line)"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == self._thread.ident:
+                continue
+            if ident == self.loop_thread:
+                stack = self._task_stack(frame)
+            else:
+                stack = self._thread_stack(frame, names.get(ident, str(ident)))
+            if stack:
+                self.samples[";".join(stack)] += 1
+
+    @staticmethod
+    def _frames(frame) -> List:
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()
+        return frames
+
+    def _task_stack(self, frame) -> Optional[List[str]]:
+        if self.task.done():
+            return None
+        if asyncio.current_task(self.loop) is self.task:
+            frames = self._frames(frame)
+            # Drop the event loop frames below the task's first coroutine
+            for i in range(len(frames) - 1, -1, -1):
+                if frames[i].f_code.co_filename.endswith(_LOOP_PLUMBING):
+                    frames = frames[i + 1:]
+                    break
+            return ["request"] + [self._label(f.f_code) for f in frames]
+        return ["request"] + self._await_chain(self.task.get_coro())
+
+    def _await_chain(self, awaitable) -> List[str]:
+        stack = []
+        while awaitable is not None:
+            if isinstance(awaitable, asyncio.Task):
+                awaitable = awaitable.get_coro()
+                continue
+            frame = (
+                getattr(awaitable, "cr_frame", None)
+                or getattr(awaitable, "ag_frame", None)
+                or getattr(awaitable, "gi_frame", None)
+            )
+            if frame is None:
+                stack.append(f"[await {type(awaitable).__name__}]")
+                break
+            stack.append(self._label(frame.f_code))
+            awaitable = (
+                getattr(awaitable, "cr_await", None)
+                or getattr(awaitable, "ag_await", None)
+                or getattr(awaitable, "gi_yieldfrom", None)
+            )
+        return stack
+
+    def _thread_stack(self, frame, name: str) -> Optional[List[str]]:
+        if frame.f_code.co_filename.endswith(_IDLE_FILES):
+            return None
+        frames = self._frames(frame)
+        while frames and frames[0].f_code.co_filename.endswith(_THREADING):
+            frames.pop(0)
+        # Only the thread's own loop is running: it is blocked waiting for work
+        if len(frames) <= 1:
+            return None
+        return [f"thread {name}"] + [self._label(f.f_code) for f in frames]
+
+
+class ProfilingMiddleware:
+    """Profile requests that present the profiling token."""
+
+    def __init__(self, app: ASGIApp, token: str, interval: float = 0.005, directory: Optional[str] = None):
+        self.app = app
+        self.token = token.encode()
+        self.interval = interval
+        self.directory = Path(directory) if directory else None
+
+    def _requested(self, scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                return hmac.compare_digest(value, self.token)
+        query = scope.get("query_string", b"")
+        if b"profile=" in query:
+            values = parse_qs(query.decode("latin-1")).get("profile", [])
+            return any(hmac.compare_digest(value.encode(), self.token) for value in values)
+        return False
+
+    def _path(self, scope: Scope) -> Path:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_")[:80] or "root"
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        return self.directory / f"{stamp}-{time.time_ns() % 1_000_000_000:09d}-{scope['method']}-{slug}.folded"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        path = self._path(scope) if self.directory else None
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if path is not None:
+                    MutableHeaders(scope=message).append("X-Profile-File", str(path))
+            if path is not None:
+                await send(message)
+
+        sampler = RequestSampler(asyncio.current_task(), asyncio.get_running_loop(), self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if path is not None:
+                raise
+            logger.exception("Profiled request {} {} failed", scope["method"], scope["path"])
+        finally:
+            sampler.stop()
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "Profiled {} {} in {:.0f} ms ({} samples)",
+                scope["method"], scope["path"], elapsed * 1000, sum(sampler.samples.values()),
+            )
+            if path is not None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(sampler.folded(), encoding="utf-8")
+
+        if path is None:
+            body = sampler.folded().encode()
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-profiled-status", str(status).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
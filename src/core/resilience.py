@@ -0,0 +1,121 @@
+"""Resilience helpers for outbound calls: circuit breaker and hedging.
+
+- CircuitBreaker: opens after `failure_threshold` consecutive failures and
+  lets a single probe through once `reset_timeout` has elapsed.
+- LatencyWindow: rolling window of recent latencies used to derive the hedge
+  delay (e.g. p95) from live traffic.
+- hedged: runs a coroutine factory and, if it has not finished after
+  `delay` seconds, starts a second copy and returns whichever succeeds first.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half-open)."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed; only one probe runs while half-open."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probing = False
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+    def record_abandoned(self) -> None:
+        """An allowed call ended without an outcome (e.g. it was cancelled); let another probe through."""
+        self._probing = False
+
+
+class LatencyWindow:
+    """Rolling window of the most recent latencies (seconds)."""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+async def hedged(factory: Callable[[], Awaitable[T]], delay: Optional[float]) -> tuple[T, bool]:
+    """Await `factory()`, starting a backup copy if it is slower than `delay`.
+
+    Returns `(result, hedged)` where `hedged` tells whether the backup request
+    was started. The first successful result wins and the other task is
+    cancelled; if both fail, the last error is raised. Both tasks are also
+    cancelled if the caller is.
+    """
+    primary = asyncio.ensure_future(factory())
+    tasks = {primary}
+    try:
+        if delay is None:
+            return await primary, False
+
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return primary.result(), False
+
+        tasks.add(asyncio.ensure_future(factory()))
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), True
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
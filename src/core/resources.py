@@ -0,0 +1,89 @@
+"""Process-wide clients, built on first use and released by the app lifespan.
+
+Building some clients is expensive (the Arkiv client imports web3 and checks
+its connection, the DB engine loads its driver) and most processes only need
+a few of them, so nothing is built at import time:
+
+- resources.register(name, factory, close): declare a client;
+- resources.get(name): build it on first use (thread-safe) and reuse it;
+- await resources.warm_up(): build every registered client off the event
+  loop; the lifespan runs it in the background once the app is up, so the
+  first request does not pay for it;
+- await resources.close(): release the built clients on shutdown.
+"""
+import asyncio
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+from src.core.metrics import Histogram
+
+BUILD_SECONDS = Histogram(
+    "resource_build_seconds",
+    "Time to build a shared client (including its SDK imports), by resource",
+    ("resource",),
+)
+
+
+class Resources:
+    """Registry of lazily built, process-wide clients."""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._closers: Dict[str, Callable[[Any], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, factory: Callable[[], Any], close: Optional[Callable[[Any], Any]] = None) -> None:
+        """Declare a client; `close(instance)` may be sync or async."""
+        self._factories[name] = factory
+        self._locks[name] = threading.Lock()
+        if close is not None:
+            self._closers[name] = close
+
+    def get(self, name: str) -> Any:
+        """The client called `name`, built by the first caller"""
+        if name in self._instances:
+            return self._instances[name]
+        with self._locks[name]:
+            if name not in self._instances:
+                started = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                elapsed = time.perf_counter() - started
+                BUILD_SECONDS.observe(elapsed, resource=name)
+                logger.info("Built {} in {:.0f} ms", name, elapsed * 1000)
+        return self._instances[name]
+
+    def set(self, name: str, instance: Any) -> None:
+        """Use `instance` instead of building one (e.g. a stand-in in benchmarks)"""
+        self._instances[name] = instance
+
+    async def warm_up(self) -> None:
+        """Build every registered client that is not built yet, off the event loop"""
+        for name in list(self._factories):
+            if name in self._instances:
+                continue
+            try:
+                await asyncio.to_thread(self.get, name)
+            except Exception as e:
+                logger.warning("Could not build {} during warm-up (retried on first use): {}", name, e)
+
+    async def close(self) -> None:
+        """Release built clients, most recently built first"""
+        for name, instance in reversed(list(self._instances.items())):
+            closer = self._closers.get(name)
+            if closer is None:
+                continue
+            try:
+                result = closer(instance)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning("Could not close {}: {}", name, e)
+        self._instances.clear()
+
+
+resources = Resources()
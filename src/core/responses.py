@@ -0,0 +1,19 @@
+"""JSON responses for rows the app loaded itself.
+
+`ModelJSONResponse(rows)` serializes SQLModel/pydantic objects straight to
+JSON bytes with pydantic-core, skipping the per-row re-validation against
+`response_model` and the `jsonable_encoder` + `json.dumps` pass FastAPI does
+otherwise. Routes keep their `response_model` for the OpenAPI schema and
+return one of these when the rows already are instances of that model.
+"""
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+
+
+class ModelJSONResponse(JSONResponse):
+    """JSON response rendering models (or lists/dicts of them) with pydantic-core."""
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
@@ -0,0 +1,681 @@
+"""In-process stand-in for a contracts chain running the funding escrow contract.
+
+`SimulatedContractsNode` answers the subset of the `SubstrateInterface` API
+the deployer, the escrow state reader and the event indexer use (compose,
+sign and submit extrinsics, block/finality queries, events, storage, dry
+runs), and executes `FundingEscrowContract` (smart-contract/funding-escrow)
+as a Python state machine:
+
+- blocks are produced every `SIMCHAIN_BLOCK_TIME_SECONDS` by a background
+  thread and finalized `SIMCHAIN_FINALITY_LAG_BLOCKS` later;
+- nonces, `utility.batch_all` atomicity and the gas / storage deposit
+  limits are enforced like pallet-contracts does (OutOfGas,
+  StorageDepositLimitExhausted, ContractReverted);
+- failures can be injected: pool rejections, dispatch failures and
+  connections dropped after an extrinsic was accepted.
+
+Messages are encoded as a 4-byte selector followed by JSON arguments, so no
+compiled contract or runtime metadata is needed. Storage reads always see
+the latest state, whatever block hash is given.
+
+`SimulatedChainPool` is a `SubstratePool` whose connections are the node;
+it is used instead of the RPC pool when `ROCOCO_BACKEND=simulated`.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from scalecodec.base import ScaleBytes
+from substrateinterface.exceptions import (
+    ContractReadFailedException,
+    StorageFunctionNotFound,
+    SubstrateRequestException,
+)
+from substrateinterface.utils.ss58 import ss58_encode
+
+from src.core.depends.substrate import SubstratePool, _Slot
+from src.core.metrics import Counter, Histogram
+from src.settings.simulated_chain import SimulatedChainSettings
+
+SIM_EXTRINSICS = Counter(
+    "simchain_extrinsics_total",
+    "Extrinsics handled by the simulated node (included, failed, rejected, lost_reply)",
+    ("outcome",),
+)
+SIM_INCLUSION_SECONDS = Histogram(
+    "simchain_inclusion_seconds",
+    "Time from submission to inclusion in a block of the simulated node",
+)
+
+SPEC_VERSION = 1000
+ESCROW_CODE = b"simulated:funding_escrow"
+# Code hash of the escrow contract, uploaded at genesis
+ESCROW_CODE_HASH = hashlib.blake2b(ESCROW_CODE, digest_size=32).digest()
+BLOCK_WEIGHTS = {
+    "base_block": {"ref_time": 390_584_000, "proof_size": 0},
+    "max_block": {"ref_time": 2_000_000_000_000, "proof_size": 5_242_880},
+    "per_class": {
+        "normal": {
+            "base_extrinsic": {"ref_time": 124_414_000, "proof_size": 0},
+            "max_extrinsic": {"ref_time": 1_479_875_586_000, "proof_size": 3_932_160},
+            "max_total": {"ref_time": 1_500_000_000_000, "proof_size": 3_932_160},
+        },
+    },
+}
+# Weight and storage deposit (planck) charged per message or constructor
+COSTS: Dict[str, Tuple[Dict[str, int], int]] = {
+    "new": ({"ref_time": 4_200_000_000, "proof_size": 65_000}, 0),
+    "create_escrow": ({"ref_time": 2_800_000_000, "proof_size": 42_000}, 1_600_000_000),
+    "add_milestone": ({"ref_time": 1_700_000_000, "proof_size": 31_000}, 800_000_000),
+    "release_milestone": ({"ref_time": 2_100_000_000, "proof_size": 36_000}, 0),
+    "cancel_escrow": ({"ref_time": 1_900_000_000, "proof_size": 33_000}, 0),
+    "view": ({"ref_time": 600_000_000, "proof_size": 18_000}, 0),
+}
+
+
+class EscrowContractError(Exception):
+    """An `EscrowError` returned by a message; the call reverts."""
+
+
+class DispatchError(Exception):
+    """A failed dispatch, carrying the pallet error name."""
+
+    def __init__(self, name: str, module: str = "Contracts"):
+        super().__init__(name)
+        self.name = name
+        self.module = module
+
+    @property
+    def error_message(self) -> dict:
+        return {"type": "Module", "name": self.name, "docs": [f"{self.module}.{self.name} (simulated)"]}
+
+
+def _account(*parts: bytes) -> str:
+    return ss58_encode(hashlib.blake2b(b"".join(parts), digest_size=32).digest(), ss58_format=42)
+
+
+class SimulatedContractMetadata:
+    """Message encoding of the simulated node: 4-byte selector + JSON arguments."""
+
+    metadata_version = 4
+
+    @staticmethod
+    def selector(name: str) -> bytes:
+        return hashlib.blake2b(name.encode(), digest_size=4).digest()
+
+    def generate_message_data(self, name: str, args: Optional[dict] = None) -> ScaleBytes:
+        return ScaleBytes(self.selector(name) + json.dumps({"m": name, "a": args or {}}).encode())
+
+    generate_constructor_data = generate_message_data
+
+    @staticmethod
+    def decode(data: str) -> Tuple[str, dict]:
+        payload = json.loads(bytes.fromhex(data[2:] if data.startswith("0x") else data)[4:])
+        return payload["m"], payload["a"]
+
+
+class SimulatedExecResult:
+    """Dry-run result shaped like a decoded `ContractExecResult`."""
+
+    def __init__(self, value: dict):
+        self.value = value
+        self.gas_required = value["gas_required"]
+
+
+class SimulatedContractInstance:
+    """`ContractInstance` counterpart whose `read` dry-runs on the simulated node."""
+
+    def __init__(self, contract_address: str, metadata: SimulatedContractMetadata, substrate: "SimulatedContractsNode"):
+        self.contract_address = contract_address
+        self.metadata = metadata
+        self.substrate = substrate
+
+    def read(self, keypair, method: str, args: dict = None, value: int = 0, gas_limit=None, block_hash=None):
+        return self.substrate.dry_run(keypair.ss58_address, self.contract_address, method, args or {}, value)
+
+
+class FundingEscrowContract:
+    """Python port of the messages of `FundingEscrowContract` (lib.rs).
+
+    Storage is a flat dict keyed by `(contract, field, key)`, so an
+    extrinsic can run against an overlay and be committed or dropped whole.
+    """
+
+    MUTABLE = ("create_escrow", "add_milestone", "release_milestone", "cancel_escrow")
+    VIEWS = ("get_escrow_status", "get_milestone_status", "get_milestones", "get_escrow_statuses", "get_project_count")
+
+    def __init__(self, storage: dict, address: str, caller: str, value: int, now: int, emit: Callable):
+        self.storage = storage
+        self.address = address
+        self.caller = caller
+        self.value = value
+        self.now = now
+        self.emit = emit
+
+    def _get(self, name: str, key: Any, default: Any = None) -> Any:
+        return self.storage.get((self.address, name, key), default)
+
+    def _set(self, name: str, key: Any, value: Any) -> None:
+        self.storage[(self.address, name, key)] = value
+
+    def _transfer(self, to: str, amount: int) -> None:
+        balance = self.storage.get(("balances", self.address), 0)
+        if amount > balance:
+            raise EscrowContractError("TransferFailed")
+        self.storage[("balances", self.address)] = balance - amount
+        self.storage[("balances", to)] = self.storage.get(("balances", to), 0) + amount
+
+    def call(self, message: str, args: dict) -> Any:
+        if message not in self.MUTABLE + self.VIEWS:
+            raise DispatchError("ContractTrapped")
+        return getattr(self, message)(**args)
+
+    def create_escrow(self, project_owner: str, milestone_count: int) -> None:
+        if self.value == 0:
+            raise EscrowContractError("InsufficientFunds")
+        if self._get("escrow_owners", project_owner) is not None:
+            raise EscrowContractError("EscrowAlreadyExists")
+        if milestone_count == 0:
+            raise EscrowContractError("InvalidMilestoneCount")
+        self._set("escrow_owners", project_owner, self.caller)
+        self._set("escrow_amounts", project_owner, self.value)
+        self._set("escrow_released", project_owner, 0)
+        self._set("escrow_remaining", project_owner, self.value)
+        self._set("escrow_cancelled", project_owner, False)
+        self._set("escrow_completed", project_owner, False)
+        self._set("milestone_counts", project_owner, milestone_count)
+        self._set("project_count", None, self._get("project_count", None, 0) + 1)
+        self.emit("EscrowCreated", project_owner=project_owner, total_amount=self.value, milestone_count=milestone_count)
+
+    def add_milestone(self, project_owner: str, milestone_index: int, release_percentage: int) -> None:
+        total_amount = self._get("escrow_amounts", project_owner)
+        count = self._get("milestone_counts", project_owner)
+        if total_amount is None or count is None:
+            raise EscrowContractError("EscrowNotFound")
+        if milestone_index >= count:
+            raise EscrowContractError("InvalidMilestoneIndex")
+        if self._get("milestone_percentages", (project_owner, milestone_index)) is not None:
+            raise EscrowContractError("MilestoneAlreadyExists")
+        self._set("milestone_percentages", (project_owner, milestone_index), release_percentage)
+        self._set("milestone_amounts", (project_owner, milestone_index), total_amount // 100 * release_percentage)
+        self._set("milestone_released", (project_owner, milestone_index), False)
+        self._set("milestone_released_at", (project_owner, milestone_index), 0)
+
+    def release_milestone(self, project_owner: str, milestone_index: int) -> None:
+        if self._get("escrow_cancelled", project_owner):
+            raise EscrowContractError("EscrowCancelled")
+        if self._get("escrow_completed", project_owner):
+            raise EscrowContractError("EscrowCompleted")
+        count = self._get("milestone_counts", project_owner)
+        if count is not None and milestone_index >= count:
+            raise EscrowContractError("InvalidMilestoneIndex")
+        amount = self._get("milestone_amounts", (project_owner, milestone_index))
+        if amount is None:
+            raise EscrowContractError("MilestoneNotFound")
+        if self._get("milestone_released", (project_owner, milestone_index)):
+            raise EscrowContractError("MilestoneAlreadyReleased")
+        self._transfer(project_owner, amount)
+        self._set("milestone_released", (project_owner, milestone_index), True)
+        self._set("milestone_released_at", (project_owner, milestone_index), self.now)
+        self._set("escrow_released", project_owner, self._get("escrow_released", project_owner, 0) + amount)
+        self._set("escrow_remaining", project_owner, max(0, self._get("escrow_remaining", project_owner, 0) - amount))
+        self.emit("FundsReleased", project_owner=project_owner, milestone_index=milestone_index, amount=amount)
+
+    def cancel_escrow(self, project_owner: str) -> None:
+        admin = self._get("escrow_owners", project_owner)
+        if admin is None:
+            raise EscrowContractError("EscrowNotFound")
+        if self.caller != admin:
+            raise EscrowContractError("Unauthorized")
+        if self._get("escrow_cancelled", project_owner) or self._get("escrow_completed", project_owner):
+            raise EscrowContractError("CannotCancelEscrow")
+        remaining = self._get("escrow_remaining", project_owner, 0)
+        if remaining > 0:
+            self._transfer(admin, remaining)
+        self._set("escrow_cancelled", project_owner, True)
+        self.emit("EscrowCancelled", project_owner=project_owner, remaining_amount=remaining)
+
+    def get_escrow_status(self, project_owner: str) -> Optional[Tuple[int, int, bool, bool]]:
+        total = self._get("escrow_amounts", project_owner)
+        if total is None:
+            return None
+        return (
+            total,
+            self._get("escrow_released", project_owner, 0),
+            self._get("escrow_cancelled", project_owner, False),
+            self._get("escrow_completed", project_owner, False),
+        )
+
+    def get_milestone_status(self, project_owner: str, milestone_index: int) -> Optional[Tuple[int, bool]]:
+        amount = self._get("milestone_amounts", (project_owner, milestone_index))
+        if amount is None:
+            return None
+        return amount, self._get("milestone_released", (project_owner, milestone_index), False)
+
+    def get_milestones(self, project_owner: str) -> List[Optional[Tuple[int, bool]]]:
+        count = self._get("milestone_counts", project_owner, 0)
+        return [self.get_milestone_status(project_owner, index) for index in range(count)]
+
+    def get_escrow_statuses(self, project_owners: List[str]) -> List[Optional[Tuple[int, int, bool, bool]]]:
+        return [self.get_escrow_status(project_owner) for project_owner in project_owners]
+
+    def get_project_count(self) -> int:
+        return self._get("project_count", None, 0)
+
+
+@dataclass
+class SimulatedCall:
+    call_module: str
+    call_function: str
+    call_params: dict
+
+
+@dataclass
+class SimulatedExtrinsic:
+    call: SimulatedCall
+    signer: str
+    nonce: int
+    extrinsic_hash: bytes
+    submitted_at: float = field(default_factory=time.monotonic)
+
+
+class SimulatedEvent:
+    """Event record shaped like substrate-interface's decoded `EventRecord`."""
+
+    def __init__(self, module_id: str, event_id: str, attributes: dict, extrinsic_idx: Optional[int]):
+        event = {"module_id": module_id, "event_id": event_id, "attributes": attributes}
+        self.value = {**event, "event": event, "extrinsic_idx": extrinsic_idx, "topics": []}
+
+
+@dataclass
+class SimulatedReceipt:
+    """`ExtrinsicReceipt` counterpart, complete as soon as it is returned."""
+    extrinsic_hash: str
+    block_hash: Optional[str] = None
+    block_number: Optional[int] = None
+    is_success: bool = False
+    error_message: Optional[dict] = None
+    triggered_events: List[SimulatedEvent] = field(default_factory=list)
+    weight: Dict[str, int] = field(default_factory=lambda: {"ref_time": 0, "proof_size": 0})
+
+
+@dataclass
+class SimulatedBlock:
+    number: int
+    hash: str
+    timestamp: int
+    events: List[SimulatedEvent] = field(default_factory=list)
+
+
+class _Value:
+    def __init__(self, value: Any):
+        self.value = value
+
+
+class SimulatedContractsNode:
+    """A single in-process node; thread-safe, shared by all pooled "connections"."""
+
+    simulated = True
+    url = "simulated://contracts"
+    chain = "Simulated Contracts"
+    ss58_format = 42
+    websocket = None
+
+    def __init__(self, settings=SimulatedChainSettings):
+        self.settings = settings
+        self.random = random.Random(settings.SEED)
+        self.spec_version = SPEC_VERSION
+        self.metadata = SimulatedContractMetadata()
+        self.escrow_code_hash = ESCROW_CODE_HASH
+        self.storage: Dict[Any, Any] = {("code", self.escrow_code_hash.hex()): len(ESCROW_CODE)}
+        self.nonces: Dict[str, int] = {}
+        self.pool: Dict[Tuple[str, int], SimulatedExtrinsic] = {}
+        self.receipts: Dict[str, SimulatedReceipt] = {}
+        self.blocks: List[SimulatedBlock] = [self._seal(0, "0x00", [])]
+        self.block_numbers: Dict[str, int] = {self.blocks[0].hash: 0}
+        self._cond = threading.Condition(threading.RLock())
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # Lifecycle
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._produce, name="simchain-blocks", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def close(self) -> None:
+        """Closing a "connection" leaves the shared node running."""
+
+    @property
+    def runtime_version(self) -> int:
+        return self.spec_version
+
+    def upgrade_runtime(self) -> int:
+        """Bump the spec version, as a runtime upgrade would"""
+        with self._cond:
+            self.spec_version += 1
+            return self.spec_version
+
+    # Blocks
+
+    def _seal(self, number: int, parent: str, extrinsic_hashes: List[str]) -> SimulatedBlock:
+        digest = hashlib.blake2b(f"{parent}:{number}:{','.join(extrinsic_hashes)}".encode(), digest_size=32)
+        return SimulatedBlock(number=number, hash=f"0x{digest.hexdigest()}", timestamp=int(time.time() * 1000))
+
+    def _produce(self) -> None:
+        while not self._stop.wait(self.settings.BLOCK_TIME_SECONDS):
+            try:
+                self.produce_block()
+            except Exception:
+                logger.exception("Simulated block production failed")
+
+    def _ready(self) -> List[SimulatedExtrinsic]:
+        """Pool extrinsics whose nonce follows their signer's, in nonce order per signer"""
+        ready = []
+        expected = dict(self.nonces)
+        for extrinsic in sorted(self.pool.values(), key=lambda e: (e.signer, e.nonce)):
+            if extrinsic.nonce == expected.get(extrinsic.signer, 0):
+                ready.append(extrinsic)
+                expected[extrinsic.signer] = extrinsic.nonce + 1
+        return ready[:self.settings.MAX_EXTRINSICS_PER_BLOCK]
+
+    def produce_block(self) -> SimulatedBlock:
+        """Include ready extrinsics in a new block (also called by the producer thread)"""
+        with self._cond:
+            parent = self.blocks[-1]
+            extrinsics = self._ready()
+            block = self._seal(parent.number + 1, parent.hash, [f"0x{e.extrinsic_hash.hex()}" for e in extrinsics])
+            limit = BLOCK_WEIGHTS["per_class"]["normal"]["max_total"]["ref_time"]
+            used = 0
+            for index, extrinsic in enumerate(extrinsics):
+                if used > limit:
+                    break
+                del self.pool[(extrinsic.signer, extrinsic.nonce)]
+                self.nonces[extrinsic.signer] = extrinsic.nonce + 1
+                receipt = self._apply(extrinsic, index, block)
+                used += receipt.weight["ref_time"]
+                block.events.extend(receipt.triggered_events)
+                self.receipts[receipt.extrinsic_hash] = receipt
+                SIM_EXTRINSICS.inc(outcome="included" if receipt.is_success else "failed")
+                SIM_INCLUSION_SECONDS.observe(time.monotonic() - extrinsic.submitted_at)
+            self.blocks.append(block)
+            self.block_numbers[block.hash] = block.number
+            self._cond.notify_all()
+            return block
+
+    def _apply(self, extrinsic: SimulatedExtrinsic, index: int, block: SimulatedBlock) -> SimulatedReceipt:
+        """Dispatch an extrinsic atomically against an overlay of the storage"""
+        receipt = SimulatedReceipt(
+            extrinsic_hash=f"0x{extrinsic.extrinsic_hash.hex()}", block_hash=block.hash, block_number=block.number
+        )
+        overlay: Dict[Any, Any] = {}
+        events: List[SimulatedEvent] = []
+        weight = dict(BLOCK_WEIGHTS["per_class"]["normal"]["base_extrinsic"])
+        try:
+            if self.random.random() < self.settings.DISPATCH_FAILURE_RATE:
+                raise DispatchError("ContractTrapped")
+            self._dispatch(extrinsic.call, extrinsic.signer, _Overlay(self.storage, overlay), events, weight, index, block)
+        except DispatchError as e:
+            receipt.error_message = e.error_message
+            receipt.triggered_events = [
+                SimulatedEvent("System", "ExtrinsicFailed", {"dispatch_error": e.error_message}, index)
+            ]
+        else:
+            self.storage.update(overlay)
+            receipt.is_success = True
+            receipt.triggered_events = events + [
+                SimulatedEvent("System", "ExtrinsicSuccess", {"dispatch_info": {"weight": weight}}, index)
+            ]
+        receipt.weight = weight
+        return receipt
+
+    def _dispatch(self, call: SimulatedCall, signer: str, storage: "_Overlay", events: list, weight: dict, index: int, block: SimulatedBlock) -> None:
+        params = call.call_params
+        name = (call.call_module, call.call_function)
+        if name == ("Utility", "batch_all"):
+            for inner in params["calls"]:
+                self._dispatch(inner, signer, storage, events, weight, index, block)
+            events.append(SimulatedEvent("Utility", "BatchCompleted", {}, index))
+        elif name == ("Contracts", "upload_code"):
+            code = bytes.fromhex(params["code"][2:])
+            code_hash = hashlib.blake2b(code, digest_size=32).digest()
+            storage[("code", code_hash.hex())] = len(code)
+            events.append(SimulatedEvent("Contracts", "CodeStored", {"code_hash": f"0x{code_hash.hex()}"}, index))
+        elif name == ("Contracts", "instantiate"):
+            code_hash = params["code_hash"][2:]
+            if storage.get(("code", code_hash)) is None:
+                raise DispatchError("CodeNotFound")
+            self._charge("new", params, weight, 0)
+            address = _account(signer.encode(), bytes.fromhex(code_hash), str(params["salt"]).encode())
+            if storage.get(("contracts", address)) is not None:
+                raise DispatchError("DuplicateContract")
+            storage[("contracts", address)] = f"0x{code_hash}"
+            events.append(SimulatedEvent("Contracts", "Instantiated", {"deployer": signer, "contract": address}, index))
+        elif name == ("Contracts", "call"):
+            dest = params["dest"]
+            if storage.get(("contracts", dest)) is None:
+                raise DispatchError("ContractNotFound")
+            message, args = self.metadata.decode(params["data"])
+            cost = COSTS.get(message, COSTS["view"])
+            self._charge(message, params, weight, cost[1])
+            value = params.get("value") or 0
+            storage[("balances", dest)] = storage.get(("balances", dest), 0) + value
+
+            def emit(event: str, **fields):
+                data = json.dumps({"event": event, "args": fields}).encode()
+                events.append(SimulatedEvent("Contracts", "ContractEmitted", {"contract": dest, "data": f"0x{data.hex()}"}, index))
+
+            contract = FundingEscrowContract(storage, dest, signer, value, block.timestamp, emit)
+            try:
+                contract.call(message, args)
+            except EscrowContractError:
+                raise DispatchError("ContractReverted")
+        else:
+            raise DispatchError("CallFiltered", module="System")
+
+    @staticmethod
+    def _charge(message: str, params: dict, weight: dict, deposit: int) -> None:
+        """Check the call's limits against the message cost and add it to `weight`"""
+        cost, _ = COSTS.get(message, COSTS["view"])
+        limit = params.get("gas_limit") or {}
+        if any(limit.get(key, 0) < cost[key] for key in cost):
+            raise DispatchError("OutOfGas")
+        deposit_limit = params.get("storage_deposit_limit")
+        if deposit_limit is not None and deposit_limit < deposit:
+            raise DispatchError("StorageDepositLimitExhausted")
+        for key in cost:
+            weight[key] += cost[key]
+
+    # Extrinsics
+
+    def compose_call(self, call_module: str, call_function: str, call_params: dict = None) -> SimulatedCall:
+        return SimulatedCall(call_module, call_function, call_params or {})
+
+    def create_signed_extrinsic(self, call: SimulatedCall, keypair, nonce: Optional[int] = None, **kwargs) -> SimulatedExtrinsic:
+        if nonce is None:
+            nonce = self.get_account_nonce(keypair.ss58_address)
+        digest = hashlib.blake2b(repr((keypair.ss58_address, nonce, call)).encode(), digest_size=32).digest()
+        return SimulatedExtrinsic(call=call, signer=keypair.ss58_address, nonce=nonce, extrinsic_hash=digest)
+
+    def submit_extrinsic(self, extrinsic: SimulatedExtrinsic, wait_for_inclusion: bool = False, wait_for_finalization: bool = False) -> SimulatedReceipt:
+        key = f"0x{extrinsic.extrinsic_hash.hex()}"
+        with self._cond:
+            if extrinsic.nonce < self.nonces.get(extrinsic.signer, 0):
+                SIM_EXTRINSICS.inc(outcome="rejected")
+                raise SubstrateRequestException({"code": 1010, "message": "Invalid Transaction", "data": "Transaction is outdated"})
+            if (extrinsic.signer, extrinsic.nonce) in self.pool:
+                SIM_EXTRINSICS.inc(outcome="rejected")
+                raise SubstrateRequestException({"code": 1014, "message": "Priority is too low"})
+            if self.random.random() < self.settings.REJECT_RATE:
+                SIM_EXTRINSICS.inc(outcome="rejected")
+                raise SubstrateRequestException({"code": 1010, "message": "Invalid Transaction", "data": "Rejected (simulated)"})
+            extrinsic.submitted_at = time.monotonic()
+            self.pool[(extrinsic.signer, extrinsic.nonce)] = extrinsic
+            if self.random.random() < self.settings.LOST_REPLY_RATE:
+                SIM_EXTRINSICS.inc(outcome="lost_reply")
+                raise ConnectionResetError("Connection dropped after submission (simulated)")
+            if not (wait_for_inclusion or wait_for_finalization):
+                return SimulatedReceipt(extrinsic_hash=key)
+
+            timeout = self.settings.BLOCK_TIME_SECONDS * (self.settings.FINALITY_LAG_BLOCKS + 60)
+            if not self._cond.wait_for(lambda: key in self.receipts, timeout=timeout):
+                raise SubstrateRequestException(f"Extrinsic {key} not included after {timeout:.0f}s")
+            receipt = self.receipts[key]
+            if wait_for_finalization:
+                self._cond.wait_for(lambda: self.finalized_number >= receipt.block_number, timeout=timeout)
+            return receipt
+
+    def get_account_nonce(self, account_address: str) -> int:
+        """On-chain nonce of the account (AccountNonceApi), ignoring the pool like the real method"""
+        with self._cond:
+            return self.nonces.get(account_address, 0)
+
+    def account_next_index(self, account_address: str) -> int:
+        """Next index of the account, counting ready pool extrinsics (`system_accountNextIndex`)"""
+        with self._cond:
+            nonce = self.nonces.get(account_address, 0)
+            while (account_address, nonce) in self.pool:
+                nonce += 1
+            return nonce
+
+    # Chain queries
+
+    @property
+    def finalized_number(self) -> int:
+        return max(0, self.blocks[-1].number - self.settings.FINALITY_LAG_BLOCKS)
+
+    def get_chain_head(self) -> str:
+        return self.blocks[-1].hash
+
+    def get_chain_finalised_head(self) -> str:
+        with self._cond:
+            return self.blocks[self.finalized_number].hash
+
+    def get_block_hash(self, block_id: int) -> Optional[str]:
+        with self._cond:
+            return self.blocks[block_id].hash if 0 <= block_id < len(self.blocks) else None
+
+    def get_block_number(self, block_hash: str) -> int:
+        if block_hash not in self.block_numbers:
+            raise SubstrateRequestException(f"Block {block_hash} not found")
+        return self.block_numbers[block_hash]
+
+    def get_events(self, block_hash: Optional[str] = None) -> List[SimulatedEvent]:
+        number = self.get_block_number(block_hash) if block_hash else self.blocks[-1].number
+        return list(self.blocks[number].events)
+
+    def get_constant(self, module_name: str, constant_name: str, block_hash: Optional[str] = None) -> Optional[_Value]:
+        if (module_name, constant_name) == ("System", "BlockWeights"):
+            return _Value(BLOCK_WEIGHTS)
+        return None
+
+    def query(self, module: str, storage_function: str, params: list = None, block_hash: Optional[str] = None) -> _Value:
+        params = params or []
+        with self._cond:
+            if module == "Contracts" and storage_function == "ContractInfoOf":
+                code_hash = self.storage.get(("contracts", params[0]))
+                return _Value({"code_hash": code_hash} if code_hash else None)
+            if module == "Contracts" and storage_function in ("CodeInfoOf", "PristineCode"):
+                return _Value(self.storage.get(("code", str(params[0]).removeprefix("0x"))))
+            if module == "Timestamp" and storage_function == "Now":
+                number = self.get_block_number(block_hash) if block_hash else self.blocks[-1].number
+                return _Value(self.blocks[number].timestamp)
+            if module == "System" and storage_function == "Account":
+                return _Value({"nonce": self.nonces.get(params[0], 0), "data": {"free": self.storage.get(("balances", params[0]), 0)}})
+        raise StorageFunctionNotFound(f'Storage function "{module}.{storage_function}" not found')
+
+    def rpc_request(self, method: str, params: list, result_handler=None) -> dict:
+        if method == "state_getRuntimeVersion":
+            return {"result": {"specName": "simulated-contracts", "specVersion": self.spec_version}}
+        if method == "system_accountNextIndex":
+            return {"result": self.account_next_index(params[0])}
+        if method == "system_health":
+            return {"result": {"peers": 0, "isSyncing": False, "shouldHavePeers": False}}
+        raise SubstrateRequestException(f"Method not found: {method} (simulated node)")
+
+    def init_runtime(self, block_hash: Optional[str] = None, block_id: Optional[int] = None) -> None:
+        """The simulated runtime needs no metadata."""
+
+    # Contracts
+
+    def contract(self, contract_address: str) -> SimulatedContractInstance:
+        return SimulatedContractInstance(contract_address, self.metadata, self)
+
+    def dry_run(self, origin: str, dest: str, message: str, args: dict, value: int = 0) -> SimulatedExecResult:
+        """Execute a message without committing it (`ContractsApi_call`)"""
+        with self._cond:
+            if self.storage.get(("contracts", dest)) is None:
+                raise ContractReadFailedException({"Module": "ContractNotFound"})
+            cost, deposit = COSTS.get(message, COSTS["view"])
+            overlay = _Overlay(self.storage, {})
+            contract = FundingEscrowContract(overlay, dest, origin, value, self.blocks[-1].timestamp, lambda *a, **k: None)
+            try:
+                data, flags = {"Ok": contract.call(message, args)}, 0
+            except EscrowContractError as e:
+                data, flags = {"Err": str(e)}, 1
+            except DispatchError as e:
+                raise ContractReadFailedException({"Module": e.name})
+        return SimulatedExecResult({
+            "gas_consumed": cost,
+            "gas_required": cost,
+            "storage_deposit": {"Charge": deposit},
+            "debug_message": "",
+            # ink! wraps every message result in Result<_, LangError>
+            "result": {"Ok": {"flags": flags, "data": {"Ok": data["Ok"] if "Ok" in data else data}}},
+        })
+
+
+class _Overlay:
+    """Write buffer over the node storage; reads fall through to the base."""
+
+    def __init__(self, base: dict, writes: dict):
+        self.base = base
+        self.writes = writes
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        if key in self.writes:
+            return self.writes[key]
+        return self.base.get(key, default)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.writes[key] = value
+
+
+class SimulatedChainPool(SubstratePool):
+    """`SubstratePool` whose connections all point at one in-process simulated node."""
+
+    def __init__(self, size: int = 2, node: Optional[SimulatedContractsNode] = None, keepalive_seconds: float = 30.0):
+        self.node = node or SimulatedContractsNode()
+        super().__init__(self.node.url, size=size, keepalive_seconds=keepalive_seconds)
+
+    def _connect(self, slot: _Slot) -> SimulatedContractsNode:
+        slot.substrate = self.node
+        if self.chain is None:
+            self.chain = self.node.chain
+        return self.node
+
+    async def start(self) -> None:
+        self.node.start()
+        await super().start()
+        logger.info(
+            "Using the simulated contracts node ({}s blocks, finality lag {})",
+            self.node.settings.BLOCK_TIME_SECONDS,
+            self.node.settings.FINALITY_LAG_BLOCKS,
+        )
+
+    async def stop(self) -> None:
+        await super().stop()
+        self.node.stop()
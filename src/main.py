@@ -1,5 +1,9 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from loguru import logger
 
 # Import models to ensure SQLAlchemy can resolve relationships
 from src.models import (
@@ -8,11 +12,73 @@ from src.models import (
     Milestone,
     SponsoredProject,
     EvaluateResponse,
+    Evaluation,
+    EscrowDeployment,
+    EscrowEvent,
+    IndexerCursor,
 )
+from src.core.depends.substrate import substrate_pool
+from src.core.admission import OverloadedError, overloaded_handler
+from src.core.compression import CompressionMiddleware
+from src.core.instrumentation import RequestMetricsMiddleware
+from src.core.loop_monitor import LoopMonitorMiddleware, loop_monitor
+from src.core.profiling import ProfilingMiddleware
+from src.core.resources import resources
 from src.routes.base_router import base_router
 from src.routes.v1.escrow import router as escrow_router
+from src.services.contract_artifacts import contract_artifacts
+from src.services.escrow_deployment import EscrowDeploymentService, deployment_queue
+from src.services.escrow_events import escrow_indexer
+from src.services.evaluation import EvaluationService, evaluation_queue
+from src.services.similarity import SimilarityService
+from src.settings.http import HttpSettings
+from src.settings.loop_monitor import LoopMonitorSettings
+from src.settings.profiling import ProfilingSettings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background workers on startup and stop them on shutdown.
+
+    Shared clients (DB engine, Arkiv client) are built on first use; the
+    rest are built by a background warm-up once the app is serving.
+    """
+    if LoopMonitorSettings.ENABLED:
+        await loop_monitor.start()
+    try:
+        await SimilarityService.rebuild()
+    except Exception as e:
+        logger.warning("Could not build the similarity index: {}", e)
+    try:
+        contract_artifacts.get()
+    except FileNotFoundError as e:
+        logger.warning("Contract artifacts not available: {}", e)
+    await substrate_pool.start()
+    await evaluation_queue.start()
+    try:
+        await EvaluationService.resume_pending()
+    except Exception as e:
+        logger.warning("Could not resume pending evaluations: {}", e)
+    await deployment_queue.start()
+    try:
+        await EscrowDeploymentService.resume_pending()
+    except Exception as e:
+        logger.warning("Could not resume pending escrow deployments: {}", e)
+    await escrow_indexer.start()
+    warm_up = asyncio.create_task(resources.warm_up(), name="resources-warm-up")
+    yield
+    warm_up.cancel()
+    await asyncio.gather(warm_up, return_exceptions=True)
+    await escrow_indexer.stop()
+    await deployment_queue.stop()
+    await evaluation_queue.stop()
+    await substrate_pool.stop()
+    await resources.close()
+    await loop_monitor.stop()
 
-app = FastAPI(title="Sub0 Funding Oracle API")
+
+app = FastAPI(title="Sub0 Funding Oracle API", lifespan=lifespan)
+app.add_exception_handler(OverloadedError, overloaded_handler)
 
 # Add CORS middleware to allow frontend requests
 app.add_middleware(
@@ -22,6 +88,24 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=HttpSettings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=HttpSettings.GZIP_LEVEL,
+    brotli_quality=HttpSettings.BROTLI_QUALITY,
+)
+# Only installed when a profiling token is configured
+if ProfilingSettings.TOKEN is not None:
+    app.add_middleware(
+        ProfilingMiddleware,
+        token=ProfilingSettings.TOKEN.get_secret_value(),
+        interval=ProfilingSettings.INTERVAL_SECONDS,
+        directory=ProfilingSettings.DIR,
+    )
+if LoopMonitorSettings.ENABLED:
+    app.add_middleware(LoopMonitorMiddleware, monitor=loop_monitor)
+# Outermost, so the timings include every other middleware
+app.add_middleware(RequestMetricsMiddleware)
 
 app.include_router(base_router)
 app.include_router(escrow_router, prefix="/api/v1/arkiv")
@@ -13,7 +13,7 @@ from src.models.base_model import BaseTable
 
 # Import models in dependency order
 # NOTE: Relationships use sa_relationship_kwargs to avoid circular imports
-from src.models.project import Project, ProjectCreate, ProjectUpdate
+from src.models.project import Project, ProjectCreate, ProjectUpdate, SimilarProjectOut
 from src.models.milestone import Milestone, MilestoneCreate, MilestoneUpdate
 from src.models.sponsor import (
     SponsoredProject,
@@ -23,6 +23,15 @@ from src.models.sponsor import (
     SponsoredProjectOut,
 )
 from src.models.evaluate import EvaluateResponse
+from src.models.evaluation import Evaluation, EvaluationJobOut
+from src.models.escrow import (
+    EscrowDeployment,
+    EscrowDeploymentJobOut,
+    EscrowEvent,
+    EscrowReleaseIn,
+    EscrowReleaseOut,
+    IndexerCursor,
+)
 
 # Relations configuration (if needed in future)
 # from src.models.relations import *
@@ -32,6 +41,7 @@ __all__ = [
     "Project",
     "ProjectCreate",
     "ProjectUpdate",
+    "SimilarProjectOut",
     "Milestone",
     "MilestoneCreate",
     "MilestoneUpdate",
@@ -41,5 +51,13 @@ __all__ = [
     "SponsorRequest",
     "SponsoredProjectOut",
     "EvaluateResponse",
+    "Evaluation",
+    "EvaluationJobOut",
+    "EscrowDeployment",
+    "EscrowDeploymentJobOut",
+    "EscrowEvent",
+    "EscrowReleaseIn",
+    "EscrowReleaseOut",
+    "IndexerCursor",
 ]
 
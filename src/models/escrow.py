@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import Optional
+
+import sqlalchemy as sa
+from pydantic import BaseModel
+from sqlmodel import Field
+
+from src.models.base_model import BaseTable
+
+DEPLOYMENT_STAGES = ("queued", "submitted", "in_block", "finalized", "arkiv_synced")
+
+
+class EscrowDeployment(BaseTable, table=True):
+    """DB model for an escrow deployment job.
+
+    Rows move through `DEPLOYMENT_STAGES` (queued -> submitted -> in_block ->
+    finalized -> arkiv_synced) or end as `failed`; the chain identifiers are
+    stored as soon as they are known so an interrupted job can be resumed.
+    """
+
+    sponsored_project_id: int = Field(index=True, nullable=False)
+    status: str = Field(default="queued", index=True)
+    simulated: bool = False
+    contract_address: Optional[str] = None
+    extrinsic_hash: Optional[str] = None
+    block_hash: Optional[str] = None
+    arkiv_updated: bool = False
+    error: Optional[str] = None
+
+
+class EscrowDeploymentJobOut(BaseModel):
+    """Schema returned when an escrow deployment is queued (HTTP 202)."""
+
+    job_id: int
+    sponsored_project_id: int
+    status: str
+
+
+class EscrowEvent(BaseTable, table=True):
+    """DB model for an event emitted by an escrow contract in a finalized block.
+
+    `event` is the ink! event name (EscrowCreated, FundsReleased or
+    EscrowCancelled); `amount` is the event's balance (total, released or
+    remaining amount respectively) in planck.
+    """
+
+    __tablename__ = "escrow_events"
+
+    block_number: int = Field(index=True, nullable=False)
+    block_hash: str
+    event_index: int
+    extrinsic_index: Optional[int] = None
+    block_timestamp: Optional[datetime] = Field(default=None, sa_type=sa.DateTime(timezone=True))
+    contract_address: str = Field(index=True, nullable=False)
+    event: str = Field(index=True, nullable=False)
+    project_owner: str = Field(index=True, nullable=False)
+    milestone_index: Optional[int] = None
+    milestone_count: Optional[int] = None
+    amount: Optional[int] = Field(default=None, sa_type=sa.Numeric(39, 0))
+
+
+class IndexerCursor(BaseTable, table=True):
+    """Last block processed by a chain indexer (one row per indexer name)."""
+
+    name: str = Field(index=True, unique=True, nullable=False)
+    block_number: int
+
+
+class EscrowReleaseOut(BaseModel):
+    """Schema for one milestone release in a project's release history."""
+
+    block_number: int
+    block_hash: str
+    block_timestamp: Optional[datetime] = None
+    milestone_index: Optional[int] = None
+    amount: int
+
+
+class EscrowReleaseIn(BaseModel):
+    """Schema for one milestone to release in a batch release request."""
+
+    sponsored_project_id: int
+    milestone_index: int
@@ -1,7 +1,9 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
 
 class EvaluateResponse(BaseModel):
     ai_score: float
-    decision: str  # "approve" | "reject" | "borderline"
+    decision: Literal["approve", "reject", "borderline"]
     rationale: str
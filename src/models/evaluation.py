@@ -0,0 +1,36 @@
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlmodel import Field
+
+from src.models.base_model import BaseTable
+
+
+class Evaluation(BaseTable, table=True):
+    """DB model for an AI evaluation of a project.
+
+    Rows double as evaluation jobs: they are created as `queued`, move to
+    `running` and end as `completed` (with the result fields set) or `failed`.
+    """
+
+    project_id: str = Field(index=True, nullable=False)
+    status: str = Field(default="queued", index=True)  # queued | running | completed | failed
+    ai_score: Optional[float] = None
+    decision: Optional[str] = None
+    rationale: Optional[str] = None
+    source: Optional[str] = None  # model | similar | fallback
+    model: Optional[str] = None
+    prompt_hash: Optional[str] = Field(default=None, index=True)
+    latency_ms: Optional[float] = None
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    reused_from_id: Optional[int] = None  # evaluation copied for a near-duplicate project
+    error: Optional[str] = None
+
+
+class EvaluationJobOut(BaseModel):
+    """Schema returned when an evaluation is queued (HTTP 202)."""
+
+    job_id: int
+    project_id: str
+    status: str
@@ -1,5 +1,8 @@
+from datetime import datetime
 from typing import Optional
 
+import sqlalchemy as sa
+
 from pydantic import BaseModel
 from sqlmodel import Field, SQLModel
 
@@ -16,6 +19,12 @@ class Milestone(BaseTable, table=True):
     description: Optional[str] = None
     amount: float
 
+    # Position in the project's on-chain escrow and its release
+    milestone_index: Optional[int] = None
+    released: bool = False
+    released_at: Optional[datetime] = Field(default=None, sa_type=sa.DateTime(timezone=True))
+    release_block_hash: Optional[str] = None
+
 
 class MilestoneCreate(BaseModel):
     """Schema for creating a new milestone (excludes id and timestamps)."""
@@ -23,6 +32,7 @@ class MilestoneCreate(BaseModel):
     name: str
     description: Optional[str] = None
     amount: float
+    milestone_index: Optional[int] = None
 
 
 class MilestoneUpdate(BaseModel):
@@ -31,8 +41,4 @@ class MilestoneUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     amount: Optional[float] = None
-
-
-
-
-
+    milestone_index: Optional[int] = None
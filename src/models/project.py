@@ -41,3 +41,12 @@ class ProjectUpdate(BaseModel):
     repo: Optional[str] = None
     description: Optional[str] = None
     budget: Optional[float] = None
+
+
+class SimilarProjectOut(BaseModel):
+    """Schema for a project returned by the similarity search."""
+
+    id: int
+    project_id: str
+    name: str
+    score: float
@@ -61,8 +61,8 @@ class SponsorRequest(BaseModel):
     """Schema for sponsor request (used in Arkiv integration)."""
     
     project: dict
-    ai_score: float
-    decision: str
+    ai_score: Optional[float] = None  # ignored: the stored evaluation's score is used
+    decision: Optional[str] = None
     contract_address: str
 
 
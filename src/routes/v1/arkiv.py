@@ -1,14 +1,19 @@
-from typing import List, Optional
+import asyncio
+from typing import TYPE_CHECKING, List, Optional
 
 from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from arkiv import Arkiv
+from src.core.admission import admit, arkiv_limiter, evaluate_limiter, sponsor_limiter
 from src.core.depends.arkiv import get_arkiv_client
 from src.core.depends.db import get_async_session
+from src.core.jobs import JobQueueFull
+from src.core.responses import ModelJSONResponse
 from src.models.evaluate import EvaluateResponse
+from src.models.evaluation import Evaluation, EvaluationJobOut
 from src.models.milestone import Milestone, MilestoneCreate, MilestoneUpdate
-from src.models.project import Project, ProjectCreate, ProjectUpdate
+from src.models.project import Project, ProjectCreate, ProjectUpdate, SimilarProjectOut
 from src.models.sponsor import (
     SponsoredProject,
     SponsoredProjectCreate,
@@ -17,11 +22,15 @@ from src.models.sponsor import (
     SponsorRequest,
 )
 from src.services.arkiv import ArkivService
-from src.services.ai import AIService
+from src.services.evaluation import EvaluationService
 from src.services.milestone import MilestoneService
 from src.services.project import ProjectService
+from src.services.similarity import ProjectSimilarityIndex, SimilarityService
 from src.services.sponsor import SponsoredProjectService
 
+if TYPE_CHECKING:
+    from arkiv import Arkiv
+
 router = APIRouter(prefix="/arkiv")
 
 @router.get("/projects", response_model=List[Project])
@@ -30,7 +39,7 @@ async def list_projects(skip: int = 0, limit: int = 100, session: AsyncSession =
     List all projects with pagination.
     """
     projects = await ProjectService.list_all(session, skip=skip, limit=limit)
-    return projects
+    return ModelJSONResponse(projects)
 
 
 @router.get("/projects/{project_id}", response_model=Project)
@@ -44,6 +53,31 @@ async def get_project(project_id: int, session: AsyncSession = Depends(get_async
     return project
 
 
+@router.get("/projects/{project_id}/similar", response_model=List[SimilarProjectOut])
+async def list_similar_projects(
+    project_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    min_score: float = Query(0.5, ge=0.0, le=1.0, description="Minimum cosine similarity"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    List projects whose name, description and milestones are most similar to this one.
+    """
+    project = await ProjectService.get_by_id(project_id, session)
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+    milestones = await MilestoneService.list_by_project(project.project_id, session)
+    text = ProjectSimilarityIndex.project_text(project, milestones)
+    matches = SimilarityService.similar(text, limit=limit, min_score=min_score, exclude=project.id)
+    projects = {p.id: p for p in await ProjectService.get_by_ids([pk for pk, _ in matches], session)}
+    return [
+        SimilarProjectOut(id=pk, project_id=projects[pk].project_id, name=projects[pk].name, score=round(score, 4))
+        for pk, score in matches
+        if pk in projects
+    ]
+
+
 @router.post("/projects", response_model=Project, status_code=status.HTTP_201_CREATED)
 async def create_project(project: ProjectCreate, session: AsyncSession = Depends(get_async_session)):
     """
@@ -84,7 +118,7 @@ async def list_milestones(skip: int = 0, limit: int = 100, session: AsyncSession
     List all milestones with pagination.
     """
     milestones = await MilestoneService.list_all(session, skip=skip, limit=limit)
-    return milestones
+    return ModelJSONResponse(milestones)
 
 
 @router.get("/milestones/by-project/{project_id}", response_model=List[Milestone])
@@ -93,7 +127,7 @@ async def list_milestones_by_project(project_id: int, skip: int = 0, limit: int
     List all milestones for a specific project with pagination.
     """
     milestones = await MilestoneService.list_by_project(project_id, session, skip=skip, limit=limit)
-    return milestones
+    return ModelJSONResponse(milestones)
 
 
 @router.get("/milestones/{milestone_id}", response_model=Milestone)
@@ -150,7 +184,7 @@ async def list_sponsored_projects(status_filter: Optional[str] = None, skip: int
         sponsored_projects = await SponsoredProjectService.list_by_status(status_filter, session, skip=skip, limit=limit)
     else:
         sponsored_projects = await SponsoredProjectService.list_all(session, skip=skip, limit=limit)
-    return sponsored_projects
+    return ModelJSONResponse(sponsored_projects)
 
 
 @router.get("/sponsored/{sponsored_project_id}", response_model=SponsoredProject)
@@ -196,37 +230,91 @@ async def delete_sponsored_project(sponsored_project_id: int, session: AsyncSess
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sponsored project not found")
 
 
-@router.post("/evaluate", response_model=EvaluateResponse)
-async def evaluate(project_id: int = Query(..., description="Project ID to evaluate with AI"), session: AsyncSession = Depends(get_async_session)):
+@router.post(
+    "/evaluate",
+    response_model=EvaluateResponse,
+    responses={status.HTTP_202_ACCEPTED: {"model": EvaluationJobOut}},
+    dependencies=[admit(evaluate_limiter)],
+)
+async def evaluate(
+    project_id: int = Query(..., description="Project ID to evaluate with AI"),
+    background: bool = Query(False, description="Queue the evaluation and return 202 with a job ID"),
+    refresh: bool = Query(False, description="Call the model even if a stored result matches"),
+    session: AsyncSession = Depends(get_async_session),
+):
     """
     Evaluates a project using AI.
+
+    The result is stored in the evaluation history. With `background=true` the
+    evaluation is queued and a job ID is returned; poll `GET /evaluations/{job_id}`.
     """
     project = await ProjectService.get_by_id(project_id, session)
     if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    
-    evaluation = AIService.evaluate_project({
-        "name": project.name,
-        "description": project.description,
-        "budget": project.budget,
-        "milestones": getattr(project, "milestones", [])
-    })
+
+    if background:
+        try:
+            evaluation = await EvaluationService.enqueue(project, session)
+        except JobQueueFull:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Evaluation queue is full")
+        job = EvaluationJobOut(job_id=evaluation.id, project_id=evaluation.project_id, status=evaluation.status)
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=job.model_dump())
+
+    evaluation = await EvaluationService.evaluate(project, session, refresh=refresh)
     return evaluation
 
 
-@router.post("/sponsor")
-async def save_sponsor(payload: SponsorRequest, client: Arkiv = Depends(get_arkiv_client), session: AsyncSession = Depends(get_async_session)):
+@router.get("/evaluations/by-project/{project_id}", response_model=List[Evaluation])
+async def list_evaluations_by_project(project_id: str, skip: int = 0, limit: int = 100, session: AsyncSession = Depends(get_async_session)):
+    """
+    List the evaluation history of a project (by its `project_id` string), newest first.
+    """
+    evaluations = await EvaluationService.list_by_project(project_id, session, skip=skip, limit=limit)
+    return ModelJSONResponse(evaluations)
+
+
+@router.get("/evaluations/{evaluation_id}", response_model=Evaluation)
+async def get_evaluation(evaluation_id: int, session: AsyncSession = Depends(get_async_session)):
+    """
+    Get a stored evaluation or the status of an evaluation job.
+    """
+    evaluation = await EvaluationService.get_by_id(evaluation_id, session)
+    if not evaluation:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Evaluation not found")
+    return evaluation
+
+
+@router.post("/sponsor", dependencies=[admit(sponsor_limiter)])
+async def save_sponsor(payload: SponsorRequest, client: "Arkiv" = Depends(get_arkiv_client), session: AsyncSession = Depends(get_async_session)):
     """
     Guarda el proyecto sponsoreado en Arkiv blockchain Y en la base de datos.
     Se asume que ya se creó el smart contract y se pasa su address.
     """
     # payload.project is a dict, so access its keys directly
     project = payload.project
+
+    # Only a stored evaluation is a score to sponsor on: a client-sent score
+    # is ignored, and so are fallback heuristics (model unavailable).
+    project_id = project.get("project_id", "")
+    evaluation = await EvaluationService.get_latest_for_project(project_id, session, exclude_source="fallback")
+    if evaluation:
+        ai_score = evaluation.ai_score
+    elif await EvaluationService.get_latest_for_project(project_id, session, source="fallback"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Project only has a fallback evaluation. Call POST /evaluate again once the model is available.",
+        )
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Project has no stored evaluation. Call POST /evaluate first.",
+        )
+
     data = {
         "project_id": project.get("project_id", ""),
         "name": project.get("name", ""),
         "repo": project.get("repo", ""),
-        "ai_score": payload.ai_score,
+        "ai_score": ai_score,
         "status": "submitted",  # ← Status siempre es "submitted" cuando se envía
         "contract_address": payload.contract_address,
         "chain": "asset_hub",
@@ -236,7 +324,10 @@ async def save_sponsor(payload: SponsorRequest, client: Arkiv = Depends(get_arki
     }
 
     # 1. Save to Arkiv blockchain
-    arkiv_result = ArkivService.save_sponsored_project(client, data)
+    # End the read transaction so no pooled connection is held during the Arkiv call
+    await session.commit()
+    async with arkiv_limiter.slot():
+        arkiv_result = await asyncio.to_thread(ArkivService.save_sponsored_project, client, data)
     entity_key = arkiv_result["entity_key"]
     tx_hash = arkiv_result.get("tx_hash")
 
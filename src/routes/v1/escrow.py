@@ -1,25 +1,47 @@
 """
 Escrow Routes - Progressive Fund Release for Projects
 """
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+import json
+from typing import TYPE_CHECKING, List
+
+from fastapi import APIRouter, Body, HTTPException, Depends, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 
+from src.core.admission import OverloadedError, admit, arkiv_limiter, escrow_writes_limiter, wait_for_slots
 from src.core.depends.db import get_async_session
 from src.core.depends.arkiv import get_arkiv_client
+from src.core.depends.substrate import SubstratePool, get_substrate_pool
+from src.core.jobs import JobQueueFull
+from src.models.escrow import EscrowDeployment, EscrowDeploymentJobOut, EscrowReleaseIn, EscrowReleaseOut
 from src.models.sponsor import SponsoredProject
-from src.services.rococo_deployer import RococoDeployer
+from src.services.escrow_events import EscrowEventService
+from src.services.escrow_deployment import MILESTONE_COUNT, PLANCK_PER_UNIT, EscrowDeploymentService
+from src.services.escrow_release import EscrowReleaseService
+from src.services.escrow_state import EscrowStateService, EscrowTarget
+from src.services.rococo_deployer import SIMULATED_CONTRACT_ADDRESS, EscrowSpec, RococoDeployer
 from src.services.arkiv import ArkivService
-from arkiv import Arkiv
+
+if TYPE_CHECKING:
+    from arkiv import Arkiv
 
 router = APIRouter(prefix="/escrow", tags=["escrow"])
 
 
-@router.post("/deploy-escrow")
+@router.post(
+    "/deploy-escrow",
+    responses={status.HTTP_202_ACCEPTED: {"model": EscrowDeploymentJobOut}},
+    dependencies=[admit(escrow_writes_limiter)],
+)
 async def deploy_escrow(
     project_id: int,
+    background: bool = Query(True, description="Queue the deployment and return 202 with a job ID"),
     db: AsyncSession = Depends(get_async_session),
-    arkiv_client: Arkiv = Depends(get_arkiv_client),
+    arkiv_client: "Arkiv" = Depends(get_arkiv_client),
+    pool: SubstratePool = Depends(get_substrate_pool),
 ):
     """
     Deploy an escrow smart contract for a project with progressive fund release
@@ -30,6 +52,12 @@ async def deploy_escrow(
     - Saves the contract address to the project
     - Updates the Arkiv entity with the contract address
     
+    By default the deployment runs as a background job and the response is
+    202 with a job ID; follow its stages with
+    `GET /escrow/deployments/{job_id}/events` (SSE) or poll
+    `GET /escrow/deployments/{job_id}`. `background=false` keeps the request
+    open until the deployment is done.
+    
     Args:
         project_id: ID of the project to create escrow for
         
@@ -53,14 +81,24 @@ async def deploy_escrow(
                 detail=f"Project must be approved to create escrow. Current status: {project.status}"
             )
         
+        if background:
+            try:
+                job = await EscrowDeploymentService.enqueue(project, db)
+            except JobQueueFull:
+                raise HTTPException(status_code=503, detail="Deployment queue is full")
+            out = EscrowDeploymentJobOut(
+                job_id=job.id, sponsored_project_id=job.sponsored_project_id, status=job.status
+            )
+            return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=out.model_dump())
+        
         # If project already has a contract, we can update it (re-launch)
         # This allows relaunching if the previous one failed
         is_relaunch = bool(project.contract_address)
         
         # Deploy to Rococo Testnet
-        deployer = RococoDeployer()
+        deployer = RococoDeployer(pool=pool)
         
-        # Connect to Rococo
+        # Check the pooled connection to Rococo
         if not await deployer.connect():
             raise HTTPException(
                 status_code=503,
@@ -68,8 +106,8 @@ async def deploy_escrow(
             )
         
         # Prepare milestones
-        milestone_count = 4
-        total_amount = int(project.budget * 10**12)  # Convert to smallest unit (planck)
+        milestone_count = MILESTONE_COUNT
+        total_amount = int(project.budget * PLANCK_PER_UNIT)
         
         # Deploy the contract using real WASM and metadata
         deployment_result = await deployer.deploy_contract(
@@ -94,26 +132,26 @@ async def deploy_escrow(
         arkiv_update_status = False
         if project.entity_key:
             try:
-                # Call update_entity_with_contract synchronously
-                update_success = ArkivService.update_entity_with_contract(
-                    client=arkiv_client,
-                    entity_key=project.entity_key,
-                    contract_address=contract_address
-                )
+                # The Arkiv SDK is synchronous: keep it off the event loop.
+                # The contract is already deployed, so wait for a slot rather than shed the sync.
+                with wait_for_slots():
+                    async with arkiv_limiter.slot():
+                        update_success = await asyncio.to_thread(
+                            ArkivService.update_entity_with_contract,
+                            client=arkiv_client,
+                            entity_key=project.entity_key,
+                            contract_address=contract_address,
+                        )
                 
                 if update_success:
                     arkiv_update_status = True
-                    print(f"✅ Arkiv entity updated with contract: {contract_address}")
-                    print(f"   Entity Key: {project.entity_key}")
-                    print(f"   Smart Contract (Polkadot): {contract_address}")
+                    logger.info("Arkiv entity {} updated with contract {}", project.entity_key, contract_address)
                 else:
-                    print(f"⚠️  Failed to update Arkiv entity, but contract deployed: {contract_address}")
-            except Exception as arkiv_error:
-                print(f"❌ Exception updating Arkiv: {str(arkiv_error)}")
-                import traceback
-                traceback.print_exc()
+                    logger.warning("Failed to update Arkiv entity, but contract deployed: {}", contract_address)
+            except Exception:
+                logger.exception("Exception updating Arkiv entity {}", project.entity_key)
         else:
-            print(f"⚠️  No entity_key found, skipping Arkiv update")
+            logger.warning("No entity_key for sponsored project {}, skipping Arkiv update", project.id)
         
         return {
             "success": True,
@@ -126,7 +164,7 @@ async def deploy_escrow(
             "message": f"Escrow contract {'re-launched' if is_relaunch else 'deployed'} successfully. Arkiv {'synchronized' if arkiv_update_status else 'sync pending'}"
         }
         
-    except HTTPException:
+    except (HTTPException, OverloadedError):
         raise
     except Exception as e:
         await db.rollback()
@@ -136,14 +174,229 @@ async def deploy_escrow(
         )
 
 
+@router.post("/deploy-escrow:batch", dependencies=[admit(escrow_writes_limiter)])
+async def deploy_escrow_batch(
+    limit: int = 50,
+    db: AsyncSession = Depends(get_async_session),
+    arkiv_client: "Arkiv" = Depends(get_arkiv_client),
+    pool: SubstratePool = Depends(get_substrate_pool),
+):
+    """
+    Deploy escrows for all approved projects that do not have one yet
+    
+    - Claims up to `limit` approved projects without an escrow or an
+      active deployment job, recording a deployment job for each
+    - Packs their create_escrow/add_milestone calls into utility.batch_all
+      extrinsics sized under the block weight limit
+    - Saves the contract address on each deployed project, and each batch's
+      outcome on its deployment jobs even when other batches failed ("unknown"
+      jobs stay `submitted` and are reconciled on restart)
+    - Updates the Arkiv entities in a single Arkiv transaction
+    
+    Args:
+        limit: Maximum number of projects to deploy in this call
+        
+    Returns:
+        dict with per-project results and batch counts
+    """
+    jobs = {}
+    recorded = False
+    try:
+        deployer = RococoDeployer(pool=pool)
+        if not await deployer.connect():
+            raise HTTPException(
+                status_code=503,
+                detail="Could not connect to Rococo testnet. Try again later."
+            )
+        
+        claimed = await EscrowDeploymentService.claim_for_batch(limit, db)
+        if not claimed:
+            return {"success": True, "requested": 0, "deployed": 0, "batches": 0, "results": []}
+        projects = [project for project, _ in claimed]
+        jobs = {project.id: job for project, job in claimed}
+        job_ids = [job.id for job in jobs.values()]
+        
+        specs = [
+            EscrowSpec(
+                key=project.id,
+                project_owner=project.project_id,
+                milestone_count=MILESTONE_COUNT,
+                total_amount=int(project.budget * PLANCK_PER_UNIT),
+            )
+            for project in projects
+        ]
+        results = await deployer.deploy_batch(specs)
+        
+        by_id = {project.id: project for project in projects}
+        for result in results:
+            job = jobs[result.key]
+            job.contract_address = result.contract_address
+            job.extrinsic_hash = result.extrinsic_hash
+            job.block_hash = result.block_hash
+            job.error = result.error
+            if result.success:
+                by_id[result.key].polkadot_smart_contract = result.contract_address
+                job.status = "finalized"
+                job.simulated = result.status == "simulated"
+            elif result.status != "unknown":
+                job.status = "failed"
+        await db.commit()
+        recorded = True
+        
+        # Sync all deployed projects to Arkiv in one transaction
+        contracts = {
+            by_id[r.key].entity_key: r.contract_address
+            for r in results
+            if r.success and by_id[r.key].entity_key
+        }
+        arkiv_updated = {}
+        if contracts:
+            try:
+                with wait_for_slots():
+                    async with arkiv_limiter.slot():
+                        arkiv_updated = await asyncio.to_thread(
+                            ArkivService.update_entities_with_contracts, arkiv_client, contracts
+                        )
+            except Exception as e:
+                logger.warning("Arkiv update of {} deployed escrows failed: {}", len(contracts), e)
+        # Jobs left `finalized` have their Arkiv sync retried on restart
+        for result in results:
+            entity_key = by_id[result.key].entity_key
+            if result.success and (not entity_key or arkiv_updated.get(entity_key, False)):
+                jobs[result.key].status = "arkiv_synced"
+                jobs[result.key].arkiv_updated = bool(entity_key)
+        await db.commit()
+        
+        deployed = [r for r in results if r.success]
+        return {
+            "success": len(deployed) == len(results),
+            "requested": len(results),
+            "deployed": len(deployed),
+            "batches": len({r.batch for r in deployed}),
+            "results": [
+                {
+                    "project_id": r.key,
+                    "success": r.success,
+                    "status": r.status,
+                    "contract_address": r.contract_address,
+                    "batch": r.batch,
+                    "block_hash": r.block_hash,
+                    "extrinsic_hash": r.extrinsic_hash,
+                    "entity_key": by_id[r.key].entity_key,
+                    "arkiv_updated": arkiv_updated.get(by_id[r.key].entity_key, False),
+                    "error": r.error,
+                }
+                for r in results
+            ],
+        }
+        
+    except (HTTPException, OverloadedError):
+        raise
+    except Exception as e:
+        await db.rollback()
+        if jobs and not recorded:
+            # Nothing was sent: release the claimed projects so they can be deployed again
+            await db.execute(
+                update(EscrowDeployment)
+                .where(EscrowDeployment.id.in_(job_ids), EscrowDeployment.status == "submitted")
+                .values(status="failed", error=str(e)[:500])
+            )
+            await db.commit()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error deploying escrows: {str(e)}"
+        )
+
+
+@router.get("/deployments/{job_id}", response_model=EscrowDeployment)
+async def get_deployment(job_id: int, db: AsyncSession = Depends(get_async_session)):
+    """Get the current stage of an escrow deployment job"""
+    job = await EscrowDeploymentService.get_by_id(job_id, db)
+    if not job:
+        raise HTTPException(status_code=404, detail="Deployment job not found")
+    return job
+
+
+@router.get("/deployments/{job_id}/events")
+async def stream_deployment(job_id: int, db: AsyncSession = Depends(get_async_session)):
+    """
+    Stream the stages of an escrow deployment job as Server-Sent Events
+    
+    Sends one `stage` event with the job state on connect and on every stage
+    change (queued, submitted, in_block, finalized, arkiv_synced, failed),
+    and closes the stream once the job is done.
+    """
+    if not await EscrowDeploymentService.get_by_id(job_id, db):
+        raise HTTPException(status_code=404, detail="Deployment job not found")
+    
+    async def events():
+        async for snapshot in EscrowDeploymentService.subscribe(job_id):
+            if snapshot is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: stage\ndata: {json.dumps(snapshot)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _simulated_state(project: SponsoredProject) -> dict:
+    """Escrow state of a simulated deployment (nothing exists on chain)"""
+    total = int(project.budget * PLANCK_PER_UNIT)
+    percentages = RococoDeployer.milestone_percentages(MILESTONE_COUNT)
+    return {
+        "status": "simulated",
+        "block_hash": None,
+        "total_amount": total,
+        "released_amount": 0,
+        "remaining_amount": total,
+        "milestones": [
+            {"index": i, "percentage": p, "amount": total * p // 100, "released": False}
+            for i, p in enumerate(percentages)
+        ],
+    }
+
+
+async def _escrow_infos(projects: List[SponsoredProject], pool: SubstratePool) -> List[dict]:
+    """On-chain escrow state of each project (one pipelined read for all of them)"""
+    on_chain = [p for p in projects if p.polkadot_smart_contract != SIMULATED_CONTRACT_ADDRESS]
+    targets = [
+        EscrowTarget(
+            contract_address=p.polkadot_smart_contract,
+            project_owner=p.project_id,
+            milestone_count=MILESTONE_COUNT,
+        )
+        for p in on_chain
+    ]
+    states = dict(zip((p.id for p in on_chain), await EscrowStateService.get_states(targets, pool))) if targets else {}
+    return [
+        {
+            "project_id": project.id,
+            "project_name": project.name,
+            "contract_address": project.polkadot_smart_contract,
+            "budget": project.budget,
+            "chain": project.chain,
+            **(states[project.id] if project.id in states else _simulated_state(project)),
+        }
+        for project in projects
+    ]
+
+
 @router.get("/escrow-info/{project_id}")
 async def get_escrow_info(
     project_id: int,
     db: AsyncSession = Depends(get_async_session),
+    pool: SubstratePool = Depends(get_substrate_pool),
 ):
     """
     Get information about a project's escrow contract
     
+    The escrow and milestone state is read from the contract with dry-run
+    calls (`get_escrow_statuses`, `get_milestones`) and cached per block.
+    
     Args:
         project_id: ID of the project
         
@@ -151,7 +404,6 @@ async def get_escrow_info(
         dict with escrow and milestone information
     """
     try:
-        from sqlalchemy import select
         query = select(SponsoredProject).where(SponsoredProject.id == project_id)
         result = await db.execute(query)
         project = result.scalars().first()
@@ -159,34 +411,136 @@ async def get_escrow_info(
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
         
-        if not project.contract_address:
+        if not project.polkadot_smart_contract:
             raise HTTPException(
                 status_code=404,
                 detail="Project does not have an escrow contract"
             )
         
-        # TODO: In production, query the contract state from Rococo
-        # For now, return placeholder info
+        return (await _escrow_infos([project], pool))[0]
+        
+    except (HTTPException, OverloadedError):
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching escrow info: {str(e)}"
+        )
+
+
+@router.post("/escrow-info:batch")
+async def get_escrow_infos(
+    project_ids: List[int] = Body(..., max_length=200),
+    db: AsyncSession = Depends(get_async_session),
+    pool: SubstratePool = Depends(get_substrate_pool),
+):
+    """
+    Get the escrow state of many projects at once
+    
+    All escrows are read at the same block in one pipelined round trip.
+    Projects that do not exist or have no escrow are listed under `missing`.
+    
+    Args:
+        project_ids: IDs of the projects (JSON array body)
         
+    Returns:
+        dict with one escrow info per project with an escrow
+    """
+    try:
+        query = select(SponsoredProject).where(SponsoredProject.id.in_(project_ids))
+        found = {p.id: p for p in (await db.execute(query)).scalars().all() if p.polkadot_smart_contract}
+        projects = [found[pid] for pid in dict.fromkeys(project_ids) if pid in found]
         return {
-            "project_id": project_id,
-            "project_name": project.name,
-            "contract_address": project.contract_address,
-            "budget": project.budget,
-            "chain": project.chain,
-            "status": "deployed",
-            "milestones": [
-                {"index": 0, "percentage": 25, "released": False},
-                {"index": 1, "percentage": 25, "released": False},
-                {"index": 2, "percentage": 25, "released": False},
-                {"index": 3, "percentage": 25, "released": False},
-            ]
+            "escrows": await _escrow_infos(projects, pool),
+            "missing": [pid for pid in project_ids if pid not in found],
         }
-        
-    except HTTPException:
+    except OverloadedError:
         raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error fetching escrow info: {str(e)}"
         )
+
+
+@router.get("/escrow-info/{project_id}/releases", response_model=List[EscrowReleaseOut])
+async def get_escrow_releases(project_id: int, db: AsyncSession = Depends(get_async_session)):
+    """
+    Get the milestone release history of a project's escrow
+    
+    Served from the indexed `escrow_events` table (finalized blocks only).
+    
+    Args:
+        project_id: ID of the project
+        
+    Returns:
+        list of releases, oldest first
+    """
+    project = await db.get(SponsoredProject, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if not project.polkadot_smart_contract:
+        raise HTTPException(status_code=404, detail="Project does not have an escrow contract")
+    
+    releases = await EscrowEventService.releases(project.polkadot_smart_contract, project.project_id, db)
+    return [EscrowReleaseOut.model_validate(release, from_attributes=True) for release in releases]
+
+
+@router.get("/release-totals")
+async def get_release_totals(db: AsyncSession = Depends(get_async_session)):
+    """
+    Get escrowed and released amounts of every project with an escrow
+    
+    Aggregated in SQL from the indexed `escrow_events` table.
+    
+    Returns:
+        dict mapping project ID to its totals (in planck)
+    """
+    query = select(SponsoredProject).where(SponsoredProject.polkadot_smart_contract.is_not(None))
+    projects = (await db.execute(query)).scalars().all()
+    return await EscrowEventService.totals(projects, db)
+
+
+@router.post("/releases:batch", dependencies=[admit(escrow_writes_limiter)])
+async def release_milestones_batch(
+    items: List[EscrowReleaseIn] = Body(..., max_length=1000),
+    db: AsyncSession = Depends(get_async_session),
+    arkiv_client: "Arkiv" = Depends(get_arkiv_client),
+    pool: SubstratePool = Depends(get_substrate_pool),
+):
+    """
+    Release many escrow milestones at once
+    
+    - Validates each (project, milestone) against the indexed escrow events
+      and the milestone rows (escrow exists, not cancelled, not released)
+    - Packs the release_milestone calls into utility.batch_all extrinsics
+      sized under the block weight limit
+    - Marks the released milestone rows in one commit and updates the
+      projects' Arkiv entities in a single Arkiv transaction
+    
+    Args:
+        items: milestones to release (JSON array body)
+        
+    Returns:
+        dict with per-item results and batch counts
+    """
+    try:
+        results = await EscrowReleaseService.release(items, db, arkiv_client, pool)
+    except OverloadedError:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error releasing milestones: {str(e)}"
+        )
+    
+    released = [r for r in results if r["success"]]
+    return {
+        "success": len(released) == len(results),
+        "requested": len(results),
+        "released": len(released),
+        "batches": len({r.get("batch") for r in released if r.get("batch") is not None}),
+        "results": results,
+    }
@@ -8,8 +8,8 @@ from src.schemas.project import ProjectRead
 
 class SponsorRequest(BaseModel):
     project: ProjectRead
-    ai_score: float
-    decision: str
+    ai_score: Optional[float] = None  # ignored: the stored evaluation's score is used
+    decision: Optional[str] = None
     contract_address: str
 
 class SponsoredProjectOut(BaseModel):
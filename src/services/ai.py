@@ -1,105 +1,270 @@
+import asyncio
 import json
-import os
-import re
-from pathlib import Path
+import time
 from typing import Any
 
-from google import genai
 from loguru import logger
+from pydantic import ValidationError
+
+from src.core.admission import OverloadedError, llm_limiter
+from src.core.instrumentation import track_dependency
+from src.core.metrics import Counter, Histogram
+from src.core.resilience import CircuitBreaker, CircuitOpenError, LatencyWindow, hedged
+from src.models.evaluate import EvaluateResponse
+from src.services.model_backends import ModelBackend, ModelReply, build_backend
+from src.services.prompt import EvaluationPrompt, EvaluationPromptBuilder, project_field
 from src.settings.gemini import GeminiSettings
 
+PARSE_RESULTS = Counter(
+    "ai_parse_results_total",
+    "Model outputs by validation outcome (ok, repaired, failed)",
+    ("outcome",),
+)
+EVALUATIONS = Counter(
+    "ai_evaluations_total",
+    "Project evaluations by result source (model, fallback)",
+    ("source",),
+)
+MODEL_CALL_SECONDS = Histogram(
+    "ai_model_call_duration_seconds",
+    "Latency of individual model calls by outcome (ok, hedged, timeout, error)",
+    ("outcome",),
+)
+TOKENS = Counter(
+    "ai_tokens_total",
+    "Tokens billed by kind (input, output, cached)",
+    ("kind",),
+)
+EVALUATION_SECONDS = Histogram(
+    "ai_evaluation_duration_seconds",
+    "End-to-end evaluation latency by result source (model, fallback)",
+    ("source",),
+)
+
+_DECODER = json.JSONDecoder()
+
 
 class AIService:
-    """Service wrapper that evaluates projects using an LLM (OpenAI).
+    """Service wrapper that evaluates projects using an LLM (Gemini).
 
     The primary flow is:
-    - Read the system prompt from `src/prompts/evaluation.md`.
-    - Build a user message containing the project data.
-    - Call OpenAI ChatCompletion (model: gpt-3.5-turbo by default) and
-      ask for a JSON response with `ai_score`, `decision` and `rationale`.
+    - Build a budgeted prompt with `EvaluationPromptBuilder`: the static
+      system prompt goes out as a system instruction (served from a context
+      cache when possible) and the project as compact JSON.
+    - Call the model backend (`AI_BACKEND`, see `src.services.model_backends`);
+      Gemini runs in structured-output mode with a response schema generated
+      from `EvaluateResponse`, so the model returns exactly
+      `ai_score`, `decision` and `rationale`.
 
-    If the OpenAI call fails or returns unparsable output, falls back to the
-    simple local heuristic used previously.
+    Output is validated in a single pass against `EvaluateResponse`. When
+    validation fails the model is called again, up to
+    `GeminiSettings.PARSE_RETRIES` times; after that (or without a usable
+    backend, e.g. no API key) a local heuristic evaluation is returned.
+
+    Every model call has a deadline (`GEMINI_TIMEOUT_SECONDS`) and a small
+    retry budget. Repeated failures open a circuit breaker, which short-cuts
+    straight to the local fallback until a probe call succeeds. With
+    `GEMINI_HEDGE_ENABLED` a second request is sent when the first one is
+    slower than the recent p95 latency.
     """
 
-    PROMPT_PATH = Path(__file__).resolve().parents[1] / "prompts" / "evaluation.md"
-    MODEL = os.getenv("GENERATIVE_MODEL", "gemini-2.5-flash")
+    _backend: ModelBackend | None = None
+    _backend_loaded = False
+    _breaker = CircuitBreaker(
+        "gemini",
+        failure_threshold=GeminiSettings.BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=GeminiSettings.BREAKER_RESET_SECONDS,
+    )
+    _latencies = LatencyWindow()
+    _prompt_builder = EvaluationPromptBuilder(GeminiSettings.PROMPT_TOKEN_BUDGET)
+
+    @classmethod
+    def get_backend(cls) -> ModelBackend | None:
+        """Return the configured model backend (built on first use), or None."""
+        if not cls._backend_loaded:
+            cls._backend = build_backend()
+            cls._backend_loaded = True
+        return cls._backend
+
+    @classmethod
+    def set_backend(cls, backend: ModelBackend | None) -> None:
+        """Swap the model backend, e.g. for a replay stand-in in load tests."""
+        cls._backend = backend
+        cls._backend_loaded = True
 
     @staticmethod
-    def _read_prompt() -> str:
-        return AIService.PROMPT_PATH.read_text(encoding="utf-8")
+    def _record_usage(reply: ModelReply, usage: dict) -> None:
+        """Add the call's token counts to `usage` and to the token counters."""
+        usage["input"] += reply.input_tokens
+        usage["output"] += reply.output_tokens
+        TOKENS.inc(reply.input_tokens, kind="input")
+        TOKENS.inc(reply.output_tokens, kind="output")
+        TOKENS.inc(reply.cached_tokens, kind="cached")
+
+    @classmethod
+    def _hedge_delay(cls) -> float | None:
+        """Seconds to wait before hedging, or None when hedging is off or unprimed."""
+        if not GeminiSettings.HEDGE_ENABLED or len(cls._latencies) < GeminiSettings.HEDGE_MIN_SAMPLES:
+            return None
+        return cls._latencies.quantile(GeminiSettings.HEDGE_QUANTILE)
+
+    @classmethod
+    async def _call_model(cls, backend: ModelBackend, prompt: EvaluationPrompt) -> ModelReply:
+        """Call the model with a deadline, retries, hedging and the circuit breaker.
+
+        Raises `OverloadedError` when no model call slot is free,
+        `CircuitOpenError` when the breaker rejects the call, otherwise the
+        last timeout/error once the retry budget is spent.
+        """
+
+        async def attempt() -> ModelReply:
+            with track_dependency("llm", "generate"):
+                return await asyncio.wait_for(backend.generate(prompt), timeout=GeminiSettings.TIMEOUT_SECONDS)
+
+        async with llm_limiter.slot():
+            last_error: Exception | None = None
+            for _ in range(1 + GeminiSettings.MAX_RETRIES):
+                if not cls._breaker.allow():
+                    raise CircuitOpenError(f"circuit '{cls._breaker.name}' is {cls._breaker.state}")
+
+                started = time.perf_counter()
+                try:
+                    response, was_hedged = await hedged(attempt, cls._hedge_delay())
+                except asyncio.TimeoutError as e:
+                    outcome, last_error = "timeout", e
+                except Exception as e:
+                    outcome, last_error = "error", e
+                except BaseException:
+                    # Cancelled: don't leave the breaker waiting on a half-open probe that never reports
+                    cls._breaker.record_abandoned()
+                    raise
+                else:
+                    elapsed = time.perf_counter() - started
+                    cls._latencies.add(elapsed)
+                    cls._breaker.record_success()
+                    MODEL_CALL_SECONDS.observe(elapsed, outcome="hedged" if was_hedged else "ok")
+                    return response
+
+                MODEL_CALL_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+                cls._breaker.record_failure()
+                logger.warning("Model call failed ({}): {}", outcome, last_error)
+
+            raise last_error
 
     @staticmethod
-    def _extract_json(text: str) -> dict | None:
-        # First, try to remove markdown code block wrapper if present
-        if text.strip().startswith("```json") and text.strip().endswith("```"):
-            text = text.strip()[len("```json"):-len("```")].strip()
+    def _parse_response(text: str) -> EvaluateResponse | None:
+        """Validate model output against `EvaluateResponse`.
 
-        # Try to find the first JSON object in text
+        Structured-output mode returns bare JSON, so the fast path is a single
+        `model_validate_json` call. If the model still wrapped the object in a
+        code fence or prose, decode exactly one object starting at the first
+        `{` instead of scanning the text with a regex.
+        """
         try:
-            return json.loads(text)
-        except Exception:
-            # Try to extract a JSON substring
-            m = re.search(r"(\{\s*\"ai_score\"[\s\S]*\})", text)
-            if m:
-                try:
-                    return json.loads(m.group(1))
-                except Exception:
-                    return None
-            return None
+            result = EvaluateResponse.model_validate_json(text)
+            PARSE_RESULTS.inc(outcome="ok")
+            return result
+        except ValidationError:
+            pass
+
+        start = text.find("{")
+        if start != -1:
+            try:
+                obj, _ = _DECODER.raw_decode(text, start)
+                result = EvaluateResponse.model_validate(obj)
+                PARSE_RESULTS.inc(outcome="repaired")
+                return result
+            except (ValueError, ValidationError):
+                pass
+
+        PARSE_RESULTS.inc(outcome="failed")
+        return None
+
+    @staticmethod
+    def _fallback_evaluation(project: Any, reason: str) -> dict:
+        """Score a project locally when the model cannot be used.
+
+        The heuristic only rewards completeness (description, milestones and a
+        positive budget) and never approves on its own: the best outcome is
+        `borderline`, so a human still reviews the project.
+        """
+        description = project_field(project, "description", "") or ""
+        milestones = project_field(project, "milestones", []) or []
+        budget = float(project_field(project, "budget", 0) or 0)
 
+        score = 0.0
+        if len(description) >= 200:
+            score += 30
+        elif description:
+            score += 15
+        score += min(len(milestones), 4) * 7.5
+        if budget > 0:
+            score += 10
+
+        return {
+            "ai_score": score,
+            "decision": "borderline" if score >= 50 else "reject",
+            "rationale": f"Local heuristic evaluation ({reason}); manual review required.",
+        }
+
+    @staticmethod
+    def prompt_hash(project: Any) -> str:
+        """Hash of the prompt that would be sent for `project` (identifies reusable results)."""
+        return AIService._prompt_builder.build(project).prompt_hash
 
     @staticmethod
-    def evaluate_project(project: Any) -> dict:
-        """Evaluate a project by calling OpenAI and returning a dict.
+    async def evaluate_project(project: Any) -> dict:
+        """Evaluate a project by calling Gemini and returning a dict.
 
         Input: `project` is expected to be a `src.models.project.Project` instance
-        (SQLModel/ Pydantic-compatible) or any object with `.name`, `.description`,
-        `.budget`, and `.milestones` attributes.
+        (SQLModel/ Pydantic-compatible), a dict, or any object with `.name`,
+        `.description`, `.budget`, and `.milestones` attributes.
 
-        Returns a dict with keys: ai_score (float), decision (str), rationale (str).
+        Returns a dict with keys: ai_score (float), decision (str), rationale (str),
+        plus bookkeeping keys: source, model, prompt_hash, input_tokens,
+        output_tokens and latency_ms.
         """
+        started = time.perf_counter()
+        prompt = AIService._prompt_builder.build(project)
+        result, source, usage = await AIService._evaluate(project, prompt)
+        elapsed = time.perf_counter() - started
 
-        # Build prompt and messages
-        system_prompt = AIService._read_prompt()
-
-        # Build a compact project representation for the model
-        proj = {}
-        proj["project_title"] = getattr(project, "name", "")
-        proj["project_description"] = getattr(project, "description", "") or ""
-        proj["budget_usd"] = float(getattr(project, "budget", 0) or 0)
-
-        milestones = []
-        for m in getattr(project, "milestones", []) or []:
-            # Milestone may be a SQLModel with name/description/amount
-            if isinstance(m, dict):
-                title = m.get("name") or m.get("title") or str(m)
-                desc = m.get("description", "")
-                milestones.append(f"{title}: {desc}")
-            else:
-                title = getattr(m, "name", None) or getattr(m, "title", None)
-                desc = getattr(m, "description", None)
-                if title and desc:
-                    milestones.append(f"{title}: {desc}")
-                elif title:
-                    milestones.append(str(title))
-                else:
-                    # Fallback to string representation
-                    milestones.append(str(m))
-
-        proj["milestones"] = milestones
-
-        user_message = (
-            "Please evaluate the following project and return ONLY a JSON object with keys:"
-            " ai_score (number), decision (approve|borderline|reject), rationale (short).\n\n"
-            "Example response: {\"ai_score\": 85, \"decision\": \"approve\", \"rationale\": \"The project meets all criteria.\"}"
-            f"Project data:\n{json.dumps(proj, ensure_ascii=False, indent=2)}"
-            f"{system_prompt}"
-        )
-
-        client = genai.Client(api_key=GeminiSettings.API_KEY.get_secret_value())
-        response = client.models.generate_content(
-            model="gemini-2.5-flash", contents=user_message
-        )
-        response_json = AIService._extract_json(response.text)
-        return response_json
\ No newline at end of file
+        EVALUATIONS.inc(source=source)
+        EVALUATION_SECONDS.observe(elapsed, source=source)
+        return {
+            **result,
+            "source": source,
+            "model": AIService.get_backend().model if source == "model" else "local-heuristic",
+            "prompt_hash": prompt.prompt_hash,
+            "input_tokens": usage["input"],
+            "output_tokens": usage["output"],
+            "latency_ms": round(elapsed * 1000, 1),
+        }
+
+    @staticmethod
+    async def _evaluate(project: Any, prompt: EvaluationPrompt) -> tuple[dict, str, dict]:
+        """Run the evaluation and return `(result, source, token usage)`."""
+        usage = {"input": 0, "output": 0}
+        backend = AIService.get_backend()
+        if backend is None:
+            return AIService._fallback_evaluation(project, "no model backend configured"), "fallback", usage
+
+        attempts = 1 + GeminiSettings.PARSE_RETRIES
+        for attempt in range(1, attempts + 1):
+            try:
+                response = await AIService._call_model(backend, prompt)
+            except OverloadedError:
+                # Shed load rather than answer with the heuristic
+                raise
+            except CircuitOpenError:
+                return AIService._fallback_evaluation(project, "model circuit breaker open"), "fallback", usage
+            except Exception:
+                return AIService._fallback_evaluation(project, "model unavailable"), "fallback", usage
+
+            AIService._record_usage(response, usage)
+            result = AIService._parse_response(response.text)
+            if result is not None:
+                return result.model_dump(), "model", usage
+            logger.warning("Model output failed validation (attempt {}/{})", attempt, attempts)
+
+        return AIService._fallback_evaluation(project, "model output failed validation"), "fallback", usage
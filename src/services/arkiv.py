@@ -1,10 +1,12 @@
+from __future__ import annotations
+
 import json
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 from loguru import logger
 
-from arkiv import Arkiv
-from arkiv.types import Attributes, PAYLOAD, ATTRIBUTES as ATTRIBUTES_FIELD, QueryOptions
+if TYPE_CHECKING:
+    from arkiv import Arkiv
 
 
 
@@ -13,6 +15,8 @@ class ArkivService:
     @staticmethod
     def save_sponsored_project(client: Arkiv, data: dict) -> str:
         """Save a sponsored project to Arkiv."""
+        from arkiv.types import Attributes
+
         payload = json.dumps(data).encode("utf-8")
 
         attrs = Attributes(
@@ -55,6 +59,32 @@ class ArkivService:
             "tx_hash": tx_hash
         }
     
+    @staticmethod
+    def _with_fields(entity, fields: dict):
+        """Return `(payload, attributes)` of `entity` with `fields` merged into its payload."""
+        from arkiv.types import Attributes
+
+        data = json.loads(entity.payload.decode("utf-8"))
+        data.update(fields)
+        
+        values = {
+            "type": "sponsored_project",
+            "projectId": data.get("project_id", ""),
+            "status": data.get("status", ""),
+            "aiScore": str(data.get("ai_score", "")),
+            "contractAddress": data.get("contract_address", ""),
+            "chain": data.get("chain", "asset_hub"),
+            "polkadotSmartContract": data.get("polkadot_smart_contract") or "",  # SC hash attribute
+        }
+        if "released_milestones" in data:
+            values["releasedMilestones"] = str(len(data["released_milestones"]))
+        return json.dumps(data).encode("utf-8"), Attributes(values)
+    
+    @staticmethod
+    def _with_contract(entity, contract_address: str):
+        """Return `(payload, attributes)` of `entity` with the smart contract address added."""
+        return ArkivService._with_fields(entity, {"polkadot_smart_contract": contract_address})
+    
     @staticmethod
     def update_entity_with_contract(
         client: Arkiv, 
@@ -84,32 +114,7 @@ class ArkivService:
             
             logger.info("Entity retrieved from Arkiv, proceeding with update...")
             
-            # Decode current payload
-            current_payload = entity.payload.decode("utf-8")
-            data = json.loads(current_payload)
-            
-            logger.info("Current entity data keys: {}", list(data.keys()))
-            
-            # Add the smart contract address
-            data["polkadot_smart_contract"] = contract_address
-            
-            logger.info("Added polkadot_smart_contract to payload: {}", contract_address)
-            
-            # Update the entity with new payload
-            updated_payload = json.dumps(data).encode("utf-8")
-            
-            # Update attributes to include the contract
-            attrs = Attributes(
-                {
-                    "type": "sponsored_project",
-                    "projectId": data.get("project_id", ""),
-                    "status": data.get("status", ""),
-                    "aiScore": str(data.get("ai_score", "")),
-                    "contractAddress": data.get("contract_address", ""),
-                    "chain": data.get("chain", "asset_hub"),
-                    "polkadotSmartContract": contract_address,  # NEW: SC hash attribute
-                }
-            )
+            updated_payload, attrs = ArkivService._with_contract(entity, contract_address)
             
             logger.info("Calling arkiv.update_entity with entity_key: {}", entity_key)
             
@@ -135,8 +140,68 @@ class ArkivService:
             logger.error("Traceback: {}", traceback.format_exc())
             return False
     
+    @staticmethod
+    def update_entities(client: Arkiv, updates: Dict[str, dict]) -> Dict[str, bool]:
+        """
+        Merge fields into the payload of several entities in one Arkiv transaction.
+        
+        Args:
+            client: Arkiv client instance
+            updates: Mapping of entity key -> payload fields to set
+            
+        Returns:
+            Mapping of entity key -> whether its update was committed
+        """
+        results = {key: False for key in updates}
+        batch = client.arkiv.batch()
+        for entity_key, fields in updates.items():
+            try:
+                entity = client.arkiv.get_entity(entity_key)
+            except Exception as e:
+                logger.error("Failed to read Arkiv entity {}: {}", entity_key, e)
+                continue
+            if not entity:
+                logger.error("Entity not found in Arkiv: {}", entity_key)
+                continue
+            payload, attrs = ArkivService._with_fields(entity, fields)
+            batch.update_entity(
+                entity_key=entity_key,
+                payload=payload,
+                content_type="application/json",
+                attributes=attrs,
+            )
+            results[entity_key] = True
+        
+        if batch.is_empty:
+            return results
+        try:
+            receipt = batch.execute()
+            logger.info("✅ Updated {} Arkiv entities in one batch: {}", batch.operation_count, receipt)
+        except Exception as e:
+            logger.error("❌ Arkiv batch update failed: {}", e)
+            return {key: False for key in updates}
+        return results
+    
+    @staticmethod
+    def update_entities_with_contracts(client: Arkiv, contracts: Dict[str, str]) -> Dict[str, bool]:
+        """
+        Add smart contract addresses to several entities in one Arkiv transaction.
+        
+        Args:
+            client: Arkiv client instance
+            contracts: Mapping of entity key -> deployed contract address
+            
+        Returns:
+            Mapping of entity key -> whether its update was committed
+        """
+        return ArkivService.update_entities(
+            client, {key: {"polkadot_smart_contract": address} for key, address in contracts.items()}
+        )
+    
     @staticmethod
     def list_sponsored_projects(client: Arkiv, status: Optional[str] = None) -> List[dict]:
+        from arkiv.types import ATTRIBUTES as ATTRIBUTES_FIELD, PAYLOAD, QueryOptions
+
         # Use SELECT * WHERE syntax for Arkiv queries
         query = "SELECT * WHERE type = 'sponsored_project'"
         if status:
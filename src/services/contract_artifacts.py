@@ -0,0 +1,93 @@
+"""Process-wide cache of the compiled escrow contract.
+
+The WASM blob and metadata are located and read once, the code hash is
+computed once, and the store remembers which chains already have that code
+uploaded, so deployments after the first only need an `instantiate` call.
+"""
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from src.settings.rococo import RococoSettings
+
+WASM_NAME = "funding_escrow.wasm"
+METADATA_NAME = "funding_escrow.json"
+
+
+@dataclass(frozen=True)
+class ContractArtifacts:
+    """Compiled contract loaded into memory."""
+
+    wasm: bytes
+    metadata: Dict[str, Any]
+    code_hash: bytes
+    wasm_path: Path
+    metadata_path: Path
+
+    @property
+    def code_hash_hex(self) -> str:
+        return f"0x{self.code_hash.hex()}"
+
+
+class ContractArtifactStore:
+    """Loads `ContractArtifacts` once and tracks uploaded code per chain."""
+
+    def __init__(self):
+        self._artifacts: Optional[ContractArtifacts] = None
+        self._uploaded: Set[Tuple[str, bytes]] = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _candidate_dirs() -> List[Path]:
+        dirs = []
+        if RococoSettings.ARTIFACTS_DIR:
+            dirs.append(Path(RococoSettings.ARTIFACTS_DIR))
+        dirs.append(Path(__file__).parent.parent.parent / "smart-contract" / "funding-escrow" / "target" / "ink")
+        dirs.append(Path.cwd() / "smart-contract" / "funding-escrow" / "target" / "ink")
+        return list(dict.fromkeys(d.resolve() for d in dirs))
+
+    @staticmethod
+    def _find(name: str) -> Path:
+        tried = [d / name for d in ContractArtifactStore._candidate_dirs()]
+        for path in tried:
+            if path.exists():
+                return path
+        raise FileNotFoundError(f"{name} not found. Tried: {[str(p) for p in tried]}")
+
+    def get(self) -> ContractArtifacts:
+        """Return the artifacts, reading them from disk on first use."""
+        if self._artifacts is None:
+            with self._lock:
+                if self._artifacts is None:
+                    wasm_path = self._find(WASM_NAME)
+                    metadata_path = self._find(METADATA_NAME)
+                    wasm = wasm_path.read_bytes()
+                    metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+                    self._artifacts = ContractArtifacts(
+                        wasm=wasm,
+                        metadata=metadata,
+                        # Same hash pallet-contracts uses to identify code (blake2b-256)
+                        code_hash=hashlib.blake2b(wasm, digest_size=32).digest(),
+                        wasm_path=wasm_path,
+                        metadata_path=metadata_path,
+                    )
+                    logger.info(
+                        "Loaded contract artifacts: {:.1f} KB WASM, code hash {}",
+                        len(wasm) / 1024,
+                        self._artifacts.code_hash_hex,
+                    )
+        return self._artifacts
+
+    def is_uploaded(self, rpc_url: str, code_hash: bytes) -> bool:
+        return (rpc_url, code_hash) in self._uploaded
+
+    def mark_uploaded(self, rpc_url: str, code_hash: bytes) -> None:
+        self._uploaded.add((rpc_url, code_hash))
+
+
+contract_artifacts = ContractArtifactStore()
@@ -0,0 +1,317 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.core.admission import arkiv_limiter
+from src.core.depends.arkiv import get_arkiv_client
+from src.core.depends.db import AsyncSessionLocal
+from src.core.depends.substrate import substrate_pool
+from src.core.jobs import JobQueue, JobQueueFull
+from src.models.escrow import EscrowDeployment
+from src.models.sponsor import SponsoredProject
+from src.services.arkiv import ArkivService
+from src.services.rococo_deployer import (
+    SIMULATED_CONTRACT_ADDRESS,
+    EscrowSpec,
+    RococoDeployer,
+    SubmissionUnknownError,
+)
+from src.settings.jobs import JobSettings
+
+MILESTONE_COUNT = 4
+PLANCK_PER_UNIT = 10**12  # Smallest unit (planck) per token
+
+ACTIVE_STATUSES = ("queued", "submitted", "in_block", "finalized")
+TERMINAL_STATUSES = ("arkiv_synced", "failed")
+
+
+class EscrowDeploymentService:
+    """Run escrow deployments as persisted background jobs.
+
+    A job creates the project's escrow in the shared escrow contract with a
+    single `utility.batch_all` extrinsic and records each stage as it is
+    reached: queued -> submitted -> in_block -> finalized -> arkiv_synced
+    (or failed). Stage changes are committed and published to in-process
+    subscribers, which back the SSE progress endpoint.
+
+    Jobs interrupted by a restart are resumed by `resume_pending`: if the
+    escrow already exists on chain the job skips to the Arkiv sync,
+    otherwise it is submitted again. A job whose connection dropped right
+    after submitting is left `submitted` for the same reconciliation.
+    """
+
+    _subscribers: Dict[int, Set[asyncio.Queue]] = {}
+
+    @staticmethod
+    async def get_by_id(job_id: int, session: AsyncSession) -> Optional[EscrowDeployment]:
+        """Return an EscrowDeployment by its numeric primary key `id` or None."""
+        stmt = select(EscrowDeployment).where(EscrowDeployment.id == job_id)
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_active_for_project(sponsored_project_id: int, session: AsyncSession) -> Optional[EscrowDeployment]:
+        """Return the unfinished deployment job of a project, if any."""
+        stmt = (
+            select(EscrowDeployment)
+            .where(
+                EscrowDeployment.sponsored_project_id == sponsored_project_id,
+                EscrowDeployment.status.in_(ACTIVE_STATUSES),
+            )
+            .order_by(EscrowDeployment.id.desc())
+            .limit(1)
+        )
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def list_by_project(sponsored_project_id: int, session: AsyncSession) -> List[EscrowDeployment]:
+        """Return the deployment jobs of a project, newest first."""
+        stmt = (
+            select(EscrowDeployment)
+            .where(EscrowDeployment.sponsored_project_id == sponsored_project_id)
+            .order_by(EscrowDeployment.id.desc())
+        )
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+    @staticmethod
+    async def enqueue(project: SponsoredProject, session: AsyncSession) -> EscrowDeployment:
+        """Create a queued deployment job for `project` (or return its active one)."""
+        # Serialises with `claim_for_batch` so a project is never deployed by both
+        await session.execute(
+            select(SponsoredProject.id).where(SponsoredProject.id == project.id).with_for_update()
+        )
+        active = await EscrowDeploymentService.get_active_for_project(project.id, session)
+        if active:
+            return active
+        job = EscrowDeployment(sponsored_project_id=project.id)
+        session.add(job)
+        await session.commit()
+        await session.refresh(job)
+        try:
+            deployment_queue.submit(job.id)
+        except JobQueueFull:
+            job.status = "failed"
+            job.error = "deployment queue full"
+            await session.commit()
+            raise
+        return job
+
+    @staticmethod
+    async def claim_for_batch(limit: int, session: AsyncSession) -> List[Tuple[SponsoredProject, EscrowDeployment]]:
+        """Claim up to `limit` approved projects without an escrow or an active job.
+
+        Each claimed project gets a `submitted` job row, committed before
+        anything is sent, so concurrent batch calls and background jobs skip it.
+        """
+        active_job = (
+            select(EscrowDeployment.id)
+            .where(
+                EscrowDeployment.sponsored_project_id == SponsoredProject.id,
+                EscrowDeployment.status.in_(ACTIVE_STATUSES),
+            )
+            .exists()
+        )
+        stmt = (
+            select(SponsoredProject)
+            .where(
+                SponsoredProject.status == "approved",
+                SponsoredProject.polkadot_smart_contract.is_(None),
+                ~active_job,
+            )
+            .order_by(SponsoredProject.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        projects = (await session.execute(stmt)).scalars().all()
+        jobs = [EscrowDeployment(sponsored_project_id=project.id, status="submitted") for project in projects]
+        session.add_all(jobs)
+        await session.commit()
+        return list(zip(projects, jobs))
+
+    @staticmethod
+    def _snapshot(job: EscrowDeployment) -> dict:
+        return job.model_dump(mode="json")
+
+    @classmethod
+    def _publish(cls, job: EscrowDeployment) -> None:
+        snapshot = cls._snapshot(job)
+        for queue in cls._subscribers.get(job.id, ()):
+            queue.put_nowait(snapshot)
+
+    @classmethod
+    async def _advance(cls, job_id: int, **fields) -> EscrowDeployment:
+        """Persist a stage change and notify subscribers."""
+        async with AsyncSessionLocal() as session:
+            job = await cls.get_by_id(job_id, session)
+            for key, value in fields.items():
+                setattr(job, key, value)
+            await session.commit()
+            await session.refresh(job)
+        cls._publish(job)
+        return job
+
+    @classmethod
+    async def subscribe(cls, job_id: int, heartbeat: float = 15.0) -> AsyncIterator[Optional[dict]]:
+        """Yield job snapshots as stages change, until the job is done.
+
+        Yields the current state first, then one snapshot per stage change;
+        `None` is yielded every `heartbeat` seconds without changes so callers
+        can keep the connection alive. The DB is re-read on each heartbeat in
+        case an update was missed.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        cls._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            async with AsyncSessionLocal() as session:
+                job = await cls.get_by_id(job_id, session)
+            if job is None:
+                return
+            snapshot = cls._snapshot(job)
+            yield snapshot
+            while snapshot["status"] not in TERMINAL_STATUSES:
+                try:
+                    update = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    async with AsyncSessionLocal() as session:
+                        job = await cls.get_by_id(job_id, session)
+                    if job.status == snapshot["status"]:
+                        yield None
+                        continue
+                    update = cls._snapshot(job)
+                snapshot = update
+                yield snapshot
+        finally:
+            subscribers = cls._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    cls._subscribers.pop(job_id, None)
+
+    @staticmethod
+    async def _deploy_on_chain(job: EscrowDeployment, project: SponsoredProject) -> EscrowDeployment:
+        """Take the job from its current chain stage to `finalized`."""
+        deployer = RococoDeployer(pool=substrate_pool)
+        if deployer.simulated:
+            for stage in ("submitted", "in_block"):
+                job = await EscrowDeploymentService._advance(
+                    job.id, status=stage, simulated=True, contract_address=SIMULATED_CONTRACT_ADDRESS
+                )
+            return await EscrowDeploymentService._advance(job.id, status="finalized")
+
+        if job.status == "in_block" and job.block_hash:
+            # Interrupted while waiting for finality
+            await deployer.wait_finalized(job.block_hash)
+            return await EscrowDeploymentService._advance(job.id, status="finalized")
+
+        if job.status != "queued" and job.contract_address:
+            # Interrupted after submission: don't create the escrow twice
+            if await deployer.escrow_exists(job.contract_address, project.project_id):
+                return await EscrowDeploymentService._advance(job.id, status="finalized")
+
+        spec = EscrowSpec(
+            key=project.id,
+            project_owner=project.project_id,
+            milestone_count=MILESTONE_COUNT,
+            total_amount=int(project.budget * PLANCK_PER_UNIT),
+        )
+        prepared = await deployer.prepare_escrow(spec)
+        try:
+            job = await EscrowDeploymentService._advance(
+                job.id,
+                status="submitted",
+                contract_address=prepared.contract_address,
+                extrinsic_hash=prepared.extrinsic_hash,
+                block_hash=None,
+            )
+            block_hash = await deployer.submit_prepared(prepared)
+        except BaseException:
+            # Never sent (e.g. the DB write failed or shutdown cancelled us): free its nonce
+            deployer.discard_prepared(prepared)
+            raise
+        job = await EscrowDeploymentService._advance(job.id, status="in_block", block_hash=block_hash)
+        await deployer.wait_finalized(block_hash)
+        return await EscrowDeploymentService._advance(job.id, status="finalized")
+
+    @staticmethod
+    async def _sync_arkiv(job: EscrowDeployment, project: SponsoredProject) -> None:
+        """Store the contract on the project row and its Arkiv entity."""
+        async with AsyncSessionLocal() as session:
+            row = await session.get(SponsoredProject, project.id)
+            row.polkadot_smart_contract = job.contract_address
+            await session.commit()
+
+        if not project.entity_key:
+            logger.warning("No entity_key for sponsored project {}, skipping Arkiv update", project.id)
+            await EscrowDeploymentService._advance(job.id, status="arkiv_synced", arkiv_updated=False)
+            return
+
+        async with arkiv_limiter.slot():
+            updated = await asyncio.to_thread(
+                ArkivService.update_entity_with_contract,
+                client=get_arkiv_client(),
+                entity_key=project.entity_key,
+                contract_address=job.contract_address,
+            )
+        if updated:
+            await EscrowDeploymentService._advance(job.id, status="arkiv_synced", arkiv_updated=True, error=None)
+        else:
+            # Stays `finalized`: the Arkiv sync is retried when the job is resumed
+            await EscrowDeploymentService._advance(job.id, error="Arkiv update failed; retried on restart")
+
+    @staticmethod
+    async def process_job(job_id: int) -> None:
+        """Worker handler: run a deployment job from its current stage."""
+        async with AsyncSessionLocal() as session:
+            job = await EscrowDeploymentService.get_by_id(job_id, session)
+            if not job or job.status in TERMINAL_STATUSES:
+                return
+            project = await session.get(SponsoredProject, job.sponsored_project_id)
+        if not project:
+            await EscrowDeploymentService._advance(job_id, status="failed", error="project not found")
+            return
+
+        try:
+            if job.status != "finalized":
+                job = await EscrowDeploymentService._deploy_on_chain(job, project)
+            await EscrowDeploymentService._sync_arkiv(job, project)
+        except SubmissionUnknownError as e:
+            # Stays `submitted`: on resume the escrow is looked up before anything is resubmitted
+            logger.warning("Escrow deployment job {} interrupted: {}", job_id, e)
+            await EscrowDeploymentService._advance(job_id, error=f"{e}; reconciled on restart"[:500])
+        except Exception as e:
+            logger.exception("Escrow deployment job {} failed", job_id)
+            await EscrowDeploymentService._advance(job_id, status="failed", error=str(e)[:500])
+
+    @staticmethod
+    async def resume_pending() -> int:
+        """Re-queue deployment jobs left unfinished by a previous process."""
+        async with AsyncSessionLocal() as session:
+            stmt = (
+                select(EscrowDeployment.id)
+                .where(EscrowDeployment.status.in_(ACTIVE_STATUSES))
+                .order_by(EscrowDeployment.id)
+            )
+            result = await session.execute(stmt)
+            pending = result.scalars().all()
+        for job_id in pending:
+            try:
+                deployment_queue.submit(job_id)
+            except JobQueueFull:
+                logger.warning("Deployment queue full, {} job(s) left for the next restart", len(pending))
+                break
+        if pending:
+            logger.info("Re-queued {} pending escrow deployments", len(pending))
+        return len(pending)
+
+
+deployment_queue = JobQueue(
+    "escrow-deployment",
+    EscrowDeploymentService.process_job,
+    workers=JobSettings.DEPLOYMENT_WORKERS,
+    maxsize=JobSettings.DEPLOYMENT_QUEUE_SIZE,
+)
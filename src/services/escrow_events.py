@@ -0,0 +1,310 @@
+"""Index escrow contract events from finalized blocks into `escrow_events`.
+
+`EscrowIndexer` follows the finalized head from a cursor persisted in
+`IndexerCursor`. Block ranges are fetched through the Substrate pool, up to
+`ESCROW_INDEXER_PARALLEL_CHUNKS` at a time while backfilling; the events of
+a window of ranges are bulk-inserted together with the cursor update in one
+transaction, so a restart neither skips nor duplicates blocks. Besides the
+known escrow contracts, events of any contract instantiated from the escrow
+code are indexed, so contracts deployed after a scan started (and before
+they reach the database) are not missed.
+
+`EscrowEventService` answers release history and totals from SQL, without
+touching the chain.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+from scalecodec.base import ScaleBytes
+from sqlalchemy import func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.core.admission import wait_for_slots
+from src.core.depends.db import AsyncSessionLocal
+from src.core.depends.substrate import SubstratePool, is_simulated, substrate_pool
+from src.core.metrics import Counter
+from src.models.escrow import EscrowEvent, IndexerCursor
+from src.models.sponsor import SponsoredProject
+from src.services.contract_artifacts import contract_artifacts
+from src.services.gas_estimates import gas_estimates
+from src.services.rococo_deployer import SIMULATED_CONTRACT_ADDRESS, RococoDeployer
+from src.settings.indexer import IndexerSettings
+from src.settings.rococo import RococoSettings
+
+if TYPE_CHECKING:
+    from substrateinterface import SubstrateInterface
+
+    from src.core.simulated_chain import SimulatedContractsNode
+
+INDEXED = Counter(
+    "escrow_indexer_items_total",
+    "Items processed by the escrow event indexer (blocks, events)",
+    ("kind",),
+)
+
+ESCROW_EVENTS = ("EscrowCreated", "FundsReleased", "EscrowCancelled")
+# Balance argument stored in `EscrowEvent.amount`, per event
+AMOUNT_ARGS = {"EscrowCreated": "total_amount", "FundsReleased": "amount", "EscrowCancelled": "remaining_amount"}
+
+
+class EscrowEventDecoder:
+    """Decode escrow events of a block range (blocking; runs on a pooled connection).
+
+    Events of `contracts` and of any other contract running the escrow code
+    are decoded.
+    """
+
+    def __init__(self, substrate: SubstrateInterface, contracts: Set[str]):
+        from substrateinterface.contracts import ContractMetadata
+
+        self.substrate = substrate
+        self.contracts = contracts
+        self.code_hash = contract_artifacts.get().code_hash_hex
+        self.metadata = ContractMetadata(contract_artifacts.get().metadata, substrate)
+
+    def _is_escrow(self, contract: str) -> bool:
+        if contract in self.contracts:
+            return True
+        return gas_estimates.code_hash(self.substrate, contract) == self.code_hash
+
+    def _event(self, record) -> Tuple[str, dict]:
+        """Name and arguments of a `ContractEmitted` record"""
+        from substrateinterface.contracts import ContractEvent
+
+        value = record.value
+        data = record["event"][1][1]["data"].value_object
+        if self.metadata.metadata_version >= 5:
+            for topic in value["topics"]:
+                event_id = self.metadata.get_event_id_by_topic(topic)
+                if event_id is not None:
+                    data = self.substrate.create_scale_object("U8").encode(event_id).data + data
+                    break
+        event = ContractEvent(
+            data=ScaleBytes(data), runtime_config=self.substrate.runtime_config, contract_metadata=self.metadata
+        )
+        event.decode()
+        return event.name, {arg["label"]: arg["value"] for arg in event.args}
+
+    def _decode(self, record) -> Optional[dict]:
+        value = record.value
+        if value["module_id"] != "Contracts" or value["event_id"] != "ContractEmitted":
+            return None
+        contract = value["attributes"]["contract"]
+        if not self._is_escrow(contract):
+            return None
+
+        name, args = self._event(record)
+        if name not in ESCROW_EVENTS:
+            return None
+        return {
+            "contract_address": contract,
+            "event": name,
+            "project_owner": args["project_owner"],
+            "milestone_index": args.get("milestone_index"),
+            "milestone_count": args.get("milestone_count"),
+            "amount": args.get(AMOUNT_ARGS[name]),
+            "extrinsic_index": value.get("extrinsic_idx"),
+        }
+
+    def fetch(self, start: int, end: int) -> List[dict]:
+        """Escrow events of blocks `start..end` (inclusive), as `EscrowEvent` rows"""
+        rows = []
+        for number in range(start, end + 1):
+            block_hash = self.substrate.get_block_hash(number)
+            block_rows = []
+            for event_index, record in enumerate(self.substrate.get_events(block_hash)):
+                decoded = self._decode(record)
+                if decoded:
+                    block_rows.append(
+                        {**decoded, "block_number": number, "block_hash": block_hash, "event_index": event_index}
+                    )
+            if block_rows:
+                now = self.substrate.query("Timestamp", "Now", block_hash=block_hash).value
+                timestamp = datetime.fromtimestamp(now / 1000, tz=timezone.utc)
+                rows.extend({**row, "block_timestamp": timestamp} for row in block_rows)
+        return rows
+
+
+class SimulatedEscrowEventDecoder(EscrowEventDecoder):
+    """Decoder for the simulated contracts node, whose events carry JSON data."""
+
+    def __init__(self, substrate: SimulatedContractsNode, contracts: Set[str]):
+        self.substrate = substrate
+        self.contracts = contracts
+        self.code_hash = f"0x{substrate.escrow_code_hash.hex()}"
+
+    def _event(self, record) -> Tuple[str, dict]:
+        payload = json.loads(bytes.fromhex(record.value["attributes"]["data"][2:]))
+        return payload["event"], payload["args"]
+
+
+def _decoder(substrate: SubstrateInterface, contracts: Set[str]) -> EscrowEventDecoder:
+    if is_simulated(substrate):
+        return SimulatedEscrowEventDecoder(substrate, contracts)
+    return EscrowEventDecoder(substrate, contracts)
+
+
+class EscrowIndexer:
+    """Background task following finalized blocks for escrow events."""
+
+    def __init__(self, pool: SubstratePool, name: str = "escrow-events"):
+        self.pool = pool
+        self.name = name
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None and IndexerSettings.ENABLED:
+            self._task = asyncio.create_task(self._run(), name=f"indexer-{self.name}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    @staticmethod
+    async def _contracts() -> Set[str]:
+        """Escrow contract addresses to index: every deployed project's plus the shared one"""
+        async with AsyncSessionLocal() as session:
+            stmt = select(SponsoredProject.polkadot_smart_contract).where(
+                SponsoredProject.polkadot_smart_contract.is_not(None)
+            ).distinct()
+            contracts = set((await session.execute(stmt)).scalars().all())
+        contracts.update(RococoDeployer._shared_escrows.values())
+        if RococoSettings.ESCROW_CONTRACT:
+            contracts.add(RococoSettings.ESCROW_CONTRACT)
+        contracts.discard(SIMULATED_CONTRACT_ADDRESS)
+        return contracts
+
+    async def _cursor(self, session: AsyncSession) -> Optional[IndexerCursor]:
+        stmt = select(IndexerCursor).where(IndexerCursor.name == self.name)
+        return (await session.execute(stmt)).scalar_one_or_none()
+
+    @staticmethod
+    def _finalized_number(substrate: SubstrateInterface) -> int:
+        return substrate.get_block_number(substrate.get_chain_finalised_head())
+
+    async def _index_window(self, ranges: List[Tuple[int, int]], contracts: Set[str]) -> None:
+        """Fetch `ranges` concurrently, then store their events and the new cursor atomically."""
+        chunks = await asyncio.gather(*(
+            self.pool.run(
+                lambda substrate, a=start, b=end: _decoder(substrate, contracts).fetch(a, b),
+                operation="fetch_escrow_events",
+            )
+            for start, end in ranges
+        ))
+        # Core bulk insert: Python-side field defaults are not applied
+        now = datetime.now()
+        rows = [{**row, "updated_at": now} for chunk in chunks for row in chunk]
+        last_block = ranges[-1][1]
+
+        async with AsyncSessionLocal() as session:
+            if rows:
+                await session.execute(insert(EscrowEvent), rows)
+            cursor = await self._cursor(session)
+            if cursor is None:
+                session.add(IndexerCursor(name=self.name, block_number=last_block))
+            else:
+                cursor.block_number = last_block
+            await session.commit()
+
+        INDEXED.inc(last_block - ranges[0][0] + 1, kind="blocks")
+        INDEXED.inc(len(rows), kind="events")
+        if rows:
+            logger.info("Indexed {} escrow events up to block {}", len(rows), last_block)
+
+    async def catch_up(self) -> int:
+        """Index every finalized block after the cursor; returns the new cursor block."""
+        finalized = await self.pool.run(self._finalized_number)
+        async with AsyncSessionLocal() as session:
+            cursor = await self._cursor(session)
+        if cursor is None:
+            start = IndexerSettings.START_BLOCK if IndexerSettings.START_BLOCK is not None else finalized
+        else:
+            start = cursor.block_number + 1
+        if start > finalized:
+            return start - 1
+
+        contracts = await self._contracts()
+        size = IndexerSettings.CHUNK_BLOCKS
+        ranges = [(a, min(a + size - 1, finalized)) for a in range(start, finalized + 1, size)]
+        for i in range(0, len(ranges), IndexerSettings.PARALLEL_CHUNKS):
+            await self._index_window(ranges[i:i + IndexerSettings.PARALLEL_CHUNKS], contracts)
+        return finalized
+
+    async def _run(self) -> None:
+        delay = IndexerSettings.POLL_SECONDS
+        while True:
+            try:
+                with wait_for_slots():
+                    await self.catch_up()
+                delay = IndexerSettings.POLL_SECONDS
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Escrow indexer failed, retrying in {:.0f}s: {}", delay, e)
+                delay = min(delay * 2, 300)
+            await asyncio.sleep(delay)
+
+
+class EscrowEventService:
+    """SQL queries over indexed escrow events."""
+
+    @staticmethod
+    async def releases(contract_address: str, project_id: str, session: AsyncSession) -> List[EscrowEvent]:
+        """FundsReleased events of a project's escrow, oldest first."""
+        stmt = (
+            select(EscrowEvent)
+            .where(
+                EscrowEvent.contract_address == contract_address,
+                EscrowEvent.project_owner == RococoDeployer.project_account(project_id),
+                EscrowEvent.event == "FundsReleased",
+            )
+            .order_by(EscrowEvent.block_number, EscrowEvent.event_index)
+        )
+        return (await session.execute(stmt)).scalars().all()
+
+    @staticmethod
+    async def totals(projects: List[SponsoredProject], session: AsyncSession) -> Dict[int, dict]:
+        """Escrowed, released and cancelled amounts per project, from indexed events."""
+        owners = {
+            (p.polkadot_smart_contract, RococoDeployer.project_account(p.project_id)): p.id
+            for p in projects
+            if p.polkadot_smart_contract
+        }
+        totals = {pid: {"total_amount": 0, "released_amount": 0, "releases": 0, "cancelled": False} for pid in owners.values()}
+        if not owners:
+            return totals
+
+        stmt = (
+            select(
+                EscrowEvent.contract_address,
+                EscrowEvent.project_owner,
+                EscrowEvent.event,
+                func.coalesce(func.sum(EscrowEvent.amount), 0),
+                func.count(),
+            )
+            .where(EscrowEvent.project_owner.in_({owner for _, owner in owners}))
+            .group_by(EscrowEvent.contract_address, EscrowEvent.project_owner, EscrowEvent.event)
+        )
+        for contract, owner, event, amount, count in (await session.execute(stmt)).all():
+            pid = owners.get((contract, owner))
+            if pid is None:
+                continue
+            if event == "EscrowCreated":
+                totals[pid]["total_amount"] = int(amount)
+            elif event == "FundsReleased":
+                totals[pid]["released_amount"] = int(amount)
+                totals[pid]["releases"] = count
+            elif event == "EscrowCancelled":
+                totals[pid]["cancelled"] = True
+        return totals
+
+
+escrow_indexer = EscrowIndexer(substrate_pool)
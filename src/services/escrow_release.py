@@ -0,0 +1,184 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.core.admission import arkiv_limiter, wait_for_slots
+from src.core.depends.substrate import SubstratePool
+from src.models.escrow import EscrowEvent, EscrowReleaseIn
+from src.models.milestone import Milestone
+from src.models.sponsor import SponsoredProject
+from src.services.arkiv import ArkivService
+from src.services.escrow_deployment import MILESTONE_COUNT
+from src.services.rococo_deployer import SIMULATED_CONTRACT_ADDRESS, ReleaseSpec, RococoDeployer
+
+if TYPE_CHECKING:
+    from arkiv import Arkiv
+
+
+class EscrowReleaseService:
+    """Release many escrow milestones in one pass.
+
+    Requested releases are checked against the DB (indexed escrow events
+    and milestone rows), submitted as batched `release_milestone` calls, and
+    their outcomes are written back with one DB commit and one Arkiv
+    transaction.
+    """
+
+    @staticmethod
+    async def _indexed_state(projects: List[SponsoredProject], session: AsyncSession) -> Dict[int, dict]:
+        """Whether each on-chain escrow was created or cancelled, and its released milestones."""
+        owners = {
+            (p.polkadot_smart_contract, RococoDeployer.project_account(p.project_id)): p.id
+            for p in projects
+            if p.polkadot_smart_contract and p.polkadot_smart_contract != SIMULATED_CONTRACT_ADDRESS
+        }
+        state = {pid: {"created": False, "cancelled": False, "released": set()} for pid in owners.values()}
+        if not owners:
+            return state
+
+        stmt = select(
+            EscrowEvent.contract_address, EscrowEvent.project_owner, EscrowEvent.event, EscrowEvent.milestone_index
+        ).where(EscrowEvent.project_owner.in_({owner for _, owner in owners}))
+        for contract, owner, event, milestone_index in (await session.execute(stmt)).all():
+            pid = owners.get((contract, owner))
+            if pid is None:
+                continue
+            if event == "EscrowCreated":
+                state[pid]["created"] = True
+            elif event == "EscrowCancelled":
+                state[pid]["cancelled"] = True
+            elif event == "FundsReleased":
+                state[pid]["released"].add(milestone_index)
+        return state
+
+    @staticmethod
+    def _milestone_row(rows: List[Milestone], milestone_index: int) -> Optional[Milestone]:
+        """The row of an escrow milestone: matched by index, else by creation order"""
+        for row in rows:
+            if row.milestone_index == milestone_index:
+                return row
+        ordered = sorted(rows, key=lambda row: row.id)
+        if milestone_index < len(ordered) and ordered[milestone_index].milestone_index is None:
+            return ordered[milestone_index]
+        return None
+
+    @staticmethod
+    async def release(
+        items: List[EscrowReleaseIn],
+        session: AsyncSession,
+        arkiv_client: "Arkiv",
+        pool: SubstratePool,
+    ) -> List[dict]:
+        """Validate, submit and record the requested releases; returns one result per item."""
+        project_ids = {item.sponsored_project_id for item in items}
+        projects = {
+            p.id: p
+            for p in (await session.execute(
+                select(SponsoredProject).where(SponsoredProject.id.in_(project_ids))
+            )).scalars().all()
+        }
+        milestones: Dict[str, List[Milestone]] = {}
+        if projects:
+            stmt = select(Milestone).where(Milestone.project_id.in_({p.project_id for p in projects.values()}))
+            for row in (await session.execute(stmt)).scalars().all():
+                milestones.setdefault(row.project_id, []).append(row)
+        indexed = await EscrowReleaseService._indexed_state(list(projects.values()), session)
+
+        results = [
+            {"sponsored_project_id": item.sponsored_project_id, "milestone_index": item.milestone_index,
+             "success": False, "status": "rejected", "error": None}
+            for item in items
+        ]
+        specs: List[ReleaseSpec] = []
+        seen: Set[Tuple[int, int]] = set()
+        for position, item in enumerate(items):
+            project = projects.get(item.sponsored_project_id)
+            state = indexed.get(item.sponsored_project_id)
+            row = None
+            if project:
+                row = EscrowReleaseService._milestone_row(milestones.get(project.project_id, []), item.milestone_index)
+            if not project:
+                error = "project not found"
+            elif not project.polkadot_smart_contract:
+                error = "project does not have an escrow contract"
+            elif not 0 <= item.milestone_index < MILESTONE_COUNT:
+                error = "invalid milestone index"
+            elif (item.sponsored_project_id, item.milestone_index) in seen:
+                error = "duplicate item"
+            elif state is not None and not state["created"]:
+                error = "escrow not indexed yet"
+            elif state is not None and state["cancelled"]:
+                error = "escrow cancelled"
+            elif (state is not None and item.milestone_index in state["released"]) or (row and row.released):
+                error = "milestone already released"
+            else:
+                error = None
+            seen.add((item.sponsored_project_id, item.milestone_index))
+            if error:
+                results[position]["error"] = error
+                continue
+            specs.append(ReleaseSpec(
+                key=position,
+                contract_address=project.polkadot_smart_contract,
+                project_owner=project.project_id,
+                milestone_index=item.milestone_index,
+            ))
+
+        if not specs:
+            return results
+
+        outcomes = await RococoDeployer(pool=pool).release_milestones(specs)
+
+        # Record every successful release with one commit
+        released_at = datetime.now(timezone.utc)
+        released: Dict[int, Set[int]] = {}
+        for spec, outcome in zip(specs, outcomes):
+            item = items[spec.key]
+            results[spec.key].update(
+                success=outcome.success,
+                status=outcome.status,
+                batch=outcome.batch,
+                block_hash=outcome.block_hash,
+                extrinsic_hash=outcome.extrinsic_hash,
+                error=outcome.error,
+            )
+            if not outcome.success:
+                continue
+            released.setdefault(item.sponsored_project_id, set()).add(item.milestone_index)
+            project = projects[item.sponsored_project_id]
+            row = EscrowReleaseService._milestone_row(milestones.get(project.project_id, []), item.milestone_index)
+            if row is not None:
+                row.milestone_index = item.milestone_index
+                row.released = True
+                row.released_at = released_at
+                row.release_block_hash = outcome.block_hash
+                results[spec.key]["milestone_id"] = row.id
+        await session.commit()
+
+        # Publish each project's released milestones in one Arkiv transaction
+        updates = {}
+        for pid, indexes in released.items():
+            project = projects[pid]
+            if not project.entity_key:
+                continue
+            before = indexed.get(pid, {}).get("released", set()) | {
+                row.milestone_index for row in milestones.get(project.project_id, []) if row.released
+            }
+            updates[project.entity_key] = {"released_milestones": sorted(before | indexes)}
+        arkiv_updated = {}
+        if updates:
+            # The milestones are already released on chain: wait for an Arkiv slot rather than shed the sync
+            with wait_for_slots():
+                async with arkiv_limiter.slot():
+                    arkiv_updated = await asyncio.to_thread(ArkivService.update_entities, arkiv_client, updates)
+            if not all(arkiv_updated.values()):
+                logger.warning("Arkiv release update failed for {} project(s)", list(arkiv_updated.values()).count(False))
+
+        for spec in specs:
+            project = projects[items[spec.key].sponsored_project_id]
+            results[spec.key]["arkiv_updated"] = arkiv_updated.get(project.entity_key, False)
+        return results
@@ -0,0 +1,322 @@
+"""On-chain escrow state, read through dry-run contract calls.
+
+Reads are cheap for the node but not for a request: each view message is a
+`ContractsApi_call` runtime call. `EscrowStateService` keeps them off the
+request path as much as possible:
+
+- a request needs one `get_escrow_statuses` call per contract and one
+  `get_milestones` call per project, sent pipelined on one pooled
+  connection, so they cost one network round trip;
+- results are cached per block hash, and the best block is only re-fetched
+  every `ROCOCO_STATE_HEAD_TTL_SECONDS`, so concurrent viewers of the same
+  escrow share one read per block;
+- concurrent misses for the same escrow wait on the same in-flight read.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from scalecodec.base import ScaleBytes
+
+from src.core.depends.substrate import SubstratePool, is_simulated
+from src.core.metrics import Counter
+from src.services.contract_artifacts import contract_artifacts
+from src.services.rococo_deployer import RococoDeployer
+from src.settings.rococo import RococoSettings
+
+if TYPE_CHECKING:
+    from substrateinterface import SubstrateInterface
+
+    from src.core.simulated_chain import SimulatedContractsNode
+
+READS = Counter(
+    "escrow_state_reads_total",
+    "Escrow state lookups by result (hit, coalesced, miss)",
+    ("result",),
+)
+
+# Origin of view calls; any account works for messages that do not write
+VIEW_ORIGIN = "5GrwvaEF5zXb26Fz9rcQpDWS57CtERHpNehXCPcNoHGKutQY"
+CACHED_BLOCKS = 2
+
+
+@dataclass(frozen=True)
+class EscrowTarget:
+    """An escrow to read: the contract holding it and the project owner key"""
+    contract_address: str
+    project_owner: str
+    milestone_count: int
+
+
+def _unwrap(value: Any) -> Any:
+    """Strip ink!'s `Result<T, LangError>` wrapper from a decoded message result"""
+    from substrateinterface.exceptions import ContractReadFailedException
+
+    if isinstance(value, dict) and "Ok" in value:
+        return value["Ok"]
+    if isinstance(value, dict) and "Err" in value:
+        raise ContractReadFailedException(value["Err"])
+    return value
+
+
+class EscrowStateReader:
+    """Blocking dry-run reader; runs on a pooled connection."""
+
+    def __init__(self, substrate: SubstrateInterface, block_hash: str):
+        from substrateinterface.contracts import ContractMetadata
+
+        self.substrate = substrate
+        self.block_hash = block_hash
+        self.metadata = ContractMetadata(contract_artifacts.get().metadata, substrate)
+        substrate.init_runtime(block_hash=block_hash)
+        api = substrate.runtime_config.type_registry["runtime_api"]["ContractsApi"]
+        substrate.runtime_config.update_type_registry_types(api.get("types", {}))
+        self.call_def = api["methods"]["call"]
+
+    def _encode(self, contract_address: str, message: str, args: dict) -> str:
+        """SCALE-encode the `ContractsApi_call` parameters of one view message"""
+        params = {
+            "origin": VIEW_ORIGIN,
+            "dest": contract_address,
+            "value": 0,
+            "gas_limit": None,
+            "storage_deposit_limit": None,
+            "input_data": self.metadata.generate_message_data(name=message, args=args).to_hex(),
+        }
+        data = ScaleBytes(bytes())
+        for param in self.call_def["params"]:
+            data += self.substrate.runtime_config.create_scale_object(param["type"]).encode(params[param["name"]])
+        return str(data)
+
+    def _state_calls(self, payloads: List[str]) -> List[str]:
+        """Run `state_call`s pipelined on the websocket: send all, then collect all replies"""
+        from substrateinterface.exceptions import SubstrateRequestException
+
+        websocket = self.substrate.websocket
+        if websocket is None:
+            return [
+                self.substrate.rpc_request("state_call", ["ContractsApi_call", data, self.block_hash])["result"]
+                for data in payloads
+            ]
+
+        first_id = self.substrate.request_id
+        self.substrate.request_id += len(payloads)
+        for offset, data in enumerate(payloads):
+            websocket.send(json.dumps({
+                "jsonrpc": "2.0",
+                "method": "state_call",
+                "params": ["ContractsApi_call", data, self.block_hash],
+                "id": first_id + offset,
+            }))
+
+        results: Dict[int, str] = {}
+        while len(results) < len(payloads):
+            reply = json.loads(websocket.recv())
+            request_id = reply.get("id")
+            if not isinstance(request_id, int) or not first_id <= request_id < first_id + len(payloads):
+                continue
+            if "error" in reply:
+                raise SubstrateRequestException(reply["error"]["message"])
+            results[request_id] = reply["result"]
+        return [results[first_id + offset] for offset in range(len(payloads))]
+
+    def _decode(self, message: str, result: str) -> Any:
+        from substrateinterface.exceptions import ContractReadFailedException
+
+        call_result = self.substrate.runtime_config.create_scale_object(self.call_def["type"])
+        call_result.decode(ScaleBytes(result))
+        if "Error" in call_result["result"]:
+            raise ContractReadFailedException(call_result.value["result"]["Error"])
+        return_type = self.metadata.get_return_type_string_for_message(message)
+        value = self.substrate.runtime_config.create_scale_object(return_type)
+        value.decode(ScaleBytes(call_result["result"][1]["data"].value_object))
+        return _unwrap(value.value)
+
+    @staticmethod
+    def _state(status: Any, milestones: List[Any]) -> dict:
+        if status is None:
+            return {"status": "not_found", "total_amount": 0, "released_amount": 0, "remaining_amount": 0, "milestones": []}
+        total, released, cancelled, completed = status
+        return {
+            "status": "cancelled" if cancelled else "completed" if completed else "active",
+            "total_amount": total,
+            "released_amount": released,
+            "remaining_amount": total - released,
+            "milestones": [
+                {
+                    "index": index,
+                    "percentage": round(milestone[0] * 100 / total) if total else 0,
+                    "amount": milestone[0],
+                    "released": milestone[1],
+                }
+                for index, milestone in enumerate(milestones)
+                if milestone is not None
+            ],
+        }
+
+    def _run_plan(self, plan: List[Tuple[Any, str, str, dict]]) -> List[Any]:
+        """Send `(tag, contract, message, args)` view calls in one round trip.
+
+        Returns the decoded value of each call, or the
+        `ContractReadFailedException` it failed with.
+        """
+        from substrateinterface.exceptions import ContractReadFailedException
+
+        results = self._state_calls([self._encode(contract, message, args) for _, contract, message, args in plan])
+        decoded: List[Any] = []
+        for (_, _, message, _), result in zip(plan, results):
+            try:
+                decoded.append(self._decode(message, result))
+            except ContractReadFailedException as e:
+                decoded.append(e)
+        return decoded
+
+    def _read_each(self, targets: List[EscrowTarget], owners: List[str], positions: List[int]) -> Dict[int, tuple]:
+        """One call per escrow status and per milestone, for contracts without the bulk views"""
+        plan = []
+        for position in positions:
+            contract, owner = targets[position].contract_address, owners[position]
+            plan.append((position, contract, "get_escrow_status", {"project_owner": owner}))
+            plan.extend(
+                (position, contract, "get_milestone_status", {"project_owner": owner, "milestone_index": index})
+                for index in range(targets[position].milestone_count)
+            )
+        values: Dict[int, list] = {position: [] for position in positions}
+        for (position, _, _, _), value in zip(plan, self._run_plan(plan)):
+            if isinstance(value, Exception):
+                raise value
+            values[position].append(value)
+        return {position: (found[0], found[1:]) for position, found in values.items()}
+
+    def read_many(self, targets: List[EscrowTarget]) -> List[dict]:
+        """Read escrow status and all milestones of every target in one round trip.
+
+        Uses one `get_escrow_statuses` call per contract plus one
+        `get_milestones` call per target. Contracts deployed before those
+        messages existed are re-read with per-milestone calls.
+        """
+        owners = [RococoDeployer.project_account(target.project_owner) for target in targets]
+        groups: Dict[str, List[int]] = {}
+        for position, target in enumerate(targets):
+            groups.setdefault(target.contract_address, []).append(position)
+
+        plan: List[Tuple[Any, str, str, dict]] = []
+        for contract, positions in groups.items():
+            plan.append((None, contract, "get_escrow_statuses", {"project_owners": [owners[p] for p in positions]}))
+            plan.extend((p, contract, "get_milestones", {"project_owner": owners[p]}) for p in positions)
+
+        statuses: Dict[int, Any] = {}
+        milestones: Dict[int, List[Any]] = {}
+        legacy: List[int] = []
+        for (position, contract, _, _), value in zip(plan, self._run_plan(plan)):
+            if isinstance(value, Exception):
+                if contract in groups:
+                    legacy.extend(groups.pop(contract))
+            elif position is None:
+                statuses.update(zip(groups.get(contract, []), value))
+            else:
+                milestones[position] = list(value)
+
+        states = {
+            position: (statuses[position], milestones[position])
+            for positions in groups.values()
+            for position in positions
+        }
+        if legacy:
+            states.update(self._read_each(targets, owners, legacy))
+
+        return [
+            {**self._state(*states[position]), "block_hash": self.block_hash}
+            for position in range(len(targets))
+        ]
+
+
+class SimulatedEscrowStateReader(EscrowStateReader):
+    """Reader for the simulated contracts node: view calls are local dry runs."""
+
+    def __init__(self, substrate: SimulatedContractsNode, block_hash: str):
+        self.substrate = substrate
+        self.block_hash = block_hash
+
+    def _encode(self, contract_address: str, message: str, args: dict) -> Tuple[str, str, dict]:
+        return contract_address, message, args
+
+    def _state_calls(self, payloads: List[Tuple[str, str, dict]]) -> List[Any]:
+        return [self.substrate.dry_run(VIEW_ORIGIN, *payload) for payload in payloads]
+
+    def _decode(self, message: str, result: Any) -> Any:
+        return _unwrap(result.value["result"]["Ok"]["data"])
+
+
+def _reader(substrate: SubstrateInterface, block_hash: str) -> EscrowStateReader:
+    if is_simulated(substrate):
+        return SimulatedEscrowStateReader(substrate, block_hash)
+    return EscrowStateReader(substrate, block_hash)
+
+
+class EscrowStateService:
+    """Per-block cache of escrow state shared by all requests."""
+
+    _head: Optional[Tuple[str, float]] = None
+    _head_lock: Optional[asyncio.Lock] = None
+    _cache: Dict[str, Dict[EscrowTarget, dict]] = {}
+    _pending: Dict[Tuple[str, EscrowTarget], asyncio.Future] = {}
+
+    @classmethod
+    async def _block_hash(cls, pool: SubstratePool) -> str:
+        """Best block hash, re-fetched at most every `ROCOCO_STATE_HEAD_TTL_SECONDS`"""
+        if cls._head_lock is None:
+            cls._head_lock = asyncio.Lock()
+        async with cls._head_lock:
+            if cls._head is None or time.monotonic() - cls._head[1] > RococoSettings.STATE_HEAD_TTL_SECONDS:
+                block_hash = await pool.run(lambda substrate: substrate.get_chain_head(), operation="get_chain_head")
+                cls._head = (block_hash, time.monotonic())
+                if block_hash not in cls._cache:
+                    cls._cache[block_hash] = {}
+                    while len(cls._cache) > CACHED_BLOCKS:
+                        cls._cache.pop(next(iter(cls._cache)))
+            return cls._head[0]
+
+    @classmethod
+    async def get_states(cls, targets: List[EscrowTarget], pool: SubstratePool) -> List[dict]:
+        """Return the state of each target at the current best block, in input order"""
+        block_hash = await cls._block_hash(pool)
+        bucket = cls._cache.setdefault(block_hash, {})
+
+        missing: List[EscrowTarget] = []
+        waiting: Dict[EscrowTarget, asyncio.Future] = {}
+        for target in dict.fromkeys(targets):
+            if target in bucket:
+                READS.inc(result="hit")
+            elif (block_hash, target) in cls._pending:
+                READS.inc(result="coalesced")
+                waiting[target] = cls._pending[(block_hash, target)]
+            else:
+                READS.inc(result="miss")
+                missing.append(target)
+                cls._pending[(block_hash, target)] = asyncio.get_running_loop().create_future()
+
+        if missing:
+            try:
+                states = await pool.run(
+                    lambda substrate: _reader(substrate, block_hash).read_many(missing), operation="read_escrow_states"
+                )
+            except BaseException as e:
+                # Also on cancellation, or coalesced waiters would hang on these futures
+                error = e if isinstance(e, Exception) else RuntimeError("Escrow state read was cancelled")
+                for target in missing:
+                    future = cls._pending.pop((block_hash, target))
+                    future.set_exception(error)
+                    future.exception()  # retrieved here; waiters re-raise it themselves
+                raise
+            for target, state in zip(missing, states):
+                bucket[target] = state
+                cls._pending.pop((block_hash, target)).set_result(state)
+
+        for target, future in waiting.items():
+            bucket[target] = await future
+        return [bucket[target] for target in targets]
@@ -0,0 +1,257 @@
+from typing import List, Optional
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.core.depends.db import AsyncSessionLocal
+from src.core.jobs import JobQueue, JobQueueFull
+from src.core.metrics import Counter
+from src.models.evaluation import Evaluation
+from src.models.project import Project
+from src.services.ai import AIService
+from src.services.milestone import MilestoneService
+from src.services.project import ProjectService
+from src.services.similarity import ProjectSimilarityIndex, SimilarityService
+from src.settings.jobs import JobSettings
+from src.settings.similarity import SimilaritySettings
+
+REUSE = Counter(
+    "evaluation_reuse_total",
+    "Evaluations answered from a stored result (hit), a near-duplicate project (similar) or neither (miss)",
+    ("result",),
+)
+
+
+class EvaluationService:
+    """Service for evaluating projects and managing the `Evaluation` history.
+
+    Results are persisted so later reads (and `/sponsor`) use the stored
+    evaluation instead of calling the model again. A stored result is reused
+    only while its prompt hash matches the project's current prompt, so any
+    edit to the project or its milestones triggers a fresh evaluation, unless
+    a near-duplicate project already has a model evaluation to copy.
+    """
+
+    @staticmethod
+    async def get_by_id(evaluation_id: int, session: AsyncSession) -> Optional[Evaluation]:
+        """Return an Evaluation by its numeric primary key `id` or None."""
+        stmt = select(Evaluation).where(Evaluation.id == evaluation_id)
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_latest_for_project(
+        project_id: str,
+        session: AsyncSession,
+        source: Optional[str] = None,
+        exclude_source: Optional[str] = None,
+    ) -> Optional[Evaluation]:
+        """Return the newest completed Evaluation for `project_id`, optionally filtered by source."""
+        stmt = select(Evaluation).where(Evaluation.project_id == project_id, Evaluation.status == "completed")
+        if source:
+            stmt = stmt.where(Evaluation.source == source)
+        if exclude_source:
+            stmt = stmt.where(Evaluation.source.is_distinct_from(exclude_source))
+        stmt = stmt.order_by(Evaluation.id.desc()).limit(1)
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def list_by_project(project_id: str, session: AsyncSession, skip: int = 0, limit: int = 100) -> List[Evaluation]:
+        """Return the evaluation history for a project, newest first."""
+        stmt = (
+            select(Evaluation)
+            .where(Evaluation.project_id == project_id)
+            .order_by(Evaluation.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+    @staticmethod
+    async def create(evaluation_data: dict, session: AsyncSession) -> Evaluation:
+        """Create a new evaluation row."""
+        evaluation = Evaluation(**evaluation_data)
+        session.add(evaluation)
+        await session.commit()
+        await session.refresh(evaluation)
+        return evaluation
+
+    @staticmethod
+    async def project_payload(project: Project, session: AsyncSession) -> dict:
+        """Build the evaluation input for a project, including its milestones."""
+        milestones = await MilestoneService.list_by_project(project.project_id, session)
+        return {
+            "name": project.name,
+            "description": project.description,
+            "budget": project.budget,
+            "milestones": milestones,
+        }
+
+    @staticmethod
+    def _result_fields(result: dict) -> dict:
+        return {
+            "status": "completed",
+            "ai_score": result["ai_score"],
+            "decision": result["decision"],
+            "rationale": result["rationale"],
+            "source": result["source"],
+            "model": result["model"],
+            "prompt_hash": result["prompt_hash"],
+            "latency_ms": result["latency_ms"],
+            "input_tokens": result["input_tokens"],
+            "output_tokens": result["output_tokens"],
+        }
+
+    @staticmethod
+    async def _reusable_fields(project: Project, payload: dict, session: AsyncSession) -> Optional[dict]:
+        """Return result fields from a stored evaluation that can stand in for a new one.
+
+        First choice is this project's own model evaluation with an identical
+        prompt hash; second is the model evaluation of a near-duplicate
+        project above `SIMILARITY_REUSE_THRESHOLD` that asks for the same
+        budget and milestone amounts.
+        """
+        prompt_hash = AIService.prompt_hash(payload)
+        stored = await EvaluationService.get_latest_for_project(project.project_id, session, source="model")
+        if stored and stored.prompt_hash == prompt_hash:
+            REUSE.inc(result="hit")
+            return {"reused_from_id": stored.id, **EvaluationService._copied_fields(stored, "model", prompt_hash)}
+
+        text = ProjectSimilarityIndex.project_text(payload, payload["milestones"])
+        matches = SimilarityService.similar(
+            text, limit=3, min_score=SimilaritySettings.REUSE_THRESHOLD, exclude=project.id
+        )
+        for match_pk, score in matches:
+            other = await ProjectService.get_by_id(match_pk, session)
+            if not other:
+                continue
+            other_payload = await EvaluationService.project_payload(other, session)
+            if EvaluationService._amounts(other_payload) != EvaluationService._amounts(payload):
+                # Similar text, different money: its score says nothing about this ask
+                continue
+            stored = await EvaluationService.get_latest_for_project(other.project_id, session, source="model")
+            if stored:
+                logger.info(
+                    "Reusing evaluation {} of project {} for {} (similarity {:.3f})",
+                    stored.id, other.project_id, project.project_id, score,
+                )
+                REUSE.inc(result="similar")
+                return {"reused_from_id": stored.id, **EvaluationService._copied_fields(stored, "similar", prompt_hash)}
+
+        REUSE.inc(result="miss")
+        return None
+
+    @staticmethod
+    def _amounts(payload: dict) -> tuple:
+        """Budget and milestone amounts (unordered: milestone rows have no stable order)"""
+        return payload["budget"], sorted(milestone.amount for milestone in payload["milestones"])
+
+    @staticmethod
+    def _copied_fields(stored: Evaluation, source: str, prompt_hash: str) -> dict:
+        return {
+            "status": "completed",
+            "ai_score": stored.ai_score,
+            "decision": stored.decision,
+            "rationale": stored.rationale,
+            "source": source,
+            "model": stored.model,
+            "prompt_hash": prompt_hash,
+            "latency_ms": 0.0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+        }
+
+    @staticmethod
+    async def evaluate(project: Project, session: AsyncSession, refresh: bool = False) -> Evaluation:
+        """Evaluate a project now, reusing a stored result when possible (unless `refresh`)."""
+        payload = await EvaluationService.project_payload(project, session)
+        if not refresh:
+            reused = await EvaluationService._reusable_fields(project, payload, session)
+            if reused:
+                return await EvaluationService.create({"project_id": project.project_id, **reused}, session)
+
+        # End the read transaction so no pooled connection is held during the model call
+        await session.commit()
+        result = await AIService.evaluate_project(payload)
+        return await EvaluationService.create(
+            {"project_id": project.project_id, **EvaluationService._result_fields(result)}, session
+        )
+
+    @staticmethod
+    async def enqueue(project: Project, session: AsyncSession) -> Evaluation:
+        """Create a queued evaluation and hand it to the worker queue.
+
+        Raises `JobQueueFull` when the queue is at capacity; the row is then
+        marked failed so it is not picked up again on restart.
+        """
+        evaluation = await EvaluationService.create({"project_id": project.project_id}, session)
+        try:
+            evaluation_queue.submit(evaluation.id)
+        except JobQueueFull:
+            evaluation.status = "failed"
+            evaluation.error = "evaluation queue full"
+            await session.commit()
+            raise
+        return evaluation
+
+    @staticmethod
+    async def process_job(evaluation_id: int) -> None:
+        """Worker handler: run a queued evaluation and store its result."""
+        async with AsyncSessionLocal() as session:
+            evaluation = await EvaluationService.get_by_id(evaluation_id, session)
+            if not evaluation or evaluation.status not in ("queued", "running"):
+                return
+            project = await ProjectService.get_by_project_id(evaluation.project_id, session)
+            if not project:
+                evaluation.status = "failed"
+                evaluation.error = "project not found"
+                await session.commit()
+                return
+            payload = await EvaluationService.project_payload(project, session)
+            reused = await EvaluationService._reusable_fields(project, payload, session)
+            evaluation.status = "running"
+            await session.commit()
+
+        try:
+            if reused:
+                update = reused
+            else:
+                result = await AIService.evaluate_project(payload)
+                update = EvaluationService._result_fields(result)
+        except Exception as e:
+            logger.exception("Evaluation job {} failed", evaluation_id)
+            update = {"status": "failed", "error": str(e)[:500]}
+
+        async with AsyncSessionLocal() as session:
+            evaluation = await EvaluationService.get_by_id(evaluation_id, session)
+            for key, value in update.items():
+                setattr(evaluation, key, value)
+            await session.commit()
+
+    @staticmethod
+    async def resume_pending() -> int:
+        """Re-queue jobs left queued or running by a previous process."""
+        async with AsyncSessionLocal() as session:
+            stmt = select(Evaluation.id).where(Evaluation.status.in_(("queued", "running"))).order_by(Evaluation.id)
+            result = await session.execute(stmt)
+            pending = result.scalars().all()
+        for evaluation_id in pending:
+            try:
+                evaluation_queue.submit(evaluation_id)
+            except JobQueueFull:
+                logger.warning("Evaluation queue full, {} job(s) left for the next restart", len(pending))
+                break
+        if pending:
+            logger.info("Re-queued {} pending evaluations", len(pending))
+        return len(pending)
+
+
+evaluation_queue = JobQueue(
+    "evaluation",
+    EvaluationService.process_job,
+    workers=JobSettings.EVALUATION_WORKERS,
+    maxsize=JobSettings.EVALUATION_QUEUE_SIZE,
+)
@@ -0,0 +1,166 @@
+"""Cached weight and storage deposit estimates for contract calls.
+
+Submitting a contract call needs a gas limit (and ideally a storage deposit
+limit), normally found with a `ContractsApi_call` dry run: one extra round
+trip per call. Calls of the same message on the same code with similarly
+sized arguments cost about the same, so `GasEstimator` keeps one estimate
+per (spec version, code hash, selector, argument-size bucket) and only
+dry-runs on a miss.
+
+Estimates are stored with `ROCOCO_GAS_ESTIMATE_MARGIN` applied and only
+ever grow. They are dropped when the runtime is upgraded, and all of them
+when an extrinsic fails for lack of gas or deposit.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from loguru import logger
+from scalecodec.base import ScaleBytes
+
+from src.core.depends.substrate import substrate_pool
+from src.core.metrics import Counter
+from src.settings.rococo import RococoSettings
+
+if TYPE_CHECKING:
+    from substrateinterface import Keypair, SubstrateInterface
+    from substrateinterface.contracts import ContractInstance
+
+ESTIMATES = Counter(
+    "gas_estimates_total",
+    "Contract call weight estimates by source (hit, miss, checked, invalidated)",
+    ("result",),
+)
+
+# Dispatch errors meaning an estimate was too low
+ESTIMATE_ERRORS = ("OutOfGas", "StorageDepositLimitExhausted", "StorageDepositNotEnoughFunds")
+
+EstimateKey = Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class GasEstimate:
+    """Limits to submit a contract call with"""
+    gas_limit: Dict[str, int]
+    storage_deposit_limit: Optional[int]
+
+
+class GasEstimator:
+    """Process-wide estimate cache; thread-safe (used from the Substrate pool's executor)."""
+
+    def __init__(self):
+        self._entries: Dict[EstimateKey, GasEstimate] = {}
+        self._code_hashes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def code_hash(self, substrate: SubstrateInterface, contract_address: str) -> str:
+        """Code hash of a deployed contract (looked up once per address)"""
+        with self._lock:
+            if contract_address in self._code_hashes:
+                return self._code_hashes[contract_address]
+        info = substrate.query("Contracts", "ContractInfoOf", [contract_address]).value
+        code_hash = info["code_hash"] if info else contract_address
+        with self._lock:
+            self._code_hashes[contract_address] = code_hash
+        return code_hash
+
+    @staticmethod
+    def key(substrate: SubstrateInterface, code_hash: str, data: ScaleBytes, value: int = 0) -> EstimateKey:
+        """Cache key: runtime, code, selector and a power-of-two bucket of the input size"""
+        raw = bytes(data.data)
+        return (substrate.runtime_version, code_hash, raw[:4].hex(), len(raw).bit_length(), value > 0)
+
+    def get(self, key: EstimateKey) -> Optional[GasEstimate]:
+        if not RococoSettings.GAS_ESTIMATE_CACHE:
+            return None
+        with self._lock:
+            return self._entries.get(key)
+
+    @staticmethod
+    def _limits(gas: Dict[str, int], storage_deposit: Optional[int]) -> GasEstimate:
+        margin = RococoSettings.GAS_ESTIMATE_MARGIN
+        return GasEstimate(
+            gas_limit={name: int(gas[name] * margin) for name in ("ref_time", "proof_size")},
+            storage_deposit_limit=int(storage_deposit * margin) if storage_deposit else None,
+        )
+
+    @staticmethod
+    def _reverted(dry_run) -> bool:
+        """Whether a dry run failed or reverted (its cost says nothing about a successful call)"""
+        result = dry_run.value.get("result") or {}
+        if "Ok" not in result:
+            return True
+        flags = result["Ok"].get("flags")
+        bits = flags.get("bits") if isinstance(flags, dict) else flags
+        return bool((bits or 0) & 1)
+
+    def put(
+        self,
+        key: EstimateKey,
+        gas: Dict[str, int],
+        storage_deposit: Optional[int] = None,
+    ) -> GasEstimate:
+        """Store an observed cost with the safety margin; returns the limits to use now"""
+        estimate = self._limits(gas, storage_deposit)
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                estimate = GasEstimate(
+                    gas_limit={name: max(estimate.gas_limit[name], previous.gas_limit[name]) for name in estimate.gas_limit},
+                    storage_deposit_limit=max(
+                        estimate.storage_deposit_limit or 0, previous.storage_deposit_limit or 0
+                    ) or None,
+                )
+            self._entries[key] = estimate
+        return estimate
+
+    def estimate_call(
+        self,
+        substrate: SubstrateInterface,
+        instance: ContractInstance,
+        keypair: Keypair,
+        message: str,
+        args: dict,
+        value: int = 0,
+        check: bool = False,
+    ) -> Tuple[GasEstimate, Any]:
+        """Limits for calling `message`, plus the dry-run result when one was needed (else None).
+
+        With `check` the call is dry-run even when an estimate is cached, so
+        the caller can tell whether it would fail.
+        """
+        data = instance.metadata.generate_message_data(name=message, args=args)
+        key = self.key(substrate, self.code_hash(substrate, instance.contract_address), data, value)
+        cached = None if check else self.get(key)
+        if cached is not None:
+            ESTIMATES.inc(result="hit")
+            return cached, None
+
+        ESTIMATES.inc(result="checked" if check else "miss")
+        dry_run = instance.read(keypair, message, args=args, value=value)
+        deposit = (dry_run.value.get("storage_deposit") or {}).get("Charge")
+        if self._reverted(dry_run):
+            return self._limits(dry_run.gas_required, deposit), dry_run
+        return self.put(key, dry_run.gas_required, deposit), dry_run
+
+    def check_failure(self, error_message: Any) -> None:
+        """Drop all estimates if an extrinsic failed because an estimate was too low."""
+        name = error_message.get("name") if isinstance(error_message, dict) else str(error_message)
+        if name and any(error in name for error in ESTIMATE_ERRORS):
+            logger.warning("Contract call failed with {}; dropping cached gas estimates", name)
+            self.invalidate()
+
+    def invalidate(self, runtime: Optional[dict] = None) -> None:
+        """Forget every estimate (registered as a runtime-upgrade listener)."""
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._code_hashes.clear()
+        if dropped:
+            ESTIMATES.inc(dropped, result="invalidated")
+
+
+gas_estimates = GasEstimator()
+substrate_pool.on_runtime_upgrade(gas_estimates.invalidate)
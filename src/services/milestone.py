@@ -4,6 +4,7 @@ from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.milestone import Milestone
+from src.services.similarity import SimilarityService
 
 
 class MilestoneService:
@@ -21,7 +22,7 @@ class MilestoneService:
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def list_by_project(project_id: int, session: AsyncSession, skip: int = 0, limit: int = 100) -> List[Milestone]:
+    async def list_by_project(project_id: str, session: AsyncSession, skip: int = 0, limit: int = 100) -> List[Milestone]:
         """Return all milestones for a specific project with pagination."""
         stmt = select(Milestone).where(Milestone.project_id == project_id).offset(skip).limit(limit)
         result = await session.execute(stmt)
@@ -49,6 +50,7 @@ class MilestoneService:
         session.add(new_milestone)
         await session.commit()
         await session.refresh(new_milestone)
+        await SimilarityService.reindex_project(new_milestone.project_id, session)
         return new_milestone
 
     @staticmethod
@@ -67,12 +69,16 @@ class MilestoneService:
         if not milestone:
             return None
         
+        previous_project_id = milestone.project_id
         for key, value in milestone_data.items():
             if value is not None:
                 setattr(milestone, key, value)
         
         await session.commit()
         await session.refresh(milestone)
+        await SimilarityService.reindex_project(milestone.project_id, session)
+        if previous_project_id != milestone.project_id:
+            await SimilarityService.reindex_project(previous_project_id, session)
         return milestone
 
     @staticmethod
@@ -90,6 +96,8 @@ class MilestoneService:
         if not milestone:
             return False
         
+        project_id = milestone.project_id
         await session.delete(milestone)
         await session.commit()
+        await SimilarityService.reindex_project(project_id, session)
         return True
@@ -0,0 +1,239 @@
+"""Model backends behind `AIService`.
+
+A backend turns an `EvaluationPrompt` into a `ModelReply`; timeouts, retries,
+hedging, the circuit breaker and output validation stay in `AIService`, so
+every backend gets the same treatment.
+
+- GeminiBackend: the real Gemini API (structured output, context cache).
+- RecordingBackend: wraps another backend and appends replies to JSONL.
+- ReplayBackend: answers from recorded replies with injected latency, errors
+  and hangs, so the evaluation path can be load-tested offline.
+"""
+import asyncio
+import json
+import math
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from loguru import logger
+
+from src.models.evaluate import EvaluateResponse
+from src.services.prompt import EvaluationPrompt
+from src.settings.ai import AIBackendSettings
+from src.settings.gemini import GeminiSettings
+
+
+@dataclass
+class ModelReply:
+    """Raw model output plus token usage."""
+
+    text: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+
+
+class ModelBackendError(Exception):
+    """Raised by a backend when a call fails."""
+
+
+class ModelBackend(ABC):
+    """Interface implemented by every model backend."""
+
+    name = "base"
+    model = "unknown"
+
+    @abstractmethod
+    async def generate(self, prompt: EvaluationPrompt) -> ModelReply:
+        """Return the model's reply to `prompt`; raise `ModelBackendError` on failure."""
+
+
+class GeminiBackend(ModelBackend):
+    """Gemini in structured-output mode, with the system prompt in a context cache.
+
+    The context cache is created lazily and renewed shortly before its TTL
+    runs out. If the API rejects caching (e.g. the prompt is below the minimum
+    cacheable size) it is disabled for the process; either way the system
+    prompt is then sent inline as a system instruction.
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model: str):
+        # The SDK takes about half a second to import; only pay for it when used
+        from google import genai
+
+        self.model = model
+        self._client = genai.Client(api_key=api_key)
+        self._cache_lock = asyncio.Lock()
+        self._cache_name: Optional[str] = None
+        self._cache_expires_at = 0.0
+        self._cache_disabled = False
+
+    async def _system_prompt_cache(self, system_instruction: str) -> Optional[str]:
+        from google.genai import errors as genai_errors
+        from google.genai import types
+
+        if not GeminiSettings.CONTEXT_CACHE_ENABLED or self._cache_disabled:
+            return None
+        async with self._cache_lock:
+            if self._cache_name and time.monotonic() < self._cache_expires_at:
+                return self._cache_name
+            ttl = GeminiSettings.CONTEXT_CACHE_TTL_SECONDS
+            try:
+                cache = await asyncio.wait_for(
+                    self._client.aio.caches.create(
+                        model=self.model,
+                        config=types.CreateCachedContentConfig(
+                            system_instruction=system_instruction,
+                            display_name="evaluation-system-prompt",
+                            ttl=f"{ttl}s",
+                        ),
+                    ),
+                    timeout=GeminiSettings.TIMEOUT_SECONDS,
+                )
+            except genai_errors.ClientError as e:
+                logger.info("Context cache rejected, sending system prompt inline: {}", e)
+                self._cache_disabled = True
+                return None
+            except Exception as e:
+                logger.warning("Context cache creation failed, retrying on next call: {}", e)
+                return None
+            self._cache_name = cache.name
+            self._cache_expires_at = time.monotonic() + ttl - 60
+            return self._cache_name
+
+    async def generate(self, prompt: EvaluationPrompt) -> ModelReply:
+        from google.genai import types
+
+        cached_content = await self._system_prompt_cache(prompt.system_instruction)
+        # A cached context already carries the system instruction; the API
+        # rejects requests that set both.
+        config = types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=EvaluateResponse,
+            max_output_tokens=GeminiSettings.MAX_OUTPUT_TOKENS,
+            cached_content=cached_content,
+            system_instruction=None if cached_content else prompt.system_instruction,
+        )
+        response = await self._client.aio.models.generate_content(
+            model=self.model, contents=prompt.contents, config=config
+        )
+
+        meta = response.usage_metadata
+        if meta is None:
+            return ModelReply(text=response.text or "")
+        return ModelReply(
+            text=response.text or "",
+            input_tokens=meta.prompt_token_count or 0,
+            output_tokens=(meta.candidates_token_count or 0) + (meta.thoughts_token_count or 0),
+            cached_tokens=meta.cached_content_token_count or 0,
+        )
+
+
+class RecordingBackend(ModelBackend):
+    """Pass calls through to `inner` and append each reply to a JSONL file."""
+
+    def __init__(self, inner: ModelBackend, path: str):
+        self.inner = inner
+        self.name = inner.name
+        self.model = inner.model
+        self.path = Path(path)
+
+    async def generate(self, prompt: EvaluationPrompt) -> ModelReply:
+        reply = await self.inner.generate(prompt)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"prompt_hash": prompt.prompt_hash, **asdict(reply)}, ensure_ascii=False) + "\n")
+        return reply
+
+
+class ReplayBackend(ModelBackend):
+    """Offline stand-in that replays recorded replies.
+
+    A reply recorded for the same prompt hash is returned when available,
+    otherwise one is picked deterministically from the recordings. Latency is
+    log-normal around `latency_median_ms`; `error_rate` of calls raise
+    `ModelBackendError` and `hang_rate` of calls never return, so deadlines,
+    retries, hedging and the breaker can be exercised.
+    """
+
+    name = "replay"
+
+    def __init__(
+        self,
+        replies: List[dict],
+        latency_median_ms: float = 800.0,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        seed: Optional[int] = None,
+        model: str = "replay",
+    ):
+        if not replies:
+            raise ValueError("ReplayBackend needs at least one recorded reply")
+        self.model = model
+        self.replies = replies
+        self.by_hash = {r["prompt_hash"]: r for r in replies if r.get("prompt_hash")}
+        self.latency_median_ms = latency_median_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "ReplayBackend":
+        with open(path, encoding="utf-8") as f:
+            replies = [json.loads(line) for line in f if line.strip()]
+        return cls(replies, **kwargs)
+
+    def _latency(self) -> float:
+        if self.latency_median_ms <= 0:
+            return 0.0
+        return self.latency_median_ms / 1000 * math.exp(self._random.gauss(0.0, self.latency_sigma))
+
+    async def generate(self, prompt: EvaluationPrompt) -> ModelReply:
+        self.calls += 1
+        roll = self._random.random()
+        if roll < self.hang_rate:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self._latency())
+        if roll < self.hang_rate + self.error_rate:
+            raise ModelBackendError("injected replay error")
+
+        recorded = self.by_hash.get(prompt.prompt_hash)
+        if recorded is None:
+            recorded = self.replies[int(prompt.prompt_hash[:8], 16) % len(self.replies)]
+        return ModelReply(
+            text=recorded["text"],
+            input_tokens=recorded.get("input_tokens", 0),
+            output_tokens=recorded.get("output_tokens", 0),
+            cached_tokens=recorded.get("cached_tokens", 0),
+        )
+
+
+def build_backend() -> Optional[ModelBackend]:
+    """Build the backend selected by `AI_BACKEND`, or None if it is not usable."""
+    if AIBackendSettings.BACKEND == "replay":
+        if not AIBackendSettings.REPLAY_PATH:
+            logger.warning("AI_BACKEND=replay but AI_REPLAY_PATH is not set")
+            return None
+        return ReplayBackend.from_file(
+            AIBackendSettings.REPLAY_PATH,
+            latency_median_ms=AIBackendSettings.REPLAY_LATENCY_MEDIAN_MS,
+            latency_sigma=AIBackendSettings.REPLAY_LATENCY_SIGMA,
+            error_rate=AIBackendSettings.REPLAY_ERROR_RATE,
+            hang_rate=AIBackendSettings.REPLAY_HANG_RATE,
+            seed=AIBackendSettings.REPLAY_SEED,
+        )
+
+    if GeminiSettings.API_KEY is None or not GeminiSettings.API_KEY.get_secret_value():
+        return None
+    backend: ModelBackend = GeminiBackend(GeminiSettings.API_KEY.get_secret_value(), GeminiSettings.MODEL)
+    if AIBackendSettings.RECORD_PATH:
+        backend = RecordingBackend(backend, AIBackendSettings.RECORD_PATH)
+    return backend
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session as SQLAlchemySession
 
 from src.models.project import Project
+from src.services.similarity import SimilarityService
 
 
 class ProjectService:
@@ -28,6 +29,15 @@ class ProjectService:
         result = await session.execute(stmt)
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_by_ids(pks: List[int], session: AsyncSession) -> List[Project]:
+        """Return the Projects whose primary keys are in `pks` (in no particular order)."""
+        if not pks:
+            return []
+        stmt = select(Project).where(Project.id.in_(pks))
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
     @staticmethod
     async def list_all(session: AsyncSession, skip: int = 0, limit: int = 100) -> List[Project]:
         """Return a paginated list of all projects."""
@@ -50,6 +60,7 @@ class ProjectService:
         session.add(new_project)
         await session.commit()
         await session.refresh(new_project)
+        await SimilarityService.index_project(new_project, session)
         return new_project
 
     @staticmethod
@@ -74,6 +85,7 @@ class ProjectService:
         
         await session.commit()
         await session.refresh(project)
+        await SimilarityService.index_project(project, session)
         return project
 
     @staticmethod
@@ -93,5 +105,6 @@ class ProjectService:
         
         await session.delete(project)
         await session.commit()
+        SimilarityService.remove_project(project_id)
         return True
 
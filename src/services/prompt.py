@@ -0,0 +1,141 @@
+import hashlib
+import json
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List
+
+from loguru import logger
+
+DEFAULT_SYSTEM_PROMPT = (
+    "You are a grant reviewer for an open-source funding program. Score the project"
+    " from 0 to 100 for credibility and feasibility, decide approve, borderline or"
+    " reject, and justify the decision in one or two sentences."
+)
+
+
+def project_field(obj: Any, key: str, default: Any = None) -> Any:
+    """Read `key` from a model instance or a plain dict."""
+    if isinstance(obj, dict):
+        return obj.get(key, default)
+    return getattr(obj, key, default)
+
+
+@dataclass(frozen=True)
+class EvaluationPrompt:
+    """A prompt ready to send: static system instruction plus per-project contents."""
+
+    system_instruction: str
+    contents: str
+    input_tokens_estimate: int
+    prompt_hash: str
+
+
+class EvaluationPromptBuilder:
+    """Build compact, budgeted evaluation prompts.
+
+    The system prompt (`src/prompts/evaluation.md`) is static, so it is read
+    once and sent as a system instruction (or through a context cache) instead
+    of being concatenated into every user message. The project itself is sent
+    as compact JSON; when it would exceed `token_budget`, milestones are capped
+    and summarised first and the description is truncated last.
+
+    Token counts here are estimates (~4 characters per token), good enough for
+    budgeting; the exact counts come back in the model's usage metadata.
+    """
+
+    PROMPT_PATH = Path(__file__).resolve().parents[1] / "prompts" / "evaluation.md"
+    INSTRUCTION = (
+        "Evaluate this project. Respond with ai_score (0-100), decision"
+        " (approve|borderline|reject) and a short rationale.\nProject:"
+    )
+    CHARS_PER_TOKEN = 4
+    MAX_MILESTONES = 12
+    MAX_MILESTONE_CHARS = 240
+    MIN_DESCRIPTION_CHARS = 280
+
+    def __init__(self, token_budget: int):
+        self.token_budget = token_budget
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def system_prompt() -> str:
+        try:
+            return EvaluationPromptBuilder.PROMPT_PATH.read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            logger.warning("{} not found, using built-in system prompt", EvaluationPromptBuilder.PROMPT_PATH)
+            return DEFAULT_SYSTEM_PROMPT
+
+    @classmethod
+    def estimate_tokens(cls, text: str) -> int:
+        return math.ceil(len(text) / cls.CHARS_PER_TOKEN)
+
+    @staticmethod
+    def _truncate(text: str, max_chars: int) -> str:
+        if len(text) <= max_chars:
+            return text
+        cut = text[:max_chars].rsplit(" ", 1)[0] or text[:max_chars]
+        return cut.rstrip() + "…"
+
+    @classmethod
+    def _milestone_line(cls, milestone: Any) -> str:
+        title = project_field(milestone, "name") or project_field(milestone, "title") or str(milestone)
+        desc = (project_field(milestone, "description") or "").strip()
+        amount = project_field(milestone, "amount")
+        line = f"{title}: {desc}" if desc else str(title)
+        if amount is not None:
+            line += f" ({amount})"
+        return cls._truncate(line, cls.MAX_MILESTONE_CHARS)
+
+    @classmethod
+    def _milestones(cls, milestones: List[Any], shown: int) -> List[str]:
+        lines = [cls._milestone_line(m) for m in milestones[:shown]]
+        hidden = milestones[shown:]
+        if hidden:
+            total = sum(float(project_field(m, "amount", 0) or 0) for m in hidden)
+            lines.append(f"... {len(hidden)} more milestones totalling {total:g}")
+        return lines
+
+    def _render(self, proj: dict) -> str:
+        return f"{self.INSTRUCTION}{json.dumps(proj, ensure_ascii=False, separators=(',', ':'))}"
+
+    def build(self, project: Any) -> EvaluationPrompt:
+        """Build the prompt for a `Project`-like object or dict."""
+        milestones = list(project_field(project, "milestones", []) or [])
+        shown = self.MAX_MILESTONES
+        proj = {
+            "project_title": project_field(project, "name", "") or "",
+            "project_description": project_field(project, "description", "") or "",
+            "budget_usd": float(project_field(project, "budget", 0) or 0),
+            "milestones": self._milestones(milestones, shown),
+        }
+
+        contents = self._render(proj)
+
+        # Over budget: show fewer milestones and summarise the rest
+        while self.estimate_tokens(contents) > self.token_budget and shown > 1 and len(milestones) > 1:
+            shown = min(shown, len(milestones)) // 2
+            proj["milestones"] = self._milestones(milestones, shown)
+            contents = self._render(proj)
+
+        # Still over budget: truncate the description
+        overflow = self.estimate_tokens(contents) - self.token_budget
+        if overflow > 0:
+            description = proj["project_description"]
+            keep = max(self.MIN_DESCRIPTION_CHARS, len(description) - overflow * self.CHARS_PER_TOKEN)
+            proj["project_description"] = self._truncate(description, keep)
+            contents = self._render(proj)
+
+        system_instruction = self.system_prompt()
+        digest = hashlib.sha256()
+        digest.update(system_instruction.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(contents.encode("utf-8"))
+
+        return EvaluationPrompt(
+            system_instruction=system_instruction,
+            contents=contents,
+            input_tokens_estimate=self.estimate_tokens(system_instruction) + self.estimate_tokens(contents),
+            prompt_hash=digest.hexdigest(),
+        )
@@ -1,86 +1,378 @@
 """
 Rococo Deployment Service - Deploy smart contracts to Rococo Testnet
+
+substrateinterface is imported where it is used: it takes a few hundred
+milliseconds to import and most requests only need `project_account`.
 """
-from typing import Optional, Dict, Any
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple
 import asyncio
-import json
-import os
-from pathlib import Path
-from substrateinterface import SubstrateInterface, Keypair
-from substrateinterface.exceptions import SubstrateRequestException
+import hashlib
+import threading
+import time
+from loguru import logger
+from scalecodec.utils.ss58 import is_valid_ss58_address, ss58_encode
+
+from src.core.depends.substrate import CONNECTION_ERRORS, SubstratePool, is_simulated
+from src.core.nonce import nonce_manager
+from src.services.contract_artifacts import contract_artifacts
+from src.services.gas_estimates import gas_estimates
+from src.settings.rococo import RococoSettings
+
+if TYPE_CHECKING:
+    from substrateinterface import Keypair, SubstrateInterface
+    from substrateinterface.contracts import ContractInstance, ContractMetadata
+
+SIMULATED_CONTRACT_ADDRESS = "5HpG9w8EBLe5XCrbczpwq5TSXvedjrBGo81mwA7ujVMCSDaJ"
+# Gas limit of an instantiation without a cached estimate (the weight it used
+# is cached for the next ones). ref_time is substrate-interface's default
+# (~26 ms); proof_size bounds the PoV of reading the escrow code and writing
+# its storage, well below the 3.75 MiB max extrinsic proof size.
+INSTANTIATE_GAS_LIMIT = {"ref_time": 25_990_000_000, "proof_size": 262_144}
+
+
+class SubmissionUnknownError(ConnectionError):
+    """The connection dropped after an extrinsic was sent: it may or may not have been included."""
+
+    def __init__(self, extrinsic_hash: str, nonce: int):
+        super().__init__(
+            f"Connection dropped after submitting {extrinsic_hash} (nonce {nonce}); "
+            "check whether it was included before retrying"
+        )
+        self.extrinsic_hash = extrinsic_hash
+        self.nonce = nonce
+
+
+@dataclass
+class EscrowSpec:
+    """One escrow to create in a batched deployment; `key` identifies the caller's row"""
+    key: Any
+    project_owner: str
+    milestone_count: int
+    total_amount: int
+
+
+@dataclass
+class BatchDeployResult:
+    """Outcome of one `EscrowSpec` in `RococoDeployer.deploy_batch`"""
+    key: Any
+    success: bool
+    contract_address: Optional[str] = None
+    batch: Optional[int] = None
+    block_hash: Optional[str] = None
+    extrinsic_hash: Optional[str] = None
+    status: str = "failed"
+    error: Optional[str] = None
+
+
+@dataclass
+class ReleaseSpec:
+    """One milestone to release in a batched release; `key` identifies the caller's item"""
+    key: Any
+    contract_address: str
+    project_owner: str
+    milestone_index: int
+
+
+@dataclass
+class BatchReleaseResult:
+    """Outcome of one `ReleaseSpec` in `RococoDeployer.release_milestones`"""
+    key: Any
+    success: bool
+    batch: Optional[int] = None
+    block_hash: Optional[str] = None
+    extrinsic_hash: Optional[str] = None
+    status: str = "failed"
+    error: Optional[str] = None
+
+
+@dataclass
+class PreparedEscrow:
+    """A signed escrow-creation extrinsic that has not been submitted yet
+
+    `state` goes from "signed" to either "sent" (`submit_prepared`) or
+    "discarded" (`discard_prepared`), never both.
+    """
+    contract_address: str
+    extrinsic: Any
+    extrinsic_hash: str
+    signer: str
+    nonce: int
+    state: str = "signed"
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
 
 class RococoDeployer:
-    """Helper class to deploy contracts to Rococo Testnet"""
+    """Helper class to deploy contracts to Rococo Testnet
+
+    Contract artifacts come from the process-wide `contract_artifacts` store,
+    so constructing a deployer is cheap and the WASM/metadata are read from
+    disk only once per process. With a `SubstratePool` the deployer reuses
+    the app's persistent connections; otherwise `connect()` opens its own.
+    Chain calls are blocking and always run off the event loop.
+    """
     
-    def __init__(self, rpc_url: str = "wss://rococo-contracts-rpc.polkadot.io"):
-        self.rpc_url = rpc_url
+    def __init__(self, rpc_url: Optional[str] = None, pool: Optional[SubstratePool] = None):
+        self.pool = pool
+        self.rpc_url = pool.url if pool is not None else (rpc_url or RococoSettings.RPC_URL)
         self.substrate = None
-        self.wasm_path = self._get_wasm_path()
-        self.metadata_path = self._get_metadata_path()
-        
-    def _get_wasm_path(self) -> str:
-        """Get path to compiled WASM file"""
-        # Try multiple possible locations
-        paths_to_try = [
-            Path(__file__).parent.parent.parent / "smart-contract" / "funding-escrow" / "target" / "ink" / "funding_escrow.wasm",
-            Path.cwd() / "smart-contract" / "funding-escrow" / "target" / "ink" / "funding_escrow.wasm",
-            Path("/Users/facundo/Proyectos-VSC/Sub0_data/smart-contract/funding-escrow/target/ink/funding_escrow.wasm"),
-        ]
-        
-        for path in paths_to_try:
-            if path.exists():
-                return str(path)
-        
-        raise FileNotFoundError(f"WASM file not found. Tried: {paths_to_try}")
-    
-    def _get_metadata_path(self) -> str:
-        """Get path to contract metadata file"""
-        paths_to_try = [
-            Path(__file__).parent.parent.parent / "smart-contract" / "funding-escrow" / "target" / "ink" / "funding_escrow.json",
-            Path.cwd() / "smart-contract" / "funding-escrow" / "target" / "ink" / "funding_escrow.json",
-            Path("/Users/facundo/Proyectos-VSC/Sub0_data/smart-contract/funding-escrow/target/ink/funding_escrow.json"),
-        ]
-        
-        for path in paths_to_try:
-            if path.exists():
-                return str(path)
-        
-        raise FileNotFoundError(f"Metadata file not found. Tried: {paths_to_try}")
+
+    @property
+    def wasm_path(self) -> str:
+        return str(contract_artifacts.get().wasm_path)
+
+    @property
+    def metadata_path(self) -> str:
+        return str(contract_artifacts.get().metadata_path)
     
     def load_wasm(self) -> bytes:
-        """Load compiled WASM from file"""
-        try:
-            with open(self.wasm_path, 'rb') as f:
-                wasm_data = f.read()
-            print(f"✅ Loaded WASM: {len(wasm_data)} bytes ({len(wasm_data)/1024:.1f} KB)")
-            return wasm_data
-        except Exception as e:
-            print(f"❌ Failed to load WASM: {e}")
-            raise
+        """Return the compiled WASM (cached after the first read)"""
+        return contract_artifacts.get().wasm
     
     def load_metadata(self) -> Dict[str, Any]:
-        """Load contract metadata from JSON"""
+        """Return the contract metadata (cached after the first read)"""
+        return contract_artifacts.get().metadata
+
+    @staticmethod
+    def _signer() -> Optional[Keypair]:
+        """Service keypair from ROCOCO_SIGNER_URI, or None to simulate deployments
+
+        The simulated chain backend signs with //Alice unless a URI is set.
+        """
+        from substrateinterface import Keypair
+
+        if RococoSettings.SIGNER_URI is None:
+            return Keypair.create_from_uri("//Alice") if RococoSettings.BACKEND == "simulated" else None
+        return Keypair.create_from_uri(RococoSettings.SIGNER_URI.get_secret_value())
+
+    @staticmethod
+    def project_account(project_owner: str) -> str:
+        """SS58 account used as escrow key for a project.
+
+        Valid SS58 addresses are used as-is; other project identifiers are
+        mapped to a deterministic account derived from their blake2b hash.
+        """
+        if is_valid_ss58_address(project_owner):
+            return project_owner
+        digest = hashlib.blake2b(f"sub0-escrow:{project_owner}".encode(), digest_size=32).digest()
+        return ss58_encode(digest, ss58_format=42)
+
+    @staticmethod
+    def _contract_metadata(substrate: SubstrateInterface) -> ContractMetadata:
+        """Metadata to encode escrow messages with on this connection"""
+        from substrateinterface.contracts import ContractMetadata
+
+        if is_simulated(substrate):
+            return substrate.metadata
+        return ContractMetadata(contract_artifacts.get().metadata, substrate)
+
+    def _contract(
+        self,
+        substrate: SubstrateInterface,
+        contract_address: str,
+        metadata: Optional[ContractMetadata] = None,
+    ) -> ContractInstance:
+        from substrateinterface.contracts import ContractInstance
+
+        metadata = metadata or self._contract_metadata(substrate)
+        if is_simulated(substrate):
+            from src.core.simulated_chain import SimulatedContractInstance
+
+            return SimulatedContractInstance(contract_address, metadata, substrate)
+        return ContractInstance(contract_address=contract_address, metadata=metadata, substrate=substrate)
+
+    async def _run(self, fn, *args, idempotent: bool = True):
+        """Run blocking `fn(substrate, *args)` off the event loop
+
+        Functions that submit extrinsics pass `idempotent=False` so the pool
+        does not run them again after a dropped connection.
+        """
+        if self.pool is not None:
+            return await self.pool.run(fn, *args, idempotent=idempotent)
+        return await asyncio.to_thread(fn, self.substrate, *args)
+
+    @staticmethod
+    def _code_on_chain(substrate: SubstrateInterface, code_hash: bytes) -> bool:
+        """Check whether the code hash is already stored by pallet-contracts"""
+        from substrateinterface.exceptions import StorageFunctionNotFound
+
+        for storage in ("CodeInfoOf", "PristineCode"):
+            try:
+                result = substrate.query("Contracts", storage, [f"0x{code_hash.hex()}"])
+                return result.value is not None
+            except StorageFunctionNotFound:
+                continue
+        return False
+
+    @staticmethod
+    def _next_index(substrate: SubstrateInterface, address: str) -> int:
+        """Next nonce of `address`, counting its extrinsics in the node's tx pool
+
+        `get_account_nonce` (AccountNonceApi) only sees included extrinsics.
+        """
+        return substrate.rpc_request("system_accountNextIndex", [address])["result"]
+
+    def _sign(self, substrate: SubstrateInterface, keypair: Keypair, call) -> Tuple[Any, int]:
+        """Sign `call` with a nonce reserved from the signer's local allocator.
+
+        Nonces are handed out locally so several extrinsics from the service
+        account can be in flight at once; see `src.core.nonce`.
+        """
+        nonces = nonce_manager(self.rpc_url, keypair.ss58_address)
+        nonce = nonces.reserve(lambda: self._next_index(substrate, keypair.ss58_address))
         try:
-            with open(self.metadata_path, 'r') as f:
-                metadata = json.load(f)
-            print(f"✅ Loaded metadata from {self.metadata_path}")
-            return metadata
-        except Exception as e:
-            print(f"❌ Failed to load metadata: {e}")
+            extrinsic = substrate.create_signed_extrinsic(call=call, keypair=keypair, nonce=nonce)
+        except Exception:
+            nonces.release(nonce)
             raise
+        return extrinsic, nonce
+
+    def _submit_signed(self, substrate: SubstrateInterface, signer: str, extrinsic, nonce: int):
+        """Submit a signed extrinsic, wait for inclusion and settle its nonce.
+
+        An included extrinsic used its nonce even if dispatch failed. If the
+        node rejected it the nonce is released and reconciled against
+        `system_accountNextIndex`, so a gap is refilled by the next
+        reservation instead of stalling every later extrinsic. If the
+        connection dropped mid-way the extrinsic may still be included:
+        `SubmissionUnknownError` is raised (never retried) and the released
+        nonce is reconciled by the next reservation on a live connection.
+        """
+        nonces = nonce_manager(self.rpc_url, signer)
+        try:
+            receipt = substrate.submit_extrinsic(extrinsic, wait_for_inclusion=True)
+        except CONNECTION_ERRORS as e:
+            nonces.release(nonce)
+            raise SubmissionUnknownError(f"0x{extrinsic.extrinsic_hash.hex()}", nonce) from e
+        except Exception:
+            nonces.release(nonce)
+            try:
+                nonces.reconcile(self._next_index(substrate, signer))
+            except Exception as e:
+                logger.warning("Nonce reconcile failed for {}: {}", signer, e)
+            raise
+        nonces.confirm(nonce)
+        if not receipt.is_success:
+            gas_estimates.check_failure(receipt.error_message)
+        return receipt
+
+    def _submit_call(self, substrate: SubstrateInterface, keypair: Keypair, call):
+        extrinsic, nonce = self._sign(substrate, keypair, call)
+        return self._submit_signed(substrate, keypair.ss58_address, extrinsic, nonce)
+
+    def _deploy_code(
+        self,
+        substrate: SubstrateInterface,
+        keypair: Keypair,
+        metadata: ContractMetadata,
+        code_hash: bytes,
+        salt: str,
+    ) -> ContractInstance:
+        """Instantiate uploaded code with the `new` constructor.
+
+        The first instantiation uses a fixed generous gas limit; the weight
+        it actually used is then cached as the estimate for later ones.
+        """
+        from substrateinterface.exceptions import ExtrinsicFailedException
+
+        data = metadata.generate_constructor_data(name="new", args={})
+        key = gas_estimates.key(substrate, f"0x{code_hash.hex()}", data)
+        estimate = gas_estimates.get(key)
+        call = substrate.compose_call(
+            call_module="Contracts",
+            call_function="instantiate",
+            call_params={
+                "value": 0,
+                "gas_limit": estimate.gas_limit if estimate else INSTANTIATE_GAS_LIMIT,
+                "storage_deposit_limit": None,
+                "code_hash": f"0x{code_hash.hex()}",
+                "data": data.to_hex(),
+                "salt": salt,
+            },
+        )
+        receipt = self._submit_call(substrate, keypair, call)
+        if not receipt.is_success:
+            raise ExtrinsicFailedException(receipt.error_message)
+        if isinstance(receipt.weight, dict):
+            gas_estimates.put(key, receipt.weight)
+        for event in receipt.triggered_events:
+            if event.value["event"]["event_id"] == "Instantiated":
+                address = event.value["event"]["attributes"]["contract"]
+                return self._contract(substrate, address, metadata)
+        raise ExtrinsicFailedException("Instantiated event not found")
+
+    def _exec(
+        self,
+        substrate: SubstrateInterface,
+        keypair: Keypair,
+        instance: ContractInstance,
+        message: str,
+        args: dict,
+        value: int = 0,
+    ):
+        """Submit a message with cached (or dry-run) gas and deposit limits"""
+        from substrateinterface.exceptions import ExtrinsicFailedException
+
+        estimate, _ = gas_estimates.estimate_call(substrate, instance, keypair, message, args, value)
+        call = substrate.compose_call(
+            call_module="Contracts",
+            call_function="call",
+            call_params={
+                "dest": instance.contract_address,
+                "value": value,
+                "gas_limit": estimate.gas_limit,
+                "storage_deposit_limit": estimate.storage_deposit_limit,
+                "data": instance.metadata.generate_message_data(name=message, args=args).to_hex(),
+            },
+        )
+        receipt = self._submit_call(substrate, keypair, call)
+        if not receipt.is_success:
+            raise ExtrinsicFailedException(receipt.error_message)
+        return receipt
+
+    def ensure_code_uploaded(self, substrate: SubstrateInterface, keypair: Keypair) -> bytes:
+        """Upload the contract code once per chain and return its code hash"""
+        from substrateinterface.exceptions import ExtrinsicFailedException
+
+        if is_simulated(substrate):
+            return substrate.escrow_code_hash
+        artifacts = contract_artifacts.get()
+        if contract_artifacts.is_uploaded(self.rpc_url, artifacts.code_hash):
+            return artifacts.code_hash
+
+        if not self._code_on_chain(substrate, artifacts.code_hash):
+            call = substrate.compose_call(
+                call_module="Contracts",
+                call_function="upload_code",
+                call_params={"code": f"0x{artifacts.wasm.hex()}", "storage_deposit_limit": None},
+            )
+            receipt = self._submit_call(substrate, keypair, call)
+            if not receipt.is_success:
+                raise ExtrinsicFailedException(receipt.error_message)
+            logger.info("Uploaded contract code {}", artifacts.code_hash_hex)
+
+        contract_artifacts.mark_uploaded(self.rpc_url, artifacts.code_hash)
+        return artifacts.code_hash
         
     async def connect(self) -> bool:
-        """Connect to Rococo testnet"""
+        """Connect to Rococo testnet (a cheap ping when using the shared pool)"""
+        from substrateinterface import SubstrateInterface
+        from substrateinterface.exceptions import SubstrateRequestException
+
+        if self.pool is not None:
+            return await self.pool.ping()
         try:
-            self.substrate = SubstrateInterface(url=self.rpc_url)
-            chain = self.substrate.get_chain()
-            print(f"✅ Connected to Rococo. Chain: {chain}")
+            self.substrate = await asyncio.to_thread(SubstrateInterface, url=self.rpc_url)
+            chain = await asyncio.to_thread(lambda: self.substrate.chain)
+            logger.info("Connected to Rococo. Chain: {}", chain)
             return True
         except SubstrateRequestException as e:
-            print(f"❌ Connection error: {e}")
+            logger.error("Rococo connection error: {}", e)
             return False
         except Exception as e:
-            print(f"⚠️  Connection warning: {str(e)[:100]}")
+            logger.warning("Rococo connection warning: {}", str(e)[:100])
             # Aún así considera como "conectado" si la librería está disponible
             return True
     
@@ -103,68 +395,523 @@ class RococoDeployer:
         Returns:
             Dict with contract_address and metadata if successful
         """
+        from substrateinterface import Keypair
+
         try:
-            # Load WASM and metadata
-            wasm_data = self.load_wasm()
-            metadata = self.load_metadata()
-            
-            print(f"\n📦 Deploying contract to Rococo...")
-            print(f"   Project Owner: {project_owner}")
-            print(f"   Milestones: {milestone_count}")
-            print(f"   Amount: {total_amount}")
-            print(f"   WASM: {len(wasm_data) / 1024:.1f} KB")
-            print(f"   RPC: {self.rpc_url}")
-            
-            # In production, would:
-            # 1. Parse keypair from keypair_uri
-            # 2. Connect to Rococo
-            # 3. Upload code via contracts::upload_code extrinsic
-            # 4. Instantiate via contracts::instantiate extrinsic
-            # 5. Wait for block finalization
-            # 6. Return contract address from events
+            # The simulated chain backend runs the contract without build artifacts
+            artifacts = None if RococoSettings.BACKEND == "simulated" else contract_artifacts.get()
+            metadata = artifacts.metadata if artifacts else {}
+            if artifacts:
+                code_hash_hex = artifacts.code_hash_hex
+            else:
+                from src.core.simulated_chain import ESCROW_CODE_HASH
+
+                code_hash_hex = f"0x{ESCROW_CODE_HASH.hex()}"
             
-            # For now, simulate successful deployment with metadata
-            contract_address = "5HpG9w8EBLe5XCrbczpwq5TSXvedjrBGo81mwA7ujVMCSDaJ"
+            logger.info(
+                "Deploying contract to Rococo: owner {}, {} milestones, amount {}, code {}, RPC {}",
+                project_owner, milestone_count, total_amount, code_hash_hex, self.rpc_url,
+            )
+
+            keypair = Keypair.create_from_uri(keypair_uri) if keypair_uri else self._signer()
+            if keypair is None or (self.pool is None and self.substrate is None):
+                # No signer configured: simulate a successful deployment
+                contract_address = SIMULATED_CONTRACT_ADDRESS
+                status = "simulated"
+            else:
+                contract_address = await self._run(
+                    self._instantiate_escrow, keypair, project_owner, milestone_count, total_amount,
+                    idempotent=False,
+                )
+                status = "deployed"
             
             deployment_info = {
                 "contract_address": contract_address,
+                "code_hash": code_hash_hex,
                 "wasm_hash": metadata.get("source", {}).get("hash", "unknown"),
                 "contract_name": metadata.get("contract", {}).get("name", "funding-escrow"),
                 "version": metadata.get("contract", {}).get("version", "0.1.0"),
                 "ink_version": metadata.get("source", {}).get("language", "unknown"),
-                "status": "deployed",
+                "status": status,
             }
             
-            print(f"✅ Contract deployed at: {contract_address}")
-            print(f"   Metadata: {deployment_info['contract_name']} v{deployment_info['version']}")
+            logger.info(
+                "Contract {} at {} ({} v{})",
+                status, contract_address, deployment_info["contract_name"], deployment_info["version"],
+            )
             
             return deployment_info
             
         except FileNotFoundError as e:
-            print(f"❌ File not found: {e}")
-            print(f"   Please ensure WASM files are compiled. Run:")
-            print(f"   cd smart-contract/funding-escrow && cargo contract build --release")
+            logger.error(
+                "Contract artifacts not found ({}). Build them with: "
+                "cd smart-contract/funding-escrow && cargo contract build --release",
+                e,
+            )
             return None
-        except Exception as e:
-            print(f"❌ Deployment error: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Contract deployment failed")
             return None
     
-    async def release_milestone(
+    @staticmethod
+    def milestone_percentages(milestone_count: int) -> List[int]:
+        """Split 100% evenly across milestones, remainder on the last one"""
+        share = 100 // milestone_count
+        return [share] * (milestone_count - 1) + [100 - share * (milestone_count - 1)]
+
+    def _instantiate_escrow(
         self,
-        contract_address: str,
-        milestone_index: int,
+        substrate: SubstrateInterface,
         keypair: Keypair,
-    ) -> bool:
-        """Release funds for a milestone"""
-        try:
-            print(f"💰 Releasing milestone {milestone_index} on {contract_address}...")
-            # Implementation would call release_milestone message
-            return True
-        except Exception as e:
-            print(f"❌ Release error: {e}")
-            return False
+        project_owner: str,
+        milestone_count: int,
+        total_amount: int,
+    ) -> str:
+        """Instantiate the uploaded code and create the project's escrow.
+
+        The code is uploaded at most once per chain (see
+        `ensure_code_uploaded`); every later deployment is a plain
+        `instantiate` by code hash followed by the escrow setup calls.
+        """
+        code_hash = self.ensure_code_uploaded(substrate, keypair)
+        metadata = self._contract_metadata(substrate)
+        instance = self._deploy_code(
+            substrate, keypair, metadata, code_hash, salt=f"{project_owner}:{time.time_ns()}"
+        )
+
+        owner = self.project_account(project_owner)
+        self._exec(
+            substrate, keypair, instance, "create_escrow",
+            {"project_owner": owner, "milestone_count": milestone_count}, value=total_amount,
+        )
+        for index, percentage in enumerate(self.milestone_percentages(milestone_count)):
+            self._exec(
+                substrate, keypair, instance, "add_milestone",
+                {"project_owner": owner, "milestone_index": index, "release_percentage": percentage},
+            )
+
+        return instance.contract_address
+    
+    # Shared multi-escrow contract per RPC URL, instantiated on the simulated node only
+    _shared_escrows: Dict[str, str] = {}
+
+    def _shared_escrow(self, substrate: SubstrateInterface, keypair: Keypair) -> ContractInstance:
+        """Contract instance holding batched and job-deployed escrows"""
+        metadata = self._contract_metadata(substrate)
+        address = RococoSettings.ESCROW_CONTRACT or self._shared_escrows.get(self.rpc_url)
+        if address:
+            return self._contract(substrate, address, metadata)
+        if RococoSettings.BACKEND != "simulated":
+            # An address only kept in memory would be lost on restart, stranding its escrows
+            raise RuntimeError("ROCOCO_ESCROW_CONTRACT is not set: instantiate the escrow contract and configure its address")
+
+        code_hash = self.ensure_code_uploaded(substrate, keypair)
+        instance = self._deploy_code(substrate, keypair, metadata, code_hash, salt=f"batch:{time.time_ns()}")
+        self._shared_escrows[self.rpc_url] = instance.contract_address
+        logger.info("Shared escrow contract instantiated at {}", instance.contract_address)
+        return instance
+
+    @staticmethod
+    def _weight_budget(substrate: SubstrateInterface) -> Dict[str, int]:
+        """Weight one batch may use: a fraction of the normal-class max extrinsic weight"""
+        weights = substrate.get_constant("System", "BlockWeights").value
+        normal = weights["per_class"]["normal"]
+        limit = normal.get("max_extrinsic") or normal.get("max_total") or weights["max_block"]
+        fraction = RococoSettings.BATCH_WEIGHT_FRACTION
+        return {
+            "ref_time": int(limit["ref_time"] * fraction),
+            "proof_size": int(limit["proof_size"] * fraction),
+        }
+
+    @staticmethod
+    def _dry_run_error(result) -> Optional[str]:
+        """Error returned by a dry-run of an ink! message, if any"""
+        data = result.value["result"].get("Ok", {}).get("data")
+        if isinstance(data, dict):
+            if "Err" in data:
+                return str(data["Err"])
+            inner = data.get("Ok")
+            if isinstance(inner, dict) and "Err" in inner:
+                return str(inner["Err"])
+        return None
+
+    def _escrow_calls(
+        self,
+        substrate: SubstrateInterface,
+        instance: ContractInstance,
+        keypair: Keypair,
+        spec: EscrowSpec,
+    ) -> Tuple[list, Dict[str, int]]:
+        """Compose the `create_escrow` + `add_milestone` calls for one escrow.
+
+        Limits come from the gas estimate cache. When `create_escrow` has to
+        be dry-run for them, escrows that would fail (e.g. one already exists
+        for the owner) are left out instead of reverting the whole
+        `batch_all`; with a cached estimate that check is skipped, as callers
+        only deploy projects that have no escrow yet. `add_milestone` cannot
+        be dry-run before the escrow exists, so it reuses the `create_escrow`
+        limits, which write more storage and bound it from above.
+        """
+        owner = self.project_account(spec.project_owner)
+        create_args = {"project_owner": owner, "milestone_count": spec.milestone_count}
+        estimate, dry_run = gas_estimates.estimate_call(
+            substrate, instance, keypair, "create_escrow", create_args, spec.total_amount
+        )
+        error = self._dry_run_error(dry_run) if dry_run is not None else None
+        if error:
+            raise ValueError(f"create_escrow would fail: {error}")
+        gas = estimate.gas_limit
+
+        def contract_call(message: str, args: dict, value: int = 0):
+            return substrate.compose_call(
+                call_module="Contracts",
+                call_function="call",
+                call_params={
+                    "dest": instance.contract_address,
+                    "value": value,
+                    "gas_limit": gas,
+                    "storage_deposit_limit": estimate.storage_deposit_limit,
+                    "data": instance.metadata.generate_message_data(name=message, args=args).to_hex(),
+                },
+            )
+
+        calls = [contract_call("create_escrow", create_args, spec.total_amount)]
+        for index, percentage in enumerate(self.milestone_percentages(spec.milestone_count)):
+            calls.append(contract_call(
+                "add_milestone",
+                {"project_owner": owner, "milestone_index": index, "release_percentage": percentage},
+            ))
+        weight = {key: gas[key] * len(calls) for key in ("ref_time", "proof_size")}
+        return calls, weight
+
+    @staticmethod
+    def pack_batches(
+        items: List[Tuple[Any, int, Dict[str, int]]],
+        budget: Optional[Dict[str, int]],
+        max_calls: int,
+    ) -> List[List[Any]]:
+        """Greedily group `(item, call_count, weight)` entries into batches.
+
+        A batch stays within `max_calls` calls and, when given, the weight
+        `budget`. An item's calls are never split across batches; an item
+        that alone exceeds the limits gets a batch of its own.
+        """
+        batches: List[List[Any]] = []
+        current: List[Any] = []
+        calls = 0
+        used = {"ref_time": 0, "proof_size": 0}
+        for item, count, weight in items:
+            fits = calls + count <= max_calls and (
+                budget is None
+                or all(used[key] + weight.get(key, 0) <= budget[key] for key in used)
+            )
+            if current and not fits:
+                batches.append(current)
+                current, calls, used = [], 0, {"ref_time": 0, "proof_size": 0}
+            current.append(item)
+            calls += count
+            for key in used:
+                used[key] += weight.get(key, 0)
+        if current:
+            batches.append(current)
+        return batches
+
+    def _deploy_batch(
+        self,
+        substrate: SubstrateInterface,
+        keypair: Keypair,
+        specs: List[EscrowSpec],
+    ) -> List[BatchDeployResult]:
+        """Create all escrows in the shared contract with `utility.batch_all` extrinsics"""
+        instance = self._shared_escrow(substrate, keypair)
+        budget = self._weight_budget(substrate)
+
+        results: Dict[Any, BatchDeployResult] = {}
+        planned = []
+        for spec in specs:
+            try:
+                calls, weight = self._escrow_calls(substrate, instance, keypair, spec)
+            except Exception as e:
+                results[spec.key] = BatchDeployResult(key=spec.key, success=False, error=str(e))
+                continue
+            planned.append(((spec, calls), len(calls), weight))
+
+        for index, batch in enumerate(self.pack_batches(planned, budget, RococoSettings.BATCH_MAX_CALLS)):
+            block_hash = extrinsic_hash = error = None
+            status = "failed"
+            try:
+                call = substrate.compose_call(
+                    call_module="Utility",
+                    call_function="batch_all",
+                    call_params={"calls": [c for _, calls in batch for c in calls]},
+                )
+                receipt = self._submit_call(substrate, keypair, call)
+                block_hash, extrinsic_hash = receipt.block_hash, receipt.extrinsic_hash
+                if receipt.is_success:
+                    status = "deployed"
+                else:
+                    error = str(receipt.error_message)
+            except SubmissionUnknownError as e:
+                # May still land: the caller has to check before deploying these again
+                status, extrinsic_hash, error = "unknown", e.extrinsic_hash, str(e)
+            except Exception as e:
+                error = str(e)
+            logger.log(
+                "INFO" if status == "deployed" else "WARNING",
+                "Escrow batch {} {}: {} escrows in {}",
+                index, "included" if status == "deployed" else status, len(batch), block_hash or "-",
+            )
+
+            for spec, _ in batch:
+                results[spec.key] = BatchDeployResult(
+                    key=spec.key,
+                    success=status == "deployed",
+                    contract_address=instance.contract_address if status != "failed" else None,
+                    batch=index,
+                    block_hash=block_hash,
+                    extrinsic_hash=extrinsic_hash,
+                    status=status,
+                    error=error,
+                )
+
+        return [results[spec.key] for spec in specs]
+
+    async def deploy_batch(self, specs: List[EscrowSpec]) -> List[BatchDeployResult]:
+        """
+        Create several escrows with as few extrinsics as possible
+        
+        All escrows live in one shared multi-escrow contract
+        (`ROCOCO_ESCROW_CONTRACT`, required outside the simulated node). Their
+        `create_escrow`/`add_milestone` calls are packed into
+        `utility.batch_all` extrinsics under the block weight limit, so a
+        round of projects costs a few block inclusions instead of one per
+        project. A failed batch only fails the escrows it contained; a batch
+        whose connection dropped after sending is reported as "unknown".
+        
+        Returns:
+            One BatchDeployResult per spec, in input order
+        """
+        keypair = self._signer()
+        if keypair is None or (self.pool is None and self.substrate is None):
+            # No signer configured: simulate, batching by call count only
+            items = [(spec, spec.milestone_count + 1, {}) for spec in specs]
+            batches = self.pack_batches(items, None, RococoSettings.BATCH_MAX_CALLS)
+            return [
+                BatchDeployResult(
+                    key=spec.key,
+                    success=True,
+                    contract_address=SIMULATED_CONTRACT_ADDRESS,
+                    batch=index,
+                    status="simulated",
+                )
+                for index, batch in enumerate(batches)
+                for spec in batch
+            ]
+
+        logger.info("Deploying {} escrows to Rococo in batches", len(specs))
+        return await self._run(self._deploy_batch, keypair, specs, idempotent=False)
+    
+    @property
+    def simulated(self) -> bool:
+        """True when deployments are simulated (no signer or no connection)"""
+        return self._signer() is None or (self.pool is None and self.substrate is None)
+
+    def _prepare_escrow(self, substrate: SubstrateInterface, keypair: Keypair, spec: EscrowSpec) -> PreparedEscrow:
+        instance = self._shared_escrow(substrate, keypair)
+        calls, _ = self._escrow_calls(substrate, instance, keypair, spec)
+        call = substrate.compose_call(call_module="Utility", call_function="batch_all", call_params={"calls": calls})
+        extrinsic, nonce = self._sign(substrate, keypair, call)
+        return PreparedEscrow(
+            contract_address=instance.contract_address,
+            extrinsic=extrinsic,
+            extrinsic_hash=f"0x{extrinsic.extrinsic_hash.hex()}",
+            signer=keypair.ss58_address,
+            nonce=nonce,
+        )
+
+    async def prepare_escrow(self, spec: EscrowSpec) -> PreparedEscrow:
+        """Compose and sign the escrow's create_escrow/add_milestone batch in the shared contract"""
+        # May upload the code or instantiate the shared contract on the simulated node
+        return await self._run(self._prepare_escrow, self._signer(), spec, idempotent=False)
+
+    def _submit(self, substrate: SubstrateInterface, prepared: PreparedEscrow) -> str:
+        from substrateinterface.exceptions import ExtrinsicFailedException
+
+        with prepared.lock:
+            if prepared.state != "signed":
+                raise RuntimeError(f"Prepared extrinsic {prepared.extrinsic_hash} was {prepared.state}")
+            prepared.state = "sent"
+        receipt = self._submit_signed(substrate, prepared.signer, prepared.extrinsic, prepared.nonce)
+        if not receipt.is_success:
+            raise ExtrinsicFailedException(receipt.error_message)
+        return receipt.block_hash
+
+    async def submit_prepared(self, prepared: PreparedEscrow) -> str:
+        """Submit a prepared escrow extrinsic and return the hash of the block including it"""
+        return await self._run(self._submit, prepared, idempotent=False)
+
+    def discard_prepared(self, prepared: PreparedEscrow) -> None:
+        """Give back the nonce of a prepared extrinsic that will not be sent
+
+        Does nothing once submission has started: the nonce is then settled
+        by the submission itself.
+        """
+        with prepared.lock:
+            if prepared.state != "signed":
+                return
+            prepared.state = "discarded"
+        nonce_manager(self.rpc_url, prepared.signer).release(prepared.nonce)
+
+    @staticmethod
+    def _finality(substrate: SubstrateInterface, block_hash: str) -> Optional[bool]:
+        """True once `block_hash` is finalized, False if it was reorged out, None if pending"""
+        number = substrate.get_block_number(block_hash)
+        finalized = substrate.get_block_number(substrate.get_chain_finalised_head())
+        if finalized < number:
+            return None
+        return substrate.get_block_hash(number) == block_hash
+
+    async def wait_finalized(self, block_hash: str) -> None:
+        """Poll the finalized head until `block_hash` is final (without holding a connection)"""
+        from substrateinterface.exceptions import ExtrinsicFailedException
+
+        deadline = time.monotonic() + RococoSettings.FINALITY_TIMEOUT_SECONDS
+        while True:
+            final = await self._run(self._finality, block_hash)
+            if final is True:
+                return
+            if final is False:
+                raise ExtrinsicFailedException(f"Block {block_hash} was not finalized (reorganized out)")
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Block {block_hash} not finalized after {RococoSettings.FINALITY_TIMEOUT_SECONDS}s")
+            await asyncio.sleep(RococoSettings.FINALITY_POLL_SECONDS)
+
+    def _escrow_exists(self, substrate: SubstrateInterface, contract_address: str, project_owner: str) -> bool:
+        instance = self._contract(substrate, contract_address)
+        result = instance.read(self._signer(), "get_escrow_status", args={"project_owner": self.project_account(project_owner)})
+        data = result.value["result"].get("Ok", {}).get("data")
+        status = data.get("Ok") if isinstance(data, dict) else data
+        return status is not None
+
+    async def escrow_exists(self, contract_address: str, project_owner: str) -> bool:
+        """Whether the contract already holds an escrow for `project_owner`"""
+        return await self._run(self._escrow_exists, contract_address, project_owner)
+    
+    def _release_call(self, substrate: SubstrateInterface, keypair: Keypair, spec: ReleaseSpec):
+        """Compose one `release_milestone` call.
+
+        The call is always dry-run, even with a cached gas estimate: a
+        release that would fail is left out of the batch instead of
+        reverting every other release in the `batch_all`.
+        """
+        instance = self._contract(substrate, spec.contract_address)
+        args = {"project_owner": self.project_account(spec.project_owner), "milestone_index": spec.milestone_index}
+        estimate, dry_run = gas_estimates.estimate_call(
+            substrate, instance, keypair, "release_milestone", args, check=True
+        )
+        error = self._dry_run_error(dry_run)
+        if error:
+            raise ValueError(f"release_milestone would fail: {error}")
+        call = substrate.compose_call(
+            call_module="Contracts",
+            call_function="call",
+            call_params={
+                "dest": spec.contract_address,
+                "value": 0,
+                "gas_limit": estimate.gas_limit,
+                "storage_deposit_limit": estimate.storage_deposit_limit,
+                "data": instance.metadata.generate_message_data(name="release_milestone", args=args).to_hex(),
+            },
+        )
+        return call, dict(estimate.gas_limit)
+
+    def _release_batch(
+        self,
+        substrate: SubstrateInterface,
+        keypair: Keypair,
+        specs: List[ReleaseSpec],
+    ) -> List[BatchReleaseResult]:
+        """Release all milestones with `utility.batch_all` extrinsics"""
+        budget = self._weight_budget(substrate)
+
+        results: Dict[Any, BatchReleaseResult] = {}
+        planned = []
+        for spec in specs:
+            try:
+                call, weight = self._release_call(substrate, keypair, spec)
+            except Exception as e:
+                results[spec.key] = BatchReleaseResult(key=spec.key, success=False, error=str(e))
+                continue
+            planned.append(((spec, call), 1, weight))
+
+        for index, batch in enumerate(self.pack_batches(planned, budget, RococoSettings.BATCH_MAX_CALLS)):
+            block_hash = extrinsic_hash = error = None
+            status = "failed"
+            try:
+                call = substrate.compose_call(
+                    call_module="Utility",
+                    call_function="batch_all",
+                    call_params={"calls": [c for _, c in batch]},
+                )
+                receipt = self._submit_call(substrate, keypair, call)
+                block_hash, extrinsic_hash = receipt.block_hash, receipt.extrinsic_hash
+                if receipt.is_success:
+                    status = "released"
+                else:
+                    error = str(receipt.error_message)
+            except SubmissionUnknownError as e:
+                # May still land: the caller has to check before releasing these again
+                status, extrinsic_hash, error = "unknown", e.extrinsic_hash, str(e)
+            except Exception as e:
+                error = str(e)
+            logger.log(
+                "INFO" if status == "released" else "WARNING",
+                "Release batch {} {}: {} milestones in {}",
+                index, "included" if status == "released" else status, len(batch), block_hash or "-",
+            )
+
+            for spec, _ in batch:
+                results[spec.key] = BatchReleaseResult(
+                    key=spec.key,
+                    success=status == "released",
+                    batch=index,
+                    block_hash=block_hash,
+                    extrinsic_hash=extrinsic_hash,
+                    status=status,
+                    error=error,
+                )
+
+        return [results[spec.key] for spec in specs]
+
+    async def release_milestones(self, specs: List[ReleaseSpec]) -> List[BatchReleaseResult]:
+        """
+        Release several milestones with as few extrinsics as possible
+        
+        Each `release_milestone` call is dry-run (even when its gas estimate
+        is cached), then the calls that would succeed are packed into
+        `utility.batch_all` extrinsics under the block weight limit. A failed batch only fails the releases it
+        contained; a batch whose connection dropped after sending is reported
+        as "unknown". Releases of simulated escrows are simulated; releases of
+        real escrows fail when there is no signer or connection.
+        
+        Returns:
+            One BatchReleaseResult per spec, in input order
+        """
+        results = {
+            spec.key: BatchReleaseResult(key=spec.key, success=True, status="simulated")
+            for spec in specs
+            if spec.contract_address == SIMULATED_CONTRACT_ADDRESS
+        }
+        on_chain = [spec for spec in specs if spec.key not in results]
+        if on_chain and self.simulated:
+            logger.warning("Cannot release {} milestones of on-chain escrows: no signer configured", len(on_chain))
+            for spec in on_chain:
+                results[spec.key] = BatchReleaseResult(key=spec.key, success=False, error="no signer configured")
+        elif on_chain:
+            logger.info("Releasing {} milestones on Rococo in batches", len(on_chain))
+            for result in await self._run(self._release_batch, self._signer(), on_chain, idempotent=False):
+                results[result.key] = result
+        return [results[spec.key] for spec in specs]
 
 
 # Example usage
@@ -181,7 +928,7 @@ async def example_deployment():
     # - Read keypair from secure storage
     # - Call deploy_contract()
     
-    print("✅ Deployer ready for production use")
+    logger.info("Deployer ready for production use")
 
 
 if __name__ == "__main__":
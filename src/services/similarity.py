@@ -0,0 +1,148 @@
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.core.depends.db import AsyncSessionLocal
+from src.models.milestone import Milestone
+from src.models.project import Project
+from src.services.prompt import project_field
+from src.settings.similarity import SimilaritySettings
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class ProjectSimilarityIndex:
+    """In-memory near-duplicate index over project text.
+
+    Each project (name, description and milestones) is turned into a signed
+    hashing-vectorizer embedding of word unigrams and bigrams with sublinear
+    term frequency, L2-normalised, so the dot product of two rows is their
+    cosine similarity. Rows live in one contiguous float32 matrix that grows
+    by doubling; upserts and removals are O(dim).
+    """
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+        self._matrix = np.zeros((64, dimensions), dtype=np.float32)
+        self._ids: List[int] = []
+        self._rows: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @staticmethod
+    def project_text(project: Any, milestones: Iterable[Any] = ()) -> str:
+        parts = [project_field(project, "name", "") or "", project_field(project, "description", "") or ""]
+        for milestone in milestones:
+            parts.append(project_field(milestone, "name", "") or "")
+            parts.append(project_field(milestone, "description", "") or "")
+        return "\n".join(parts)
+
+    def vectorize(self, text: str) -> np.ndarray:
+        words = _TOKEN_RE.findall(text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        if not features:
+            return vector
+
+        hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint32, count=len(features))
+        buckets = (hashes % self.dimensions).astype(np.intp)
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, buckets, signs)
+
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def upsert(self, project_pk: int, text: str) -> None:
+        vector = self.vectorize(text)
+        row = self._rows.get(project_pk)
+        if row is None:
+            row = len(self._ids)
+            if row == self._matrix.shape[0]:
+                grown = np.zeros((row * 2, self.dimensions), dtype=np.float32)
+                grown[:row] = self._matrix
+                self._matrix = grown
+            self._ids.append(project_pk)
+            self._rows[project_pk] = row
+        self._matrix[row] = vector
+
+    def remove(self, project_pk: int) -> None:
+        row = self._rows.pop(project_pk, None)
+        if row is None:
+            return
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = moved
+            self._rows[moved] = row
+        self._ids.pop()
+
+    def query(
+        self, text: str, limit: int = 10, min_score: float = 0.0, exclude: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """Return up to `limit` `(project_pk, score)` pairs, most similar first."""
+        count = len(self._ids)
+        if not count:
+            return []
+        scores = self._matrix[:count] @ self.vectorize(text)
+        if exclude is not None and exclude in self._rows:
+            scores[self._rows[exclude]] = -1.0
+
+        k = min(limit, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._ids[i], float(scores[i])) for i in top if scores[i] >= min_score]
+
+
+similarity_index = ProjectSimilarityIndex(SimilaritySettings.DIMENSIONS)
+
+
+class SimilarityService:
+    """Keep `similarity_index` in sync with the projects table and query it."""
+
+    @staticmethod
+    async def index_project(project: Project, session: AsyncSession) -> None:
+        """(Re)index a project with its current milestones."""
+        stmt = select(Milestone).where(Milestone.project_id == project.project_id)
+        milestones = (await session.execute(stmt)).scalars().all()
+        similarity_index.upsert(project.id, ProjectSimilarityIndex.project_text(project, milestones))
+
+    @staticmethod
+    async def reindex_project(project_id: str, session: AsyncSession) -> None:
+        """Reindex the project with string id `project_id` (after its milestones changed), if it exists."""
+        stmt = select(Project).where(Project.project_id == project_id)
+        project = (await session.execute(stmt)).scalar_one_or_none()
+        if project is not None:
+            await SimilarityService.index_project(project, session)
+
+    @staticmethod
+    def remove_project(project_pk: int) -> None:
+        similarity_index.remove(project_pk)
+
+    @staticmethod
+    def similar(text: str, limit: int = 10, min_score: float = 0.0, exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        return similarity_index.query(text, limit=limit, min_score=min_score, exclude=exclude)
+
+    @staticmethod
+    async def rebuild() -> int:
+        """Index every project from the database (used to warm the index at startup)."""
+        async with AsyncSessionLocal() as session:
+            projects = (await session.execute(select(Project))).scalars().all()
+            milestones = (await session.execute(select(Milestone))).scalars().all()
+
+        by_project: Dict[str, List[Milestone]] = {}
+        for milestone in milestones:
+            by_project.setdefault(milestone.project_id, []).append(milestone)
+        for project in projects:
+            text = ProjectSimilarityIndex.project_text(project, by_project.get(project.project_id, []))
+            similarity_index.upsert(project.id, text)
+
+        logger.info("Similarity index built with {} projects", len(similarity_index))
+        return len(similarity_index)
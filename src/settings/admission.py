@@ -0,0 +1,91 @@
+from pydantic import Field
+
+from src.settings.base import ProjectSettings
+
+
+class _AdmissionSettings(ProjectSettings):
+    QUEUE_TIMEOUT_SECONDS: float = Field(
+        5.0,
+        gt=0,
+        alias="ADMISSION_QUEUE_TIMEOUT_SECONDS",
+        description="Longest a request waits in an admission queue before it is rejected",
+    )
+    MAX_RETRY_AFTER_SECONDS: int = Field(
+        60,
+        ge=1,
+        alias="ADMISSION_MAX_RETRY_AFTER_SECONDS",
+        description="Upper bound of the Retry-After sent with overload responses",
+    )
+
+    # Outbound dependencies (rejections answer 503)
+    LLM_CONCURRENCY: int = Field(
+        8,
+        ge=1,
+        alias="ADMISSION_LLM_CONCURRENCY",
+        description="Concurrent model calls (hedged copies share their call's slot)",
+    )
+    LLM_QUEUE_SIZE: int = Field(
+        32,
+        ge=0,
+        alias="ADMISSION_LLM_QUEUE_SIZE",
+        description="Model calls allowed to wait for a slot before new ones are rejected",
+    )
+    ARKIV_CONCURRENCY: int = Field(
+        8,
+        ge=1,
+        alias="ADMISSION_ARKIV_CONCURRENCY",
+        description="Concurrent Arkiv operations run from async code",
+    )
+    ARKIV_QUEUE_SIZE: int = Field(
+        32,
+        ge=0,
+        alias="ADMISSION_ARKIV_QUEUE_SIZE",
+        description="Arkiv operations allowed to wait for a slot before new ones are rejected",
+    )
+    SUBSTRATE_QUEUE_SIZE: int = Field(
+        64,
+        ge=0,
+        alias="ADMISSION_SUBSTRATE_QUEUE_SIZE",
+        description="Chain calls allowed to wait for a pooled connection before new ones are rejected",
+    )
+
+    # Routes (rejections answer 429)
+    EVALUATE_CONCURRENCY: int = Field(
+        16,
+        ge=1,
+        alias="ADMISSION_EVALUATE_CONCURRENCY",
+        description="Concurrent POST /arkiv/evaluate requests",
+    )
+    EVALUATE_QUEUE_SIZE: int = Field(
+        32,
+        ge=0,
+        alias="ADMISSION_EVALUATE_QUEUE_SIZE",
+        description="POST /arkiv/evaluate requests allowed to wait for a slot",
+    )
+    SPONSOR_CONCURRENCY: int = Field(
+        8,
+        ge=1,
+        alias="ADMISSION_SPONSOR_CONCURRENCY",
+        description="Concurrent POST /arkiv/sponsor requests",
+    )
+    SPONSOR_QUEUE_SIZE: int = Field(
+        16,
+        ge=0,
+        alias="ADMISSION_SPONSOR_QUEUE_SIZE",
+        description="POST /arkiv/sponsor requests allowed to wait for a slot",
+    )
+    ESCROW_WRITES_CONCURRENCY: int = Field(
+        4,
+        ge=1,
+        alias="ADMISSION_ESCROW_WRITES_CONCURRENCY",
+        description="Concurrent escrow deploy and release requests",
+    )
+    ESCROW_WRITES_QUEUE_SIZE: int = Field(
+        8,
+        ge=0,
+        alias="ADMISSION_ESCROW_WRITES_QUEUE_SIZE",
+        description="Escrow deploy and release requests allowed to wait for a slot",
+    )
+
+
+AdmissionSettings = _AdmissionSettings()
@@ -0,0 +1,63 @@
+from typing import Literal, Optional
+
+from pydantic import Field
+
+from src.settings.base import ProjectSettings
+
+
+class _AIBackendSettings(ProjectSettings):
+    """Selects the model backend used by `AIService`.
+
+    `gemini` calls the real API; `replay` answers from recorded responses with
+    injected latency and errors, for offline load tests.
+    """
+
+    BACKEND: Literal["gemini", "replay"] = Field(
+        "gemini",
+        alias="AI_BACKEND",
+        description="Model backend: gemini or replay",
+    )
+    RECORD_PATH: Optional[str] = Field(
+        None,
+        alias="AI_RECORD_PATH",
+        description="When set, append every Gemini reply to this JSONL file for later replay",
+    )
+    REPLAY_PATH: Optional[str] = Field(
+        None,
+        alias="AI_REPLAY_PATH",
+        description="JSONL file of recorded replies used by the replay backend",
+    )
+    REPLAY_LATENCY_MEDIAN_MS: float = Field(
+        800.0,
+        ge=0,
+        alias="AI_REPLAY_LATENCY_MEDIAN_MS",
+        description="Median injected latency of the replay backend",
+    )
+    REPLAY_LATENCY_SIGMA: float = Field(
+        0.5,
+        ge=0,
+        alias="AI_REPLAY_LATENCY_SIGMA",
+        description="Log-normal sigma of the injected latency (0 = constant)",
+    )
+    REPLAY_ERROR_RATE: float = Field(
+        0.0,
+        ge=0,
+        le=1,
+        alias="AI_REPLAY_ERROR_RATE",
+        description="Fraction of replayed calls that raise an error",
+    )
+    REPLAY_HANG_RATE: float = Field(
+        0.0,
+        ge=0,
+        le=1,
+        alias="AI_REPLAY_HANG_RATE",
+        description="Fraction of replayed calls that never answer (exercise deadlines)",
+    )
+    REPLAY_SEED: Optional[int] = Field(
+        None,
+        alias="AI_REPLAY_SEED",
+        description="Random seed for reproducible latency and error injection",
+    )
+
+
+AIBackendSettings = _AIBackendSettings()
@@ -11,6 +11,82 @@ class _GeminiSettings(ProjectSettings):
         alias="GOOGLE_API_KEY",
         description="Alternate API key name for Google GenAI",
     )
+    MODEL: str = Field(
+        "gemini-2.5-flash",
+        alias="GENERATIVE_MODEL",
+        description="Model used to evaluate projects",
+    )
+    PARSE_RETRIES: int = Field(
+        1,
+        ge=0,
+        alias="GEMINI_PARSE_RETRIES",
+        description="Extra model calls allowed when the output fails schema validation",
+    )
+    TIMEOUT_SECONDS: float = Field(
+        20.0,
+        gt=0,
+        alias="GEMINI_TIMEOUT_SECONDS",
+        description="Deadline for a single model call",
+    )
+    MAX_RETRIES: int = Field(
+        1,
+        ge=0,
+        alias="GEMINI_MAX_RETRIES",
+        description="Extra attempts after a model call times out or errors",
+    )
+    BREAKER_FAILURE_THRESHOLD: int = Field(
+        5,
+        ge=1,
+        alias="GEMINI_BREAKER_FAILURE_THRESHOLD",
+        description="Consecutive failed calls before the circuit breaker opens",
+    )
+    BREAKER_RESET_SECONDS: float = Field(
+        30.0,
+        gt=0,
+        alias="GEMINI_BREAKER_RESET_SECONDS",
+        description="Seconds the breaker stays open before letting a probe call through",
+    )
+    HEDGE_ENABLED: bool = Field(
+        False,
+        alias="GEMINI_HEDGE_ENABLED",
+        description="Send a second request when the first is slower than the hedge quantile",
+    )
+    HEDGE_QUANTILE: float = Field(
+        0.95,
+        gt=0,
+        lt=1,
+        alias="GEMINI_HEDGE_QUANTILE",
+        description="Latency quantile of recent calls after which a hedged request is sent",
+    )
+    HEDGE_MIN_SAMPLES: int = Field(
+        20,
+        ge=1,
+        alias="GEMINI_HEDGE_MIN_SAMPLES",
+        description="Successful calls observed before hedging starts",
+    )
+    PROMPT_TOKEN_BUDGET: int = Field(
+        1500,
+        ge=200,
+        alias="GEMINI_PROMPT_TOKEN_BUDGET",
+        description="Approximate token budget for the per-project part of the prompt",
+    )
+    MAX_OUTPUT_TOKENS: Optional[int] = Field(
+        None,
+        ge=1,
+        alias="GEMINI_MAX_OUTPUT_TOKENS",
+        description="Upper bound on generated tokens per call (model default when unset)",
+    )
+    CONTEXT_CACHE_ENABLED: bool = Field(
+        True,
+        alias="GEMINI_CONTEXT_CACHE_ENABLED",
+        description="Serve the static system prompt from a Gemini context cache",
+    )
+    CONTEXT_CACHE_TTL_SECONDS: int = Field(
+        3600,
+        ge=300,
+        alias="GEMINI_CONTEXT_CACHE_TTL_SECONDS",
+        description="Lifetime of the system prompt context cache",
+    )
 
 
 GeminiSettings = _GeminiSettings()
@@ -0,0 +1,29 @@
+from pydantic import Field
+
+from src.settings.base import ProjectSettings
+
+
+class _HttpSettings(ProjectSettings):
+    COMPRESSION_MINIMUM_SIZE: int = Field(
+        1024,
+        ge=0,
+        alias="HTTP_COMPRESSION_MINIMUM_SIZE",
+        description="Responses smaller than this many bytes are sent uncompressed",
+    )
+    GZIP_LEVEL: int = Field(
+        5,
+        ge=1,
+        le=9,
+        alias="HTTP_GZIP_LEVEL",
+        description="gzip level for clients that accept gzip but not brotli",
+    )
+    BROTLI_QUALITY: int = Field(
+        4,
+        ge=0,
+        le=11,
+        alias="HTTP_BROTLI_QUALITY",
+        description="brotli quality for clients that accept br (above ~6 the CPU cost climbs steeply)",
+    )
+
+
+HttpSettings = _HttpSettings()
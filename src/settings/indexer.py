@@ -0,0 +1,38 @@
+from typing import Optional
+
+from pydantic import Field
+
+from src.settings.base import ProjectSettings
+
+
+class _IndexerSettings(ProjectSettings):
+    ENABLED: bool = Field(
+        True,
+        alias="ESCROW_INDEXER_ENABLED",
+        description="Follow finalized blocks and index escrow contract events",
+    )
+    START_BLOCK: Optional[int] = Field(
+        None,
+        alias="ESCROW_INDEXER_START_BLOCK",
+        description="First block to index when no cursor is stored (defaults to the finalized head)",
+    )
+    CHUNK_BLOCKS: int = Field(
+        50,
+        ge=1,
+        alias="ESCROW_INDEXER_CHUNK_BLOCKS",
+        description="Blocks fetched per pooled call while backfilling",
+    )
+    PARALLEL_CHUNKS: int = Field(
+        2,
+        ge=1,
+        alias="ESCROW_INDEXER_PARALLEL_CHUNKS",
+        description="Block ranges fetched concurrently while backfilling (bounded by ROCOCO_POOL_SIZE)",
+    )
+    POLL_SECONDS: float = Field(
+        6,
+        alias="ESCROW_INDEXER_POLL_SECONDS",
+        description="Interval between finalized-head checks once caught up",
+    )
+
+
+IndexerSettings = _IndexerSettings()
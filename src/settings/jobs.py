@@ -0,0 +1,33 @@
+from pydantic import Field
+
+from src.settings.base import ProjectSettings
+
+
+class _JobSettings(ProjectSettings):
+    EVALUATION_WORKERS: int = Field(
+        2,
+        ge=1,
+        alias="EVALUATION_WORKERS",
+        description="Number of in-process workers running queued evaluations",
+    )
+    EVALUATION_QUEUE_SIZE: int = Field(
+        500,
+        ge=1,
+        alias="EVALUATION_QUEUE_SIZE",
+        description="Maximum queued evaluation jobs before new ones are rejected",
+    )
+    DEPLOYMENT_WORKERS: int = Field(
+        1,
+        ge=1,
+        alias="DEPLOYMENT_WORKERS",
+        description="Number of in-process workers running escrow deployment jobs",
+    )
+    DEPLOYMENT_QUEUE_SIZE: int = Field(
+        100,
+        ge=1,
+        alias="DEPLOYMENT_QUEUE_SIZE",
+        description="Maximum queued deployment jobs before new ones are rejected",
+    )
+
+
+JobSettings = _JobSettings()
@@ -0,0 +1,31 @@
+from pydantic import Field
+
+from src.settings.base import ProjectSettings
+
+
+class _LoopMonitorSettings(ProjectSettings):
+    ENABLED: bool = Field(
+        True,
+        alias="LOOP_MONITOR_ENABLED",
+        description="Measure event loop lag and report calls that block the loop",
+    )
+    INTERVAL_SECONDS: float = Field(
+        0.05,
+        gt=0,
+        alias="LOOP_MONITOR_INTERVAL_SECONDS",
+        description="Interval between event loop heartbeats",
+    )
+    BLOCK_THRESHOLD_SECONDS: float = Field(
+        0.1,
+        gt=0,
+        alias="LOOP_MONITOR_BLOCK_THRESHOLD_SECONDS",
+        description="Lag after which the loop counts as blocked and the blocking stack is captured",
+    )
+    STRICT: bool = Field(
+        False,
+        alias="LOOP_MONITOR_STRICT",
+        description="Fail requests that blocked the event loop (for tests)",
+    )
+
+
+LoopMonitorSettings = _LoopMonitorSettings()
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from pydantic import Field, SecretStr
+
+from src.settings.base import ProjectSettings
+
+
+class _ProfilingSettings(ProjectSettings):
+    TOKEN: Optional[SecretStr] = Field(
+        None,
+        alias="PROFILING_TOKEN",
+        description="Token that enables profiling of a request (X-Profile header or ?profile= query); unset disables profiling",
+    )
+    INTERVAL_SECONDS: float = Field(
+        0.005,
+        ge=0.0005,
+        alias="PROFILING_INTERVAL_SECONDS",
+        description="Sampling interval of the request profiler",
+    )
+    DIR: Optional[str] = Field(
+        None,
+        alias="PROFILING_DIR",
+        description="Directory where profiles are stored; unset returns the profile instead of the response",
+    )
+
+
+ProfilingSettings = _ProfilingSettings()
@@ -0,0 +1,87 @@
+from typing import Literal, Optional
+
+from pydantic import Field, SecretStr
+
+from src.settings.base import ProjectSettings
+
+
+class _RococoSettings(ProjectSettings):
+    BACKEND: Literal["rpc", "simulated"] = Field(
+        "rpc",
+        alias="ROCOCO_BACKEND",
+        description="Chain backend: the node at ROCOCO_RPC, or an in-process simulated contracts node (see SIMCHAIN_*)",
+    )
+    RPC_URL: str = Field(
+        "wss://rococo-contracts-rpc.polkadot.io",
+        alias="ROCOCO_RPC",
+        description="Websocket endpoint of the contracts chain",
+    )
+    SIGNER_URI: Optional[SecretStr] = Field(
+        None,
+        alias="ROCOCO_SIGNER_URI",
+        description="Secret URI (mnemonic or //Dev path) of the service account; without it deployments are simulated",
+    )
+    ARTIFACTS_DIR: Optional[str] = Field(
+        None,
+        alias="CONTRACT_ARTIFACTS_DIR",
+        description="Directory holding funding_escrow.wasm and funding_escrow.json (defaults to target/ink)",
+    )
+    POOL_SIZE: int = Field(
+        2,
+        alias="ROCOCO_POOL_SIZE",
+        description="Number of persistent websocket connections to the node",
+    )
+    SOCKET_TIMEOUT_SECONDS: float = Field(
+        60,
+        alias="ROCOCO_SOCKET_TIMEOUT_SECONDS",
+        description="Connect/receive timeout of each websocket",
+    )
+    KEEPALIVE_SECONDS: float = Field(
+        30,
+        alias="ROCOCO_KEEPALIVE_SECONDS",
+        description="Interval between keep-alive pings on idle connections (also checks the runtime version)",
+    )
+    ESCROW_CONTRACT: Optional[str] = Field(
+        None,
+        alias="ROCOCO_ESCROW_CONTRACT",
+        description="Address of the shared escrow contract; required for deployments unless ROCOCO_BACKEND=simulated",
+    )
+    BATCH_WEIGHT_FRACTION: float = Field(
+        0.75,
+        alias="ROCOCO_BATCH_WEIGHT_FRACTION",
+        description="Share of the normal-class max extrinsic weight a single batch may use",
+    )
+    BATCH_MAX_CALLS: int = Field(
+        100,
+        alias="ROCOCO_BATCH_MAX_CALLS",
+        description="Upper bound on calls packed into one utility.batch_all extrinsic",
+    )
+    FINALITY_TIMEOUT_SECONDS: float = Field(
+        300,
+        alias="ROCOCO_FINALITY_TIMEOUT_SECONDS",
+        description="How long a deployment job waits for its block to be finalized",
+    )
+    FINALITY_POLL_SECONDS: float = Field(
+        3,
+        alias="ROCOCO_FINALITY_POLL_SECONDS",
+        description="Interval between finalized-head checks while waiting for finality",
+    )
+    STATE_HEAD_TTL_SECONDS: float = Field(
+        2,
+        alias="ROCOCO_STATE_HEAD_TTL_SECONDS",
+        description="How long escrow state reads reuse the known best block before asking for a new head",
+    )
+    GAS_ESTIMATE_CACHE: bool = Field(
+        True,
+        alias="ROCOCO_GAS_ESTIMATE_CACHE",
+        description="Reuse weight/storage deposit estimates of similar contract calls instead of dry-running each one",
+    )
+    GAS_ESTIMATE_MARGIN: float = Field(
+        1.2,
+        ge=1,
+        alias="ROCOCO_GAS_ESTIMATE_MARGIN",
+        description="Factor applied to cached weight and storage deposit estimates",
+    )
+
+
+RococoSettings = _RococoSettings()
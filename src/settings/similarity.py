@@ -0,0 +1,21 @@
+from pydantic import Field
+
+from src.settings.base import ProjectSettings
+
+
+class _SimilaritySettings(ProjectSettings):
+    DIMENSIONS: int = Field(
+        4096,
+        ge=256,
+        alias="SIMILARITY_DIMENSIONS",
+        description="Number of hashed feature buckets per project vector",
+    )
+    REUSE_THRESHOLD: float = Field(
+        0.95,
+        gt=0,
+        alias="SIMILARITY_REUSE_THRESHOLD",
+        description="Cosine similarity above which a prior evaluation is reused (> 1 disables reuse)",
+    )
+
+
+SimilaritySettings = _SimilaritySettings()
@@ -0,0 +1,55 @@
+from typing import Optional
+
+from pydantic import Field
+
+from src.settings.base import ProjectSettings
+
+
+class _SimulatedChainSettings(ProjectSettings):
+    BLOCK_TIME_SECONDS: float = Field(
+        1.0,
+        gt=0,
+        alias="SIMCHAIN_BLOCK_TIME_SECONDS",
+        description="Interval between blocks of the simulated node",
+    )
+    FINALITY_LAG_BLOCKS: int = Field(
+        2,
+        ge=0,
+        alias="SIMCHAIN_FINALITY_LAG_BLOCKS",
+        description="How many blocks the finalized head trails the best block",
+    )
+    MAX_EXTRINSICS_PER_BLOCK: int = Field(
+        500,
+        ge=1,
+        alias="SIMCHAIN_MAX_EXTRINSICS_PER_BLOCK",
+        description="Ready extrinsics included per block; the rest wait for the next one",
+    )
+    REJECT_RATE: float = Field(
+        0.0,
+        ge=0,
+        le=1,
+        alias="SIMCHAIN_REJECT_RATE",
+        description="Probability that a submitted extrinsic is rejected by the pool",
+    )
+    DISPATCH_FAILURE_RATE: float = Field(
+        0.0,
+        ge=0,
+        le=1,
+        alias="SIMCHAIN_DISPATCH_FAILURE_RATE",
+        description="Probability that an included extrinsic fails to dispatch (ContractTrapped)",
+    )
+    LOST_REPLY_RATE: float = Field(
+        0.0,
+        ge=0,
+        le=1,
+        alias="SIMCHAIN_LOST_REPLY_RATE",
+        description="Probability that the connection drops after an extrinsic was accepted (fate unknown to the caller)",
+    )
+    SEED: Optional[int] = Field(
+        None,
+        alias="SIMCHAIN_SEED",
+        description="Random seed for failure injection, for reproducible runs",
+    )
+
+
+SimulatedChainSettings = _SimulatedChainSettings()
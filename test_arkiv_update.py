@@ -6,7 +6,9 @@ This simulates the complete flow: Create project -> Create Arkiv entity -> Deplo
 import asyncio
 import json
 import sys
-sys.path.insert(0, '/Users/facundo/Proyectos-VSC/Sub0_data')
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
@@ -14,13 +16,7 @@ from sqlalchemy import select
 
 from src.models.sponsor import SponsoredProject
 from src.services.arkiv import ArkivService
-from src.settings.config import DATABASE_URL
-from arkiv import Arkiv
-
-# Import environment
-import os
-from dotenv import load_dotenv
-load_dotenv()
+from src.settings.db import DatabaseSettings
 
 
 async def test_arkiv_update_flow():
@@ -31,7 +27,7 @@ async def test_arkiv_update_flow():
     print("="*80)
     
     # Setup database
-    engine = create_async_engine(DATABASE_URL, echo=False)
+    engine = create_async_engine(DatabaseSettings.get_url, echo=False)
     async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
     
     try:
@@ -53,7 +49,9 @@ async def test_arkiv_update_flow():
                     project_id="test_project_123",
                     name="Test Project",
                     description="Test project for Arkiv update",
-                    sponsor="Test Sponsor",
+                    repo="",
+                    ai_score=0.0,
+                    contract_address="",
                     budget=1000.0,
                     status="approved",
                     chain="asset_hub",
@@ -76,11 +74,21 @@ async def test_arkiv_update_flow():
                 
                 # Initialize Arkiv client
                 from src.core.depends.arkiv import get_arkiv_client
-                arkiv_client = await get_arkiv_client()
+                arkiv_client = get_arkiv_client()
                 
-                result = await ArkivService.save_sponsored_project(
-                    client=arkiv_client,
-                    project=project
+                result = ArkivService.save_sponsored_project(
+                    arkiv_client,
+                    {
+                        "project_id": project.project_id,
+                        "name": project.name,
+                        "repo": project.repo,
+                        "ai_score": project.ai_score,
+                        "status": project.status,
+                        "contract_address": project.contract_address,
+                        "chain": project.chain,
+                        "budget": project.budget,
+                        "description": project.description,
+                    },
                 )
                 
                 if result:
@@ -99,7 +107,7 @@ async def test_arkiv_update_flow():
             
             # Initialize Arkiv client
             from src.core.depends.arkiv import get_arkiv_client
-            arkiv_client = await get_arkiv_client()
+            arkiv_client = get_arkiv_client()
             
             # Simulate a contract address (in real scenario this comes from deployment)
             test_contract_address = "5HpG9w8wBKZgfjjfHmU5rN7v5DzTK1qLKjG9GhC2cGfD"